@@ -24,7 +24,7 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x0c\x66\x61mily.proto\x12\x06\x66\x61mily\"2\n\x0b\x43hatMessage\x12\x12\n\nmessage_id\x18\x01 \x01(\x05\x12\x0f\n\x07message\x18\x02 \x01(\t\"H\n\x08NodeInfo\x12\x0f\n\x07node_id\x18\x01 \x01(\x05\x12\x0f\n\x07\x61\x64\x64ress\x18\x02 \x01(\t\x12\x1a\n\x12stored_message_ids\x18\x03 \x03(\x05\"C\n\x0cMessageNodes\x12\x12\n\nmessage_id\x18\x01 \x01(\x05\x12\x1f\n\x05nodes\x18\x02 \x03(\x0b\x32\x10.family.NodeInfo\"\x07\n\x05\x45mpty\"9\n\x0cStoreRequest\x12)\n\x0c\x63hat_message\x18\x01 \x01(\x0b\x32\x13.family.ChatMessage\"W\n\rStoreResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\r\n\x05\x65rror\x18\x02 \x01(\t\x12&\n\x0cstored_nodes\x18\x03 \x03(\x0b\x32\x10.family.NodeInfo\" \n\nGetRequest\x12\x12\n\nmessage_id\x18\x01 \x01(\x05\"h\n\x0bGetResponse\x12)\n\x0c\x63hat_message\x18\x01 \x01(\x0b\x32\x13.family.ChatMessage\x12\x1f\n\x05nodes\x18\x02 \x03(\x0b\x32\x10.family.NodeInfo\x12\r\n\x05\x66ound\x18\x03 \x01(\x08\":\n\x13RegisterNodeRequest\x12#\n\tnode_info\x18\x01 \x01(\x0b\x32\x10.family.NodeInfo\"6\n\x14RegisterNodeResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\r\n\x05\x65rror\x18\x02 \x01(\t2\xb4\x02\n\rFamilyService\x12;\n\x0cStoreMessage\x12\x14.family.StoreRequest\x1a\x15.family.StoreResponse\x12\x35\n\nGetMessage\x12\x12.family.GetRequest\x1a\x13.family.GetResponse\x12I\n\x0cRegisterNode\x12\x1b.family.RegisterNodeRequest\x1a\x1c.family.RegisterNodeResponse\x12.\n\tListNodes\x12\r.family.Empty\x1a\x10.family.NodeInfo0\x01\x12\x34\n\x0cListMessages\x12\r.family.Empty\x1a\x13.family.ChatMessage0\x01\x62\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x0c\x66\x61mily.proto\x12\x06\x66\x61mily\"C\n\x0b\x43hatMessage\x12\x12\n\nmessage_id\x18\x01 \x01(\x05\x12\x0f\n\x07message\x18\x02 \x01(\t\x12\x0f\n\x07payload\x18\x03 \x01(\x0c\"H\n\x08NodeInfo\x12\x0f\n\x07node_id\x18\x01 \x01(\x05\x12\x0f\n\x07\x61\x64\x64ress\x18\x02 \x01(\t\x12\x1a\n\x12stored_message_ids\x18\x03 \x03(\x05\"C\n\x0cMessageNodes\x12\x12\n\nmessage_id\x18\x01 \x01(\x05\x12\x1f\n\x05nodes\x18\x02 \x03(\x0b\x32\x10.family.NodeInfo\"\x07\n\x05\x45mpty\"e\n\x0cStoreRequest\x12)\n\x0c\x63hat_message\x18\x01 \x01(\x0b\x32\x13.family.ChatMessage\x12\x14\n\x0c\x63ontent_hash\x18\x02 \x01(\x0c\x12\x14\n\x0c\x63ontent_only\x18\x03 \x01(\x08\"\x86\x01\n\rStoreResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\r\n\x05\x65rror\x18\x02 \x01(\t\x12&\n\x0cstored_nodes\x18\x03 \x03(\x0b\x32\x10.family.NodeInfo\x12\x14\n\x0c\x63ontent_hash\x18\x04 \x01(\x0c\x12\x17\n\x0fmissing_content\x18\x05 \x01(\x08\" \n\nGetRequest\x12\x12\n\nmessage_id\x18\x01 \x01(\x05\"h\n\x0bGetResponse\x12)\n\x0c\x63hat_message\x18\x01 \x01(\x0b\x32\x13.family.ChatMessage\x12\x1f\n\x05nodes\x18\x02 \x03(\x0b\x32\x10.family.NodeInfo\x12\r\n\x05\x66ound\x18\x03 \x01(\x08\"D\n\x0cMessageChunk\x12\x12\n\nmessage_id\x18\x01 \x01(\x05\x12\x0c\n\x04\x64\x61ta\x18\x02 \x01(\x0c\x12\x12\n\ntotal_size\x18\x03 \x01(\x03\";\n\x08IdFilter\x12\x0c\n\x04\x62its\x18\x01 \x01(\x0c\x12\x12\n\nnum_hashes\x18\x02 \x01(\x05\x12\r\n\x05\x63ount\x18\x03 \x01(\x03\"I\n\x0bScanRequest\x12\x0f\n\x07\x66rom_id\x18\x01 \x01(\x05\x12\r\n\x05to_id\x18\x02 \x01(\x05\x12\r\n\x05limit\x18\x03 \x01(\x05\x12\x0b\n\x03ids\x18\x04 \x03(\x05\"#\n\rDeleteRequest\x12\x12\n\nmessage_id\x18\x01 \x01(\x05\"\x1d\n\rSnapshotChunk\x12\x0c\n\x04\x64\x61ta\x18\x01 \x01(\x0c\",\n\x0eSnapshotResult\x12\x0b\n\x03ids\x18\x01 \x03(\x05\x12\r\n\x05\x62ytes\x18\x02 \x01(\x03\"M\n\x13RegisterNodeRequest\x12#\n\tnode_info\x18\x01 \x01(\x0b\x32\x10.family.NodeInfo\x12\x11\n\tbootstrap\x18\x02 \x01(\x08\"6\n\x14RegisterNodeResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\r\n\x05\x65rror\x18\x02 \x01(\t2\xea\x05\n\rFamilyService\x12;\n\x0cStoreMessage\x12\x14.family.StoreRequest\x1a\x15.family.StoreResponse\x12\x35\n\nGetMessage\x12\x12.family.GetRequest\x1a\x13.family.GetResponse\x12I\n\x0cRegisterNode\x12\x1b.family.RegisterNodeRequest\x1a\x1c.family.RegisterNodeResponse\x12.\n\tListNodes\x12\r.family.Empty\x1a\x10.family.NodeInfo0\x01\x12\x34\n\x0cListMessages\x12\r.family.Empty\x1a\x13.family.ChatMessage0\x01\x12\x43\n\x12StoreMessageStream\x12\x14.family.MessageChunk\x1a\x15.family.StoreResponse(\x01\x12>\n\x10GetMessageStream\x12\x12.family.GetRequest\x1a\x14.family.MessageChunk0\x01\x12.\n\x0bGetIdFilter\x12\r.family.Empty\x1a\x10.family.IdFilter\x12:\n\x0cScanMessages\x12\x13.family.ScanRequest\x1a\x13.family.ChatMessage0\x01\x12=\n\rDeleteMessage\x12\x15.family.DeleteRequest\x1a\x15.family.StoreResponse\x12@\n\x10SnapshotMessages\x12\x13.family.ScanRequest\x1a\x15.family.SnapshotChunk0\x01\x12\x42\n\x0fInstallSnapshot\x12\x15.family.SnapshotChunk\x1a\x16.family.SnapshotResult(\x01\x62\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
@@ -32,25 +32,37 @@ _builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'family_pb2', _globals)
 if not _descriptor._USE_C_DESCRIPTORS:
   DESCRIPTOR._loaded_options = None
   _globals['_CHATMESSAGE']._serialized_start=24
-  _globals['_CHATMESSAGE']._serialized_end=74
-  _globals['_NODEINFO']._serialized_start=76
-  _globals['_NODEINFO']._serialized_end=148
-  _globals['_MESSAGENODES']._serialized_start=150
-  _globals['_MESSAGENODES']._serialized_end=217
-  _globals['_EMPTY']._serialized_start=219
-  _globals['_EMPTY']._serialized_end=226
-  _globals['_STOREREQUEST']._serialized_start=228
-  _globals['_STOREREQUEST']._serialized_end=285
-  _globals['_STORERESPONSE']._serialized_start=287
-  _globals['_STORERESPONSE']._serialized_end=374
-  _globals['_GETREQUEST']._serialized_start=376
-  _globals['_GETREQUEST']._serialized_end=408
-  _globals['_GETRESPONSE']._serialized_start=410
-  _globals['_GETRESPONSE']._serialized_end=514
-  _globals['_REGISTERNODEREQUEST']._serialized_start=516
-  _globals['_REGISTERNODEREQUEST']._serialized_end=574
-  _globals['_REGISTERNODERESPONSE']._serialized_start=576
-  _globals['_REGISTERNODERESPONSE']._serialized_end=630
-  _globals['_FAMILYSERVICE']._serialized_start=633
-  _globals['_FAMILYSERVICE']._serialized_end=941
+  _globals['_CHATMESSAGE']._serialized_end=91
+  _globals['_NODEINFO']._serialized_start=93
+  _globals['_NODEINFO']._serialized_end=165
+  _globals['_MESSAGENODES']._serialized_start=167
+  _globals['_MESSAGENODES']._serialized_end=234
+  _globals['_EMPTY']._serialized_start=236
+  _globals['_EMPTY']._serialized_end=243
+  _globals['_STOREREQUEST']._serialized_start=245
+  _globals['_STOREREQUEST']._serialized_end=346
+  _globals['_STORERESPONSE']._serialized_start=349
+  _globals['_STORERESPONSE']._serialized_end=483
+  _globals['_GETREQUEST']._serialized_start=485
+  _globals['_GETREQUEST']._serialized_end=517
+  _globals['_GETRESPONSE']._serialized_start=519
+  _globals['_GETRESPONSE']._serialized_end=623
+  _globals['_MESSAGECHUNK']._serialized_start=625
+  _globals['_MESSAGECHUNK']._serialized_end=693
+  _globals['_IDFILTER']._serialized_start=695
+  _globals['_IDFILTER']._serialized_end=754
+  _globals['_SCANREQUEST']._serialized_start=756
+  _globals['_SCANREQUEST']._serialized_end=829
+  _globals['_DELETEREQUEST']._serialized_start=831
+  _globals['_DELETEREQUEST']._serialized_end=866
+  _globals['_SNAPSHOTCHUNK']._serialized_start=868
+  _globals['_SNAPSHOTCHUNK']._serialized_end=897
+  _globals['_SNAPSHOTRESULT']._serialized_start=899
+  _globals['_SNAPSHOTRESULT']._serialized_end=943
+  _globals['_REGISTERNODEREQUEST']._serialized_start=945
+  _globals['_REGISTERNODEREQUEST']._serialized_end=1022
+  _globals['_REGISTERNODERESPONSE']._serialized_start=1024
+  _globals['_REGISTERNODERESPONSE']._serialized_end=1078
+  _globals['_FAMILYSERVICE']._serialized_start=1081
+  _globals['_FAMILYSERVICE']._serialized_end=1827
 # @@protoc_insertion_point(module_scope)
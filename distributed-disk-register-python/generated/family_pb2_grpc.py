@@ -60,6 +60,41 @@ class FamilyServiceStub(object):
                 request_serializer=family__pb2.Empty.SerializeToString,
                 response_deserializer=family__pb2.ChatMessage.FromString,
                 _registered_method=True)
+        self.StoreMessageStream = channel.stream_unary(
+                '/family.FamilyService/StoreMessageStream',
+                request_serializer=family__pb2.MessageChunk.SerializeToString,
+                response_deserializer=family__pb2.StoreResponse.FromString,
+                _registered_method=True)
+        self.GetMessageStream = channel.unary_stream(
+                '/family.FamilyService/GetMessageStream',
+                request_serializer=family__pb2.GetRequest.SerializeToString,
+                response_deserializer=family__pb2.MessageChunk.FromString,
+                _registered_method=True)
+        self.GetIdFilter = channel.unary_unary(
+                '/family.FamilyService/GetIdFilter',
+                request_serializer=family__pb2.Empty.SerializeToString,
+                response_deserializer=family__pb2.IdFilter.FromString,
+                _registered_method=True)
+        self.ScanMessages = channel.unary_stream(
+                '/family.FamilyService/ScanMessages',
+                request_serializer=family__pb2.ScanRequest.SerializeToString,
+                response_deserializer=family__pb2.ChatMessage.FromString,
+                _registered_method=True)
+        self.DeleteMessage = channel.unary_unary(
+                '/family.FamilyService/DeleteMessage',
+                request_serializer=family__pb2.DeleteRequest.SerializeToString,
+                response_deserializer=family__pb2.StoreResponse.FromString,
+                _registered_method=True)
+        self.SnapshotMessages = channel.unary_stream(
+                '/family.FamilyService/SnapshotMessages',
+                request_serializer=family__pb2.ScanRequest.SerializeToString,
+                response_deserializer=family__pb2.SnapshotChunk.FromString,
+                _registered_method=True)
+        self.InstallSnapshot = channel.stream_unary(
+                '/family.FamilyService/InstallSnapshot',
+                request_serializer=family__pb2.SnapshotChunk.SerializeToString,
+                response_deserializer=family__pb2.SnapshotResult.FromString,
+                _registered_method=True)
 
 
 class FamilyServiceServicer(object):
@@ -101,6 +136,55 @@ class FamilyServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def StoreMessageStream(self, request_iterator, context):
+        """Büyük mesajı parça parça kaydet
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def GetMessageStream(self, request, context):
+        """Büyük mesajı parça parça getir (mesaj yoksa boş stream)
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def GetIdFilter(self, request, context):
+        """Node'daki mesaj id'lerinin Bloom filtresini getir
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def ScanMessages(self, request, context):
+        """Id aralığındaki mesajları id sırasında getir (büyük mesajların payload'u boş gelir)
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def DeleteMessage(self, request, context):
+        """Mesajı sil (mesaj yoksa da başarılı döner)
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def SnapshotMessages(self, request, context):
+        """İstenen id'lerin (veya aralığın) mesajlarını büyük ardışık parçalar halinde getir
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def InstallSnapshot(self, request_iterator, context):
+        """Snapshot parçalarındaki mesajları toplu kaydet
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_FamilyServiceServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -129,6 +213,41 @@ def add_FamilyServiceServicer_to_server(servicer, server):
                     request_deserializer=family__pb2.Empty.FromString,
                     response_serializer=family__pb2.ChatMessage.SerializeToString,
             ),
+            'StoreMessageStream': grpc.stream_unary_rpc_method_handler(
+                    servicer.StoreMessageStream,
+                    request_deserializer=family__pb2.MessageChunk.FromString,
+                    response_serializer=family__pb2.StoreResponse.SerializeToString,
+            ),
+            'GetMessageStream': grpc.unary_stream_rpc_method_handler(
+                    servicer.GetMessageStream,
+                    request_deserializer=family__pb2.GetRequest.FromString,
+                    response_serializer=family__pb2.MessageChunk.SerializeToString,
+            ),
+            'GetIdFilter': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetIdFilter,
+                    request_deserializer=family__pb2.Empty.FromString,
+                    response_serializer=family__pb2.IdFilter.SerializeToString,
+            ),
+            'ScanMessages': grpc.unary_stream_rpc_method_handler(
+                    servicer.ScanMessages,
+                    request_deserializer=family__pb2.ScanRequest.FromString,
+                    response_serializer=family__pb2.ChatMessage.SerializeToString,
+            ),
+            'DeleteMessage': grpc.unary_unary_rpc_method_handler(
+                    servicer.DeleteMessage,
+                    request_deserializer=family__pb2.DeleteRequest.FromString,
+                    response_serializer=family__pb2.StoreResponse.SerializeToString,
+            ),
+            'SnapshotMessages': grpc.unary_stream_rpc_method_handler(
+                    servicer.SnapshotMessages,
+                    request_deserializer=family__pb2.ScanRequest.FromString,
+                    response_serializer=family__pb2.SnapshotChunk.SerializeToString,
+            ),
+            'InstallSnapshot': grpc.stream_unary_rpc_method_handler(
+                    servicer.InstallSnapshot,
+                    request_deserializer=family__pb2.SnapshotChunk.FromString,
+                    response_serializer=family__pb2.SnapshotResult.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'family.FamilyService', rpc_method_handlers)
@@ -275,3 +394,192 @@ class FamilyService(object):
             timeout,
             metadata,
             _registered_method=True)
+
+    @staticmethod
+    def StoreMessageStream(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_unary(
+            request_iterator,
+            target,
+            '/family.FamilyService/StoreMessageStream',
+            family__pb2.MessageChunk.SerializeToString,
+            family__pb2.StoreResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def GetMessageStream(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/family.FamilyService/GetMessageStream',
+            family__pb2.GetRequest.SerializeToString,
+            family__pb2.MessageChunk.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def GetIdFilter(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/family.FamilyService/GetIdFilter',
+            family__pb2.Empty.SerializeToString,
+            family__pb2.IdFilter.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def ScanMessages(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/family.FamilyService/ScanMessages',
+            family__pb2.ScanRequest.SerializeToString,
+            family__pb2.ChatMessage.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def DeleteMessage(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/family.FamilyService/DeleteMessage',
+            family__pb2.DeleteRequest.SerializeToString,
+            family__pb2.StoreResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def SnapshotMessages(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/family.FamilyService/SnapshotMessages',
+            family__pb2.ScanRequest.SerializeToString,
+            family__pb2.SnapshotChunk.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def InstallSnapshot(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_unary(
+            request_iterator,
+            target,
+            '/family.FamilyService/InstallSnapshot',
+            family__pb2.SnapshotChunk.SerializeToString,
+            family__pb2.SnapshotResult.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
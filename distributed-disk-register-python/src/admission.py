@@ -0,0 +1,92 @@
+import threading
+from concurrent import futures
+
+
+class AdmissionController:
+    """Istemci komutlari icin kabul kontrolu (admission control) ve geri basinc.
+
+    Komutlar sinirli bir thread havuzunda calisir. Havuz + kuyruk doluysa
+    yeni komut reddedilir ve istemciye BUSY <retry_after_ms> yaniti doner.
+    """
+
+    def __init__(self, max_workers=16, max_queue=64, per_conn_limit=16,
+                 max_connections=256, retry_after_ms=50):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.per_conn_limit = per_conn_limit
+        self.max_connections = max_connections
+        self.retry_after_ms = retry_after_ms
+        self.executor = futures.ThreadPoolExecutor(max_workers=max_workers,
+                                                   thread_name_prefix="istemci-komut")
+        self.lock = threading.Lock()
+        self.in_flight = 0  # Havuzda calisan + kuyrukta bekleyen komutlar
+        self.connections = 0
+        self.accepted = 0
+        self.rejected = 0
+        self.rejected_connections = 0
+        self.peak_queue_depth = 0
+
+    def try_acquire_connection(self):
+        """Global baglanti limitini kontrol eder, yer varsa baglantiyi sayar"""
+        with self.lock:
+            if self.connections >= self.max_connections:
+                self.rejected_connections += 1
+                return False
+            self.connections += 1
+            return True
+
+    def release_connection(self):
+        with self.lock:
+            self.connections -= 1
+
+    def try_acquire(self):
+        """Ucustaki komut limitinden bir yer ayirir; doluysa False (BUSY)"""
+        with self.lock:
+            if self.in_flight >= self.max_workers + self.max_queue:
+                self.rejected += 1
+                return False
+            self.in_flight += 1
+            self.accepted += 1
+            depth = self.in_flight - self.max_workers
+            if depth > self.peak_queue_depth:
+                self.peak_queue_depth = depth
+            return True
+
+    def release(self):
+        with self.lock:
+            self.in_flight -= 1
+
+    def try_submit(self, fn, *args):
+        """Komutu havuza gonderir; kuyruk doluysa None doner (BUSY)"""
+        if not self.try_acquire():
+            return None
+        future = self.executor.submit(fn, *args)
+        future.add_done_callback(self._on_done)
+        return future
+
+    def reject(self):
+        """Baglanti basina limit asildiginda reddi sayar"""
+        with self.lock:
+            self.rejected += 1
+
+    def _on_done(self, _future):
+        self.release()
+
+    def busy_reply(self):
+        return f"BUSY {self.retry_after_ms}\n".encode()
+
+    def queue_depth(self):
+        with self.lock:
+            return max(0, self.in_flight - self.max_workers)
+
+    def stats(self):
+        with self.lock:
+            return {
+                "in_flight": self.in_flight,
+                "queue_depth": max(0, self.in_flight - self.max_workers),
+                "peak_queue_depth": self.peak_queue_depth,
+                "connections": self.connections,
+                "accepted": self.accepted,
+                "rejected": self.rejected,
+                "rejected_connections": self.rejected_connections,
+            }
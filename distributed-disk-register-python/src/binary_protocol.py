@@ -0,0 +1,141 @@
+import struct
+
+# Baglantinin basinda istemci MAGIC gonderirse baglanti binary moda gecer,
+# sunucu ayni MAGIC ile onaylar. Aksi halde metin protokolu (SET/GET) kullanilir.
+MAGIC = b"HKB1"
+
+# Istek:  opcode(1) | flags(1) | message_id(int32) | payload_len(uint32) | payload
+# Yanit:  status(1) | flags(1) | message_id(int32) | payload_len(uint32) | payload
+HEADER = struct.Struct(">BBiI")
+HEADER_SIZE = HEADER.size
+
+OP_SET = 1
+OP_GET = 2
+OP_SCAN = 3  # payload: SCAN_REQUEST, message_id kullanilmaz
+OP_DEL = 4
+
+# Istek bayraklari
+FLAG_LOCAL = 1  # Worker'lar arasi: SCAN sadece hedef worker'in kendi partition'inda
+FLAG_TTL = 2  # SET: payload TTL_PREFIX (saniye) ile baslar, suresi dolunca mesaj silinir
+
+ST_OK = 0
+ST_VALUE = 1
+ST_NOT_FOUND = 2
+ST_ERROR = 3
+ST_BUSY = 4  # payload: retry_after_ms (uint32)
+
+# Tek cercevede kabul edilen en buyuk payload
+MAX_PAYLOAD = 64 * 1024 * 1024
+
+BUSY_PAYLOAD = struct.Struct(">I")
+TTL_PREFIX = struct.Struct(">I")
+
+# SCAN istegi: from_id(int32) | to_id(int32) | limit(uint32)
+SCAN_REQUEST = struct.Struct(">iiI")
+# SCAN yaniti (ST_VALUE payload'u): has_more(1) | next_from(int32) | count(uint32),
+# ardindan count kez: message_id(int32) | len(uint32) | veri
+SCAN_PAGE = struct.Struct(">BiI")
+SCAN_ITEM = struct.Struct(">iI")
+
+STATUS_NAMES = {ST_OK: "OK", ST_VALUE: "VALUE", ST_NOT_FOUND: "NOT_FOUND",
+                ST_ERROR: "ERROR", ST_BUSY: "BUSY"}
+
+
+class ProtocolError(Exception):
+    """Bozuk veya desteklenmeyen binary cerceve"""
+
+
+def encode_frame(code, msg_id, payload=b"", flags=0):
+    """Istek veya yanit cercevesini baytlara cevirir"""
+    return HEADER.pack(code, flags, msg_id, len(payload)) + payload
+
+
+def parse_frames(buffer, stream_threshold=None):
+    """Tampondaki tamamlanmis cerceveleri ayiklar.
+
+    (frames, kalan_tampon, buyuk_baslik) doner; frames (code, flags, msg_id,
+    payload) listesidir. stream_threshold verilirse bu esigi asan ilk
+    cercevenin basligi buyuk_baslik olarak doner ve kalan_tampon onun
+    payload'u ile baslar (payload bellege toplanmadan stream edilebilir).
+    """
+    frames = []
+    offset = 0
+    view = memoryview(buffer)
+    while len(buffer) - offset >= HEADER_SIZE:
+        code, flags, msg_id, length = HEADER.unpack_from(buffer, offset)
+        if stream_threshold is not None and length > stream_threshold:
+            return frames, buffer[offset + HEADER_SIZE:], (code, flags, msg_id, length)
+        if length > MAX_PAYLOAD:
+            raise ProtocolError(f"Payload cok buyuk: {length} bayt")
+        end = offset + HEADER_SIZE + length
+        if end > len(buffer):
+            break
+        frames.append((code, flags, msg_id, bytes(view[offset + HEADER_SIZE:end])))
+        offset = end
+    return frames, buffer[offset:], None
+
+
+def read_frame(rfile):
+    """Dosya benzeri nesneden tek bir cerceve okur; baglanti kapandiysa None"""
+    header = rfile.read(HEADER_SIZE)
+    if not header:
+        return None
+    if len(header) < HEADER_SIZE:
+        raise ConnectionError("Eksik cerceve basligi")
+    code, flags, msg_id, length = HEADER.unpack(header)
+    payload = rfile.read(length) if length else b""
+    if len(payload) < length:
+        raise ConnectionError("Eksik payload")
+    return code, flags, msg_id, payload
+
+
+def busy_payload(retry_after_ms):
+    return BUSY_PAYLOAD.pack(retry_after_ms)
+
+
+def parse_busy_payload(payload):
+    return BUSY_PAYLOAD.unpack(payload)[0] if len(payload) == BUSY_PAYLOAD.size else 50
+
+
+def encode_scan_request(start, end, limit):
+    return SCAN_REQUEST.pack(start, end, limit)
+
+
+def parse_scan_request(payload):
+    if len(payload) != SCAN_REQUEST.size:
+        raise ProtocolError("Gecersiz SCAN istegi")
+    return SCAN_REQUEST.unpack(payload)
+
+
+def encode_scan_page(items, next_from):
+    """(id, veri) listesini ve sonraki sayfanin baslangicini (yoksa None) kodlar"""
+    parts = [SCAN_PAGE.pack(next_from is not None, next_from or 0, len(items))]
+    for msg_id, data in items:
+        parts.append(SCAN_ITEM.pack(msg_id, len(data)))
+        parts.append(data)
+    return b"".join(parts)
+
+
+def parse_scan_page(payload):
+    """(items, next_from) doner; next_from None ise aralik bitti"""
+    has_more, next_from, count = SCAN_PAGE.unpack_from(payload)
+    offset = SCAN_PAGE.size
+    items = []
+    for _ in range(count):
+        msg_id, length = SCAN_ITEM.unpack_from(payload, offset)
+        offset += SCAN_ITEM.size
+        items.append((msg_id, bytes(payload[offset:offset + length])))
+        offset += length
+    return items, (next_from if has_more else None)
+
+
+def encode_ttl_payload(ttl, payload):
+    """FLAG_TTL'li SET payload'u: ttl(uint32, saniye) | mesaj"""
+    return TTL_PREFIX.pack(ttl) + payload
+
+
+def split_ttl(payload):
+    """FLAG_TTL'li SET payload'unu (ttl, mesaj) ikilisine ayirir"""
+    if len(payload) < TTL_PREFIX.size:
+        raise ProtocolError("TTL eksik")
+    return TTL_PREFIX.unpack_from(payload)[0], payload[TTL_PREFIX.size:]
@@ -0,0 +1,60 @@
+import hashlib
+import math
+import struct
+import threading
+
+_KEY = struct.Struct(">q")
+
+
+class BloomFilter:
+    """Mesaj id'leri icin Bloom filtresi.
+
+    "Yok" cevabi kesindir, "olabilir" cevabi error_rate olasilikla yanlistir.
+    Hash'ler process'ten bagimsizdir (blake2b), bu yuzden node'da olusturulan
+    bit dizisi lidere gonderilip orada sorgulanabilir.
+    """
+
+    def __init__(self, capacity=100000, error_rate=0.01, num_bits=None, num_hashes=None, bits=None):
+        capacity = max(1, capacity)
+        if num_bits is None:
+            num_bits = int(-capacity * math.log(error_rate) / (math.log(2) ** 2))
+        num_bits = max(8, (num_bits + 7) // 8 * 8)
+        if num_hashes is None:
+            num_hashes = max(1, round(num_bits / capacity * math.log(2)))
+        self.capacity = capacity
+        self.num_bits = num_bits
+        self.num_hashes = num_hashes
+        self.bits = bytearray(bits) if bits is not None else bytearray(num_bits // 8)
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def _positions(self, msg_id):
+        # Cift hash (Kirsch-Mitzenmacher): k konum iki 64 bit hash'ten turetilir
+        digest = hashlib.blake2b(_KEY.pack(msg_id), digest_size=16).digest()
+        h1, h2 = struct.unpack(">QQ", digest)
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def add(self, msg_id):
+        positions = self._positions(msg_id)
+        with self.lock:
+            for pos in positions:
+                self.bits[pos >> 3] |= 1 << (pos & 7)
+            self.count += 1
+
+    def __contains__(self, msg_id):
+        bits = self.bits
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(msg_id))
+
+    def is_full(self):
+        """Kapasite asildi mi? (yanlis pozitif orani hedefin ustune cikar)"""
+        return self.count > self.capacity
+
+    def to_bytes(self):
+        with self.lock:
+            return bytes(self.bits)
+
+    @classmethod
+    def from_bytes(cls, bits, num_hashes, count=0):
+        bloom = cls(capacity=max(1, count), num_bits=len(bits) * 8, num_hashes=num_hashes, bits=bits)
+        bloom.count = count
+        return bloom
@@ -0,0 +1,132 @@
+import itertools
+import threading
+
+import grpc
+
+from binary_protocol import MAX_PAYLOAD
+from generated import family_pb2_grpc
+
+# Mesajlar 1 MiB ustunde stream edilir; tek mesajlik RPC'ler (SCAN sayfasi,
+# Bloom filtresi) icin varsayilan 4 MB limiti yetmeyebilir
+MAX_MESSAGE_BYTES = MAX_PAYLOAD + 1024 * 1024
+
+# Bosta kalan baglantilar NAT/firewall tarafindan sessizce dusurulmesin; kopan
+# baglanti bir sonraki RPC'de degil keepalive ile fark edilsin
+KEEPALIVE_TIME_MS = 30000
+KEEPALIVE_TIMEOUT_MS = 10000
+
+# Birakilan kanallar hemen kapatilmaz: baska thread'lerin kilit altinda aldigi
+# stub'lar kapali kanalda ValueError atar. Bu sure icinde baslayan RPC'ler
+# normal calisir, sonrasinda kanal kapatilir (ucustaki RPC'ler iptal olur).
+RETIRE_GRACE = 30.0
+
+CHANNEL_OPTIONS = [
+    ("grpc.max_send_message_length", MAX_MESSAGE_BYTES),
+    ("grpc.max_receive_message_length", MAX_MESSAGE_BYTES),
+    ("grpc.keepalive_time_ms", KEEPALIVE_TIME_MS),
+    ("grpc.keepalive_timeout_ms", KEEPALIVE_TIMEOUT_MS),
+    ("grpc.keepalive_permit_without_calls", 1),
+    ("grpc.http2.max_pings_without_data", 0),
+]
+
+# Sunucu, istemcinin keepalive ping'lerini "too_many_pings" ile reddetmesin
+SERVER_OPTIONS = [
+    ("grpc.max_send_message_length", MAX_MESSAGE_BYTES),
+    ("grpc.max_receive_message_length", MAX_MESSAGE_BYTES),
+    ("grpc.keepalive_permit_without_calls", 1),
+    ("grpc.http2.min_recv_ping_interval_without_data_ms", KEEPALIVE_TIME_MS // 2),
+    ("grpc.http2.max_ping_strikes", 0),
+]
+
+
+def open_channel(addr, compression=None, index=0):
+    """Ayarli kanal acar.
+
+    Ayni adrese acilan kanallar varsayilan olarak tek TCP baglantisini
+    paylasir; index her kanala ayri alt kanal (baglanti) acilmasini saglar.
+    """
+    options = CHANNEL_OPTIONS + [("grpc.use_local_subchannel_pool", 1), ("hatokuse.channel_index", index)]
+    return grpc.insecure_channel(addr, options=options, compression=compression)
+
+
+class StubPool:
+    """Bir adrese acilmis birden fazla kanalin stub'lari; her RPC sirayla bir kanala gider.
+
+    FamilyServiceStub gibi kullanilir (pool.StoreMessage(...)).
+    """
+
+    def __init__(self, stubs):
+        self.stubs = stubs
+        self._next = itertools.count()
+
+    def __getattr__(self, name):
+        return getattr(self.stubs[next(self._next) % len(self.stubs)], name)
+
+
+class ChannelManager:
+    """Adres basina kanallari tutar; yeniden kayitta kanal yeniden kullanilir.
+
+    size > 1 ise yogun node'lara size adet ayri baglanti acilir (HTTP/2
+    baglantisi basina es zamanli stream limiti ve tek baglantinin
+    serilestirmesi asilir).
+    """
+
+    def __init__(self, size=1, compression=None, retire_grace=RETIRE_GRACE):
+        self.size = max(1, size)
+        self.compression = compression
+        self.retire_grace = retire_grace
+        self.pools = {}  # addr -> (kanallar, StubPool)
+        self.retired = {}  # Kapanmayi bekleyen kanal listesinin id'si -> (kanallar, Timer)
+        self.lock = threading.Lock()
+        self.opened = 0
+        self.reused = 0
+
+    def stub(self, addr):
+        with self.lock:
+            entry = self.pools.get(addr)
+            if entry is not None:
+                self.reused += 1
+                return entry[1]
+            channels = [open_channel(addr, self.compression, i) for i in range(self.size)]
+            pool = StubPool([family_pb2_grpc.FamilyServiceStub(c) for c in channels])
+            self.pools[addr] = (channels, pool)
+            self.opened += len(channels)
+            return pool
+
+    def close(self, addr):
+        """Adresin kanallarini birakir; retire_grace saniye sonra kapatilir.
+
+        Sonraki stub(addr) yeni kanal acar; eski stub'lar bu sure icinde
+        kullanilmaya devam edebilir.
+        """
+        with self.lock:
+            entry = self.pools.pop(addr, None)
+            if entry is None:
+                return
+            channels = entry[0]
+            timer = threading.Timer(self.retire_grace, self._close_retired, args=(id(channels),))
+            timer.daemon = True
+            self.retired[id(channels)] = (channels, timer)
+        timer.start()
+
+    def _close_retired(self, key):
+        with self.lock:
+            entry = self.retired.pop(key, None)
+        if entry:
+            for channel in entry[0]:
+                channel.close()
+
+    def close_all(self):
+        """Tum kanallari (birakilip kapanmayi bekleyenler dahil) hemen kapatir"""
+        with self.lock:
+            entries, self.pools = [channels for channels, _pool in self.pools.values()], {}
+            for channels, timer in self.retired.values():
+                timer.cancel()
+                entries.append(channels)
+            self.retired = {}
+        for channels in entries:
+            for channel in channels:
+                channel.close()
+
+    def __len__(self):
+        return len(self.pools)
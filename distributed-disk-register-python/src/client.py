@@ -1,20 +1,544 @@
+import asyncio
+import queue
 import socket
 import sys
+import time
+from concurrent import futures
+
+from binary_protocol import (FLAG_TTL, HEADER, MAGIC, OP_DEL, OP_GET, OP_SCAN, OP_SET, ST_BUSY,
+                             ST_NOT_FOUND, ST_OK, ST_VALUE, encode_frame, encode_scan_request,
+                             encode_ttl_payload, parse_busy_payload, parse_scan_page,
+                             read_frame)
+
+NOT_FOUND_REPLY = "ERROR: Mesaj bulunamadi"
+
+
+class ClientError(Exception):
+    """Liderin ERROR yaniti veya baglanti hatasi"""
+
+
+class BusyError(ClientError):
+    """Lider asiri yuklu (BUSY) ve tekrar deneme hakki bitti.
+
+    Toplu komutlarda results tamamlanan komutlarin sonuclarini ({id: sonuc}),
+    failed hala BUSY kalan id'leri tasir; sadece failed tekrar gonderilir.
+    """
+
+    def __init__(self, retry_after_ms, results=None, failed=()):
+        super().__init__(f"Lider mesgul, {retry_after_ms} ms sonra tekrar deneyin")
+        self.retry_after_ms = retry_after_ms
+        self.results = results if results is not None else {}
+        self.failed = list(failed)
+
+
+def _set_line(msg_id, message, ttl=None):
+    if "\n" in message:
+        raise ValueError("Metin protokolunde mesaj satir sonu iceremez")
+    if ttl:
+        return f"SETEX {msg_id} {int(ttl)} {message}\n".encode()
+    return f"SET {msg_id} {message}\n".encode()
+
+
+def _get_line(msg_id):
+    return f"GET {msg_id}\n".encode()
+
+
+def _del_line(msg_id):
+    return f"DEL {msg_id}\n".encode()
+
+
+def _scan_line(start, end, limit):
+    return f"SCAN {start} {end} {limit}\n".encode()
+
+
+def _parse_scan_lines(lines):
+    """ITEM <id> <mesaj> ... END <sonraki|-> satirlarini (items, next_from) ikilisine cevirir"""
+    items = []
+    for line in lines[:-1]:
+        parts = line.rstrip("\n").split(" ", 2)
+        if len(parts) != 3 or parts[0] != "ITEM" or not parts[1].lstrip("-").isdigit():
+            raise ConnectionError(f"Bozuk SCAN satiri: {line[:40]!r}")
+        items.append((int(parts[1]), parts[2]))
+    next_from = lines[-1].split()[1]
+    return "SCAN", (items, None if next_from == "-" else int(next_from))
+
+
+def _parse_reply(reply):
+    """Yanit satirini (status, deger) ikilisine cevirir.
+
+    Taninmayan satir yanit sirasinin kaydigini gosterir (ör. satir sonu iceren
+    deger); ConnectionError ile baglanti atilir, sonraki komutlara yanlis
+    yanit eslenmez.
+    """
+    reply = reply.rstrip("\n")
+    if reply == "OK":
+        return "OK", None
+    if reply.startswith("VALUE "):
+        return "VALUE", reply[6:]
+    if reply.startswith("BUSY"):
+        parts = reply.split()
+        return "BUSY", int(parts[1]) if len(parts) > 1 else 50
+    if reply == NOT_FOUND_REPLY:
+        return "NOT_FOUND", None
+    if reply.startswith("ERROR"):
+        return "ERROR", reply
+    raise ConnectionError(f"Beklenmeyen yanit satiri: {reply[:40]!r}")
+
+
+def _set_frame(msg_id, message, ttl=None):
+    payload = message if isinstance(message, (bytes, bytearray)) else message.encode()
+    if ttl:
+        return encode_frame(OP_SET, msg_id, encode_ttl_payload(int(ttl), bytes(payload)), FLAG_TTL)
+    return encode_frame(OP_SET, msg_id, bytes(payload))
+
+
+def _get_frame(msg_id):
+    return encode_frame(OP_GET, msg_id)
+
+
+def _del_frame(msg_id):
+    return encode_frame(OP_DEL, msg_id)
+
+
+def _scan_frame(start, end, limit):
+    return encode_frame(OP_SCAN, 0, encode_scan_request(start, end, limit))
+
+
+def _parse_frame(status, payload):
+    """Binary yanit cercevesini (status, deger) ikilisine cevirir"""
+    if status == ST_OK:
+        return "OK", None
+    if status == ST_VALUE:
+        return "VALUE", payload
+    if status == ST_BUSY:
+        return "BUSY", parse_busy_payload(payload)
+    if status == ST_NOT_FOUND:
+        return "NOT_FOUND", None
+    return "ERROR", payload.decode(errors="replace")
+
+
+def _scan_result(reply):
+    """SCAN yanitini (items, next_from) ikilisine cevirir"""
+    status, value = _check_busy(reply)
+    if status == "SCAN":
+        return value
+    if status == "VALUE":
+        return parse_scan_page(value)
+    raise ClientError(value)
+
+
+def _check_busy(reply):
+    """Tekli komut: tekrar denemelerden sonra hala BUSY ise BusyError atar"""
+    if reply[0] == "BUSY":
+        raise BusyError(reply[1])
+    return reply
+
+
+def _batch_result(keys, replies, convert):
+    """Toplu komut yanitlarini {id: convert(status, deger)} sozlugune cevirir.
+
+    Hala BUSY kalan komut varsa tamamlananlarin sonuclari kaybolmaz; kismi
+    sonuc ve BUSY kalan id'ler BusyError ile birlikte doner.
+    """
+    results = {}
+    failed = []
+    retry_after = 0
+    for key, (status, value) in zip(keys, replies):
+        if status == "BUSY":
+            failed.append(key)
+            retry_after = max(retry_after, value)
+        else:
+            results[key] = convert(status, value)
+    if failed:
+        raise BusyError(retry_after, results, failed)
+    return results
+
+
+def _check_handshake(ack):
+    if ack == MAGIC:
+        return
+    if ack.startswith(b"BUSY"):
+        raise BusyError(50)
+    raise ClientError("Lider binary protokolu onaylamadi")
+
+
+def _chunks(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+class _Connection:
+    """Lidere tek bir TCP baglantisi; satir veya cerceve bazli pipelining yapar"""
+
+    def __init__(self, host, port, timeout, binary=False):
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.rfile = self.sock.makefile("rb")
+        self.binary = binary
+        if binary:
+            self.sock.sendall(MAGIC)
+            try:
+                _check_handshake(self.rfile.read(len(MAGIC)))
+            except ClientError:
+                self.close()
+                raise
+
+    def roundtrip(self, lines, deadline):
+        """Komutlari tek seferde gonderir, yanitlari ayni sirayla okur"""
+        self.sock.settimeout(max(deadline - time.monotonic(), 0.001))
+        self.sock.sendall(b"".join(lines))
+        replies = []
+        for _ in lines:
+            self.sock.settimeout(max(deadline - time.monotonic(), 0.001))
+            if self.binary:
+                frame = read_frame(self.rfile)
+                if frame is None:
+                    raise ConnectionError("Lider baglantiyi kapatti")
+                replies.append(_parse_frame(frame[0], frame[3]))
+                continue
+            line = self.rfile.readline()
+            if not line.endswith(b"\n"):  # Bos: baglanti kapandi; yarim satir: yanit kesildi
+                raise ConnectionError("Lider baglantiyi kapatti")
+            if line.startswith((b"ITEM ", b"END ")):
+                # SCAN yaniti: END satirina kadar okunur
+                scan_lines = [line.decode(errors="replace")]
+                while not line.startswith(b"END "):
+                    line = self.rfile.readline()
+                    if not line.endswith(b"\n"):
+                        raise ConnectionError("Lider baglantiyi kapatti")
+                    scan_lines.append(line.decode(errors="replace"))
+                replies.append(_parse_scan_lines(scan_lines))
+                continue
+            replies.append(_parse_reply(line.decode(errors="replace")))
+        return replies
+
+    def close(self):
+        try:
+            self.rfile.close()
+            self.sock.close()
+        except OSError:
+            pass
+
+
+class HaToKuSeClient:
+    """Lider icin baglanti havuzlu, pipelining yapan senkron istemci.
+
+    binary=True ile uzunluk onekli binary protokol kullanilir; mesajlar bytes
+    olabilir (satir sonu dahil) ve GET sonucu bytes doner.
+
+    Ornek:
+        with HaToKuSeClient() as c:
+            c.set(1, "Merhaba")
+            c.set(9, "gecici", ttl=60)  # 60 sn sonra silinir
+            c.set_many({2: "a", 3: "b"})
+            print(c.get_many([1, 2, 3]))
+    """
+
+    def __init__(self, host="localhost", port=6666, pool_size=4, timeout=5.0,
+                 pipeline_depth=16, busy_retries=5, binary=False):
+        self.host = host
+        self.port = port
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.binary = binary
+        self._set_cmd = _set_frame if binary else _set_line
+        self._get_cmd = _get_frame if binary else _get_line
+        self._del_cmd = _del_frame if binary else _del_line
+        self._scan_cmd = _scan_frame if binary else _scan_line
+        # Liderin baglanti basina ucustaki komut limitini (--conn-inflight) asmamali
+        self.pipeline_depth = pipeline_depth
+        self.busy_retries = busy_retries
+        self.idle = queue.LifoQueue()
+        self.executor = futures.ThreadPoolExecutor(max_workers=pool_size,
+                                                   thread_name_prefix="hatokuse-istemci")
+
+    def _acquire(self):
+        try:
+            return self.idle.get_nowait()
+        except queue.Empty:
+            return _Connection(self.host, self.port, self.timeout, self.binary)
+
+    def _release(self, conn):
+        if self.idle.qsize() < self.pool_size:
+            self.idle.put(conn)
+        else:
+            conn.close()
+
+    def _execute(self, lines, deadline):
+        """Komut grubunu bir baglantida calistirir; sadece BUSY olanlari bekleyip yeniden dener.
+
+        Deneme hakki/sure biterse BUSY kalanlarin yaniti ("BUSY", ms) olarak doner.
+        """
+        results = [None] * len(lines)
+        pending = list(range(len(lines)))
+        for attempt in range(self.busy_retries + 1):
+            conn = self._acquire()
+            try:
+                replies = conn.roundtrip([lines[i] for i in pending], deadline)
+            except (OSError, ValueError) as e:
+                conn.close()  # Yarida kalan pipeline'dan sonra baglanti kullanilamaz
+                raise ClientError(f"Baglanti hatasi: {e}") from e
+            self._release(conn)
+
+            busy = []
+            retry_after = 0
+            for i, reply in zip(pending, replies):
+                results[i] = reply
+                if reply[0] == "BUSY":
+                    busy.append(i)
+                    retry_after = max(retry_after, reply[1])
+            if not busy:
+                return results
+            if attempt == self.busy_retries or time.monotonic() + retry_after / 1000 > deadline:
+                return results
+            time.sleep(retry_after / 1000)
+            pending = busy
+        return results
+
+    def _run_batch(self, lines, timeout):
+        deadline = time.monotonic() + (self.timeout if timeout is None else timeout)
+        groups = list(_chunks(lines, self.pipeline_depth))
+        if len(groups) == 1:
+            return self._execute(groups[0], deadline)
+        jobs = [self.executor.submit(self._execute, group, deadline) for group in groups]
+        results = []
+        for job in jobs:
+            results.extend(job.result())
+        return results
+
+    def set(self, msg_id, message, timeout=None, ttl=None):
+        """ttl (saniye) verilirse mesaj suresi dolunca silinir"""
+        status, value = _check_busy(self._run_batch([self._set_cmd(msg_id, message, ttl)], timeout)[0])
+        if status != "OK":
+            raise ClientError(value)
+
+    def get(self, msg_id, timeout=None):
+        """Mesaji doner; bulunamazsa None"""
+        status, value = _check_busy(self._run_batch([self._get_cmd(msg_id)], timeout)[0])
+        if status == "ERROR":
+            raise ClientError(value)
+        return value
+
+    def set_many(self, items, timeout=None, ttl=None):
+        """Toplu SET; {id: True/hata mesaji} doner.
+
+        Bazi komutlar hala BUSY ise BusyError atilir; e.results tamamlananlari,
+        e.failed tekrar gonderilmesi gereken id'leri icerir.
+        """
+        items = list(items.items() if isinstance(items, dict) else items)
+        replies = self._run_batch([self._set_cmd(i, m, ttl) for i, m in items], timeout)
+        return _batch_result([msg_id for msg_id, _ in items], replies,
+                             lambda status, value: True if status == "OK" else value)
+
+    def get_many(self, ids, timeout=None):
+        """Toplu GET; {id: mesaj veya None} doner (BUSY kalirsa set_many gibi BusyError)"""
+        ids = list(ids)
+        replies = self._run_batch([self._get_cmd(i) for i in ids], timeout)
+        return _batch_result(ids, replies, lambda status, value: value if status == "VALUE" else None)
+
+    def delete(self, msg_id, timeout=None):
+        """Mesaji siler; mesaj yoksa False"""
+        status, value = _check_busy(self._run_batch([self._del_cmd(msg_id)], timeout)[0])
+        if status == "ERROR":
+            raise ClientError(value)
+        return status == "OK"
+
+    def delete_many(self, ids, timeout=None):
+        """Toplu DEL; {id: silindiyse True} doner (BUSY kalirsa set_many gibi BusyError)"""
+        ids = list(ids)
+        replies = self._run_batch([self._del_cmd(i) for i in ids], timeout)
+        return _batch_result(ids, replies, lambda status, _value: status == "OK")
+
+    def scan(self, start, end, limit=100, timeout=None):
+        """[start, end] araligindaki mesajlar, id sirasinda.
+
+        (items, next_from) doner; items [(id, mesaj), ...], next_from sonraki
+        sayfanin baslangici (aralik bittiyse None).
+        """
+        return _scan_result(self._run_batch([self._scan_cmd(start, end, limit)], timeout)[0])
+
+    def scan_iter(self, start, end, page_size=100, timeout=None):
+        """Araligi sayfa sayfa gezerek (id, mesaj) ikililerini uretir"""
+        while start is not None:
+            items, start = self.scan(start, end, page_size, timeout)
+            yield from items
+
+    def close(self):
+        self.executor.shutdown(wait=False)
+        while True:
+            try:
+                self.idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class AsyncHaToKuSeClient:
+    """HaToKuSeClient'in asyncio karsiligi (ayni havuz ve pipelining mantigi)"""
+
+    def __init__(self, host="localhost", port=6666, pool_size=4, timeout=5.0,
+                 pipeline_depth=16, busy_retries=5, binary=False):
+        self.host = host
+        self.port = port
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.binary = binary
+        self._set_cmd = _set_frame if binary else _set_line
+        self._get_cmd = _get_frame if binary else _get_line
+        self._del_cmd = _del_frame if binary else _del_line
+        self._scan_cmd = _scan_frame if binary else _scan_line
+        self.pipeline_depth = pipeline_depth
+        self.busy_retries = busy_retries
+        self.idle = []
+        self.slots = asyncio.Semaphore(pool_size)
+
+    async def _roundtrip(self, lines):
+        async with self.slots:
+            if self.idle:
+                reader, writer = self.idle.pop()
+            else:
+                reader, writer = await asyncio.open_connection(self.host, self.port)
+                if self.binary:
+                    writer.write(MAGIC)
+                    try:
+                        _check_handshake(await reader.readexactly(len(MAGIC)))
+                    except (ClientError, asyncio.IncompleteReadError):
+                        writer.close()
+                        raise
+            try:
+                writer.write(b"".join(lines))
+                await writer.drain()
+                replies = []
+                for _ in lines:
+                    if self.binary:
+                        status, _flags, _msg_id, length = HEADER.unpack(
+                            await reader.readexactly(HEADER.size))
+                        replies.append(_parse_frame(status, await reader.readexactly(length)))
+                        continue
+                    line = await reader.readline()
+                    if not line.endswith(b"\n"):
+                        raise ConnectionError("Lider baglantiyi kapatti")
+                    if line.startswith((b"ITEM ", b"END ")):
+                        scan_lines = [line.decode(errors="replace")]
+                        while not line.startswith(b"END "):
+                            line = await reader.readline()
+                            if not line.endswith(b"\n"):
+                                raise ConnectionError("Lider baglantiyi kapatti")
+                            scan_lines.append(line.decode(errors="replace"))
+                        replies.append(_parse_scan_lines(scan_lines))
+                        continue
+                    replies.append(_parse_reply(line.decode(errors="replace")))
+            except BaseException:
+                # Iptal/timeout sonrasi yarim kalan pipeline'li baglanti atilir
+                writer.close()
+                raise
+            self.idle.append((reader, writer))
+            return replies
+
+    async def _execute(self, lines):
+        results = [None] * len(lines)
+        pending = list(range(len(lines)))
+        for attempt in range(self.busy_retries + 1):
+            try:
+                replies = await self._roundtrip([lines[i] for i in pending])
+            except (OSError, asyncio.IncompleteReadError) as e:
+                raise ClientError(f"Baglanti hatasi: {e}") from e
+            busy = []
+            retry_after = 0
+            for i, reply in zip(pending, replies):
+                results[i] = reply
+                if reply[0] == "BUSY":
+                    busy.append(i)
+                    retry_after = max(retry_after, reply[1])
+            if not busy or attempt == self.busy_retries:
+                return results
+            await asyncio.sleep(retry_after / 1000)
+            pending = busy
+        return results
+
+    async def _run_batch(self, lines, timeout):
+        groups = list(_chunks(lines, self.pipeline_depth))
+        batch = asyncio.gather(*(self._execute(group) for group in groups))
+        try:
+            grouped = await asyncio.wait_for(batch, self.timeout if timeout is None else timeout)
+        except asyncio.TimeoutError as e:
+            raise ClientError("Zaman asimi") from e
+        return [reply for group in grouped for reply in group]
+
+    async def set(self, msg_id, message, timeout=None, ttl=None):
+        replies = await self._run_batch([self._set_cmd(msg_id, message, ttl)], timeout)
+        status, value = _check_busy(replies[0])
+        if status != "OK":
+            raise ClientError(value)
+
+    async def get(self, msg_id, timeout=None):
+        status, value = _check_busy((await self._run_batch([self._get_cmd(msg_id)], timeout))[0])
+        if status == "ERROR":
+            raise ClientError(value)
+        return value
+
+    async def set_many(self, items, timeout=None, ttl=None):
+        items = list(items.items() if isinstance(items, dict) else items)
+        replies = await self._run_batch([self._set_cmd(i, m, ttl) for i, m in items], timeout)
+        return _batch_result([msg_id for msg_id, _ in items], replies,
+                             lambda status, value: True if status == "OK" else value)
+
+    async def get_many(self, ids, timeout=None):
+        ids = list(ids)
+        replies = await self._run_batch([self._get_cmd(i) for i in ids], timeout)
+        return _batch_result(ids, replies, lambda status, value: value if status == "VALUE" else None)
+
+    async def delete(self, msg_id, timeout=None):
+        status, value = _check_busy((await self._run_batch([self._del_cmd(msg_id)], timeout))[0])
+        if status == "ERROR":
+            raise ClientError(value)
+        return status == "OK"
+
+    async def delete_many(self, ids, timeout=None):
+        ids = list(ids)
+        replies = await self._run_batch([self._del_cmd(i) for i in ids], timeout)
+        return _batch_result(ids, replies, lambda status, _value: status == "OK")
+
+    async def scan(self, start, end, limit=100, timeout=None):
+        return _scan_result((await self._run_batch([self._scan_cmd(start, end, limit)], timeout))[0])
+
+    async def scan_iter(self, start, end, page_size=100, timeout=None):
+        while start is not None:
+            items, start = await self.scan(start, end, page_size, timeout)
+            for item in items:
+                yield item
+
+    async def close(self):
+        while self.idle:
+            _, writer = self.idle.pop()
+            writer.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
 
 def run_client(port=6666):
     try:
         # Lidere (Socket üzerinden) baglan
         s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         s.connect(('localhost', port))
-        
+
         print(f"--- Istemci (TCP Socket) Baslatildi (Port: {port}) ---")
-        print("Komutlar: SET <id> <mesaj>, GET <id>, EXIT")
+        print("Komutlar: SET <id> <mesaj>, SETEX <id> <saniye> <mesaj>, GET <id>, DEL <id>, SCAN <baslangic> <bitis> [limit], EXIT")
 
         while True:
             cmd = input("> ")
             if cmd.upper() == "EXIT": break
-            
-            s.sendall(cmd.encode())
+
+            s.sendall((cmd + "\n").encode())
             response = s.recv(1024).decode()
             print(f"Sunucu Yaniti: {response}")
 
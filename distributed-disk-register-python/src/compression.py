@@ -0,0 +1,166 @@
+import bz2
+import lzma
+import struct
+import threading
+import zlib
+
+import grpc
+
+# Opsiyonel codec'ler: kurulu degilse sadece listede gorunmezler
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:
+    lz4_frame = None
+
+# Sikistirilmis payload basligi: MAGIC(3) | codec(1) | orijinal_boyut(uint64)
+# 0x89 gecerli bir UTF-8 baslangic bayti olmadigi icin metin mesajlarla karismaz;
+# MAGIC ile baslayan binary payload'lar "none" codec'i ile sarilarak kacirilir.
+MAGIC = b"\x89HZ"
+HEADER = struct.Struct(">3sBQ")
+HEADER_SIZE = HEADER.size
+
+CODEC_IDS = {"none": 0, "zlib": 1, "bz2": 2, "lzma": 3, "zstd": 4, "lz4": 5}
+CODEC_NAMES = {v: k for k, v in CODEC_IDS.items()}
+
+DEFAULT_LEVELS = {"zlib": 6, "bz2": 9, "lzma": 6, "zstd": 3, "lz4": 0}
+
+GRPC_COMPRESSION = {"none": grpc.Compression.NoCompression,
+                    "gzip": grpc.Compression.Gzip,
+                    "deflate": grpc.Compression.Deflate}
+
+
+def available_codecs():
+    """Bu ortamda kullanilabilen codec isimleri"""
+    codecs = ["none", "zlib", "bz2", "lzma"]
+    if zstandard:
+        codecs.append("zstd")
+    if lz4_frame:
+        codecs.append("lz4")
+    return codecs
+
+
+def _compress(codec, data, level):
+    if codec == "zlib":
+        return zlib.compress(data, level)
+    if codec == "bz2":
+        return bz2.compress(data, level)
+    if codec == "lzma":
+        return lzma.compress(data, preset=level)
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=level).compress(data)
+    if codec == "lz4":
+        return lz4_frame.compress(data, compression_level=level)
+    raise ValueError(f"Bilinmeyen codec: {codec}")
+
+
+def _decompress(codec, data):
+    if codec == "zlib":
+        return zlib.decompress(data)
+    if codec == "bz2":
+        return bz2.decompress(data)
+    if codec == "lzma":
+        return lzma.decompress(data)
+    if codec == "zstd":
+        return zstandard.ZstdDecompressor().decompress(data)
+    if codec == "lz4":
+        return lz4_frame.decompress(data)
+    raise ValueError(f"Bilinmeyen codec: {codec}")
+
+
+def wrap(data):
+    """Payload'u "none" codec basligi ile sarar (kacirma icin)"""
+    return HEADER.pack(MAGIC, CODEC_IDS["none"], len(data)) + data
+
+
+def decode(data):
+    """Saklanan payload'u istemciye gidecek orijinal baytlara cevirir"""
+    if len(data) < HEADER_SIZE or not data.startswith(MAGIC):
+        return data
+    _magic, codec_id, size = HEADER.unpack_from(data)
+    body = data[HEADER_SIZE:]
+    if codec_id == CODEC_IDS["none"]:
+        return body
+    codec = CODEC_NAMES.get(codec_id)
+    if codec is None:
+        raise ValueError(f"Bilinmeyen codec id: {codec_id}")
+    out = _decompress(codec, body)
+    if len(out) != size:
+        raise ValueError("Sikistirilmis payload bozuk (boyut uyusmuyor)")
+    return out
+
+
+def escape_stream(length, chunks):
+    """Stream edilen (sikistirilmayan) payload MAGIC ile basliyorsa "none" basligi ekler.
+
+    (yeni_uzunluk, parcalar) doner; parcalar bellege toplanmadan aktarilir.
+    """
+    chunks = iter(chunks)
+    head = b""
+    for data in chunks:
+        head += data
+        if len(head) >= len(MAGIC):
+            break
+    escaped = head.startswith(MAGIC)
+
+    def gen():
+        if escaped:
+            yield HEADER.pack(MAGIC, CODEC_IDS["none"], length)
+        if head:
+            yield head
+        yield from chunks
+
+    return (length + HEADER_SIZE if escaped else length), gen()
+
+
+def stream_header_size(head):
+    """Stream ile okunan saklanmis payload'un atlanacak baslik boyu.
+
+    Stream yolu sikistirma kullanmaz; sadece "none" kacirma basligi olabilir.
+    """
+    if len(head) < HEADER_SIZE or not head.startswith(MAGIC):
+        return 0
+    if head[len(MAGIC)] != CODEC_IDS["none"]:
+        raise ValueError("Sikistirilmis payload stream ile okunamaz")
+    return HEADER_SIZE
+
+
+class Compressor:
+    """Lider tarafinda replikasyondan once bir kez uygulanan sikistirma.
+
+    min_size'dan kucuk veya sikistirinca kuculmeyen payload'lar oldugu gibi
+    saklanir. Node'lar baytlari yorumlamadan saklar; acma islemi sadece
+    istemci okurken (decode) yapilir.
+    """
+
+    def __init__(self, codec="none", level=None, min_size=256):
+        if codec not in available_codecs():
+            raise ValueError(f"Codec kullanilamiyor: {codec} (mevcut: {', '.join(available_codecs())})")
+        self.codec = codec
+        self.level = DEFAULT_LEVELS.get(codec, 0) if level is None else level
+        self.min_size = min_size
+        self.lock = threading.Lock()
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def encode(self, data):
+        """Payload'u saklanacak bicime cevirir"""
+        out = None
+        if self.codec != "none" and len(data) >= self.min_size:
+            compressed = _compress(self.codec, data, self.level)
+            if len(compressed) + HEADER_SIZE < len(data):
+                out = HEADER.pack(MAGIC, CODEC_IDS[self.codec], len(data)) + compressed
+        if out is None:
+            out = wrap(data) if data.startswith(MAGIC) else data
+        with self.lock:
+            self.bytes_in += len(data)
+            self.bytes_out += len(out)
+        return out
+
+    def ratio(self):
+        with self.lock:
+            return self.bytes_out / self.bytes_in if self.bytes_in else 1.0
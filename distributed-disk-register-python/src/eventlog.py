@@ -0,0 +1,168 @@
+import atexit
+import itertools
+import json
+import sys
+import threading
+import time
+from collections import deque
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+LEVELS = {"debug": DEBUG, "info": INFO, "warning": WARNING, "error": ERROR}
+LEVEL_NAMES = {value: name for name, value in LEVELS.items()}
+LOG_FORMATS = ("text", "json")
+
+WRITE_BATCH = 4096  # Writer'in tek seferde yazdigi en fazla kayit
+IDLE_INTERVAL = 0.05  # Tampon bosken writer'in bekleme suresi (sn)
+
+
+class EventLog:
+    """Sicak yoldan ayrilmis, halka tamponlu yapisal log.
+
+    Cagiran thread sadece kaydi (seviye, bilesen, olay, alanlar) sinirli bir
+    deque'ye ekler; bicimlendirme ve stdout'a yazma arka plandaki writer
+    thread'inde yapilir. Tampon doluysa en eski kayit duser, cagiran hic
+    beklemez. Mesaj basina olaylar sampled() ile her N olaydan biri olarak
+    kaydedilir.
+
+    Kayit aninda gecerli sys.stdout saklanir; redirect_stdout ile susturulan
+    bloklarin kayitlari sonradan da susturulmus kalir.
+    """
+
+    def __init__(self, level=INFO, sample=1, fmt="text", capacity=65536):
+        self.level = level
+        self.sample = max(1, sample)
+        self.fmt = fmt
+        self.buffer = deque(maxlen=capacity)
+        self.counters = {}  # olay -> itertools.count (ornekleme sayaci)
+        self.written = 0
+        self.dropped = 0  # Tampon doluyken ustune yazilan (kaybolan) kayitlar
+        self.sampled_out = 0  # Ornekleme nedeniyle kaydedilmeyen olaylar
+        self.write_errors = 0
+        self.closed = False
+        self.thread = threading.Thread(target=self._run, name="eventlog-writer", daemon=True)
+        self.thread.start()
+
+    def configure(self, level="info", sample=1, fmt="text", capacity=None):
+        """Seviye/ornekleme/bicim ayarlari (process basinda, yuk gelmeden once cagrilir)"""
+        self.level = LEVELS[level] if isinstance(level, str) else level
+        self.sample = max(1, sample)
+        self.fmt = fmt
+        if capacity and capacity != self.buffer.maxlen:
+            old = self.buffer
+            self.buffer = deque(old, maxlen=capacity)
+
+    def enabled(self, level):
+        return level >= self.level
+
+    def log(self, level, component, event, message, **fields):
+        """Kaydi tampona ekler; bicimlendirme writer thread'inde yapilir"""
+        if level < self.level:
+            return
+        buffer = self.buffer
+        if len(buffer) == buffer.maxlen:
+            self.dropped += 1
+        buffer.append((time.time(), level, component, event, message, fields, 1, sys.stdout))
+
+    def sampled(self, level, component, event, message, **fields):
+        """Mesaj basina (sicak yol) olay: her sample olaydan sadece biri kaydedilir"""
+        if level < self.level:
+            return
+        sample = self.sample
+        if sample > 1:
+            counter = self.counters.get(event)
+            if counter is None:
+                counter = self.counters.setdefault(event, itertools.count())
+            if next(counter) % sample:
+                self.sampled_out += 1
+                return
+        buffer = self.buffer
+        if len(buffer) == buffer.maxlen:
+            self.dropped += 1
+        buffer.append((time.time(), level, component, event, message, fields, sample, sys.stdout))
+
+    def debug(self, component, event, message, **fields):
+        self.log(DEBUG, component, event, message, **fields)
+
+    def info(self, component, event, message, **fields):
+        self.log(INFO, component, event, message, **fields)
+
+    def warning(self, component, event, message, **fields):
+        self.log(WARNING, component, event, message, **fields)
+
+    def error(self, component, event, message, **fields):
+        self.log(ERROR, component, event, message, **fields)
+
+    # --- writer ---
+
+    def _format(self, record):
+        ts, level, component, event, message, fields, sample, _stream = record
+        try:
+            text = message.format(**fields) if fields else message
+        except (KeyError, IndexError, ValueError):
+            text = f"{message} {fields}"
+        if self.fmt == "json":
+            entry = {"ts": round(ts, 6), "level": LEVEL_NAMES.get(level, level), "component": component,
+                     "event": event, "msg": text}
+            entry.update(fields)
+            if sample > 1:
+                entry["sample"] = sample  # Sayim yapan okuyucu icin olay agirligi
+            return json.dumps(entry, ensure_ascii=False, default=str)
+        return f"[{component}] {text}"
+
+    def _drain(self):
+        buffer = self.buffer
+        batch = []
+        try:
+            while len(batch) < WRITE_BATCH:
+                batch.append(buffer.popleft())
+        except IndexError:
+            pass
+        return batch
+
+    def _write(self, batch):
+        # Ardisik ayni hedefli kayitlar tek write ile yazilir
+        for stream, records in itertools.groupby(batch, key=lambda r: r[7]):
+            lines = [self._format(r) for r in records]
+            try:
+                stream.write("\n".join(lines) + "\n")
+                stream.flush()
+                self.written += len(lines)
+            except (OSError, ValueError):
+                # Kapali/kopmus cikis (ör. pipe okuyucusu gitti): kayitlar atilir
+                self.write_errors += len(lines)
+
+    def _run(self):
+        while True:
+            batch = self._drain()
+            if batch:
+                self._write(batch)
+            elif self.closed:
+                return
+            else:
+                time.sleep(IDLE_INTERVAL)
+
+    def flush(self, timeout=2.0):
+        """Tampondaki kayitlarin yazilmasini bekler (en fazla timeout sn)"""
+        deadline = time.monotonic() + timeout
+        while self.buffer and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def close(self, timeout=2.0):
+        self.closed = True
+        self.thread.join(timeout)
+
+    def stats(self):
+        return {"written": self.written, "dropped": self.dropped, "sampled_out": self.sampled_out,
+                "pending": len(self.buffer), "write_errors": self.write_errors}
+
+
+# Process genelinde tek log; main.py ayarlari configure() ile verir
+log = EventLog()
+atexit.register(log.close)
+
+
+def configure(level="info", sample=1, fmt="text", capacity=None):
+    log.configure(level=level, sample=sample, fmt=fmt, capacity=capacity)
@@ -0,0 +1,81 @@
+import heapq
+import threading
+import time
+
+
+class ExpiryIndex:
+    """TTL'li mesajlarin son kullanma zamanlari (min-heap).
+
+    Heap'te (expires_at, msg_id) tutulur; TTL degisince veya mesaj silinince
+    eski heap kaydi yerinde birakilir ve pop sirasinda atlanir (lazy silme).
+    """
+
+    def __init__(self):
+        self.heap = []
+        self.deadlines = {}  # msg_id -> expires_at (epoch saniye)
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.deadlines)
+
+    def set(self, msg_id, expires_at):
+        with self.lock:
+            self.deadlines[msg_id] = expires_at
+            heapq.heappush(self.heap, (expires_at, msg_id))
+            if len(self.heap) > 2 * len(self.deadlines) + 1024:
+                self._compact()
+
+    def discard(self, msg_id):
+        with self.lock:
+            self.deadlines.pop(msg_id, None)
+
+    def get(self, msg_id):
+        """Mesajin son kullanma zamani; TTL yoksa None"""
+        return self.deadlines.get(msg_id)
+
+    def is_expired(self, msg_id, now=None):
+        expires_at = self.deadlines.get(msg_id)
+        return expires_at is not None and expires_at <= (time.time() if now is None else now)
+
+    def pop_expired(self, now=None, limit=100):
+        """Suresi dolmus en fazla limit id'yi indeksten cikarip doner"""
+        now = time.time() if now is None else now
+        expired = []
+        with self.lock:
+            heap = self.heap
+            while heap and heap[0][0] <= now and len(expired) < limit:
+                expires_at, msg_id = heapq.heappop(heap)
+                if self.deadlines.get(msg_id) == expires_at:
+                    del self.deadlines[msg_id]
+                    expired.append(msg_id)
+        return expired
+
+    def _compact(self):
+        self.heap = [(t, msg_id) for msg_id, t in self.deadlines.items()]
+        heapq.heapify(self.heap)
+
+
+class TokenBucket:
+    """Saniyede rate islem, en fazla burst birikmeli basit hiz sinirlayici"""
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.burst = burst or max(1, int(rate))
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, n=1):
+        """n jeton alinana kadar bekler; rate <= 0 ise sinirsiz"""
+        if self.rate <= 0:
+            return
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= n:
+                    self.tokens -= n
+                    return
+                wait = (n - self.tokens) / self.rate
+            time.sleep(wait)
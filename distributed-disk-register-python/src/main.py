@@ -6,6 +6,7 @@ import argparse
 sys.path.append(os.path.abspath(os.path.dirname(__file__)))
 import server
 import node
+from compression import available_codecs
 
 def main():
     parser = argparse.ArgumentParser(description="Distributed Disk Register - HaToKuSe Sistemi")
@@ -15,8 +16,67 @@ def main():
     parser.add_argument("--id", type=int, help="Node ID'si (sadece node modu için)")
     parser.add_argument("--io-mode", type=str, default="buffered", choices=["buffered", "unbuffered"],
                         help="IO modu (sadece node için)")
+    parser.add_argument("--client-workers", type=int, default=16,
+                        help="İstemci komutlarını işleyen thread sayısı (sadece lider için)")
+    parser.add_argument("--client-queue", type=int, default=64,
+                        help="Havuz doluyken bekleyebilecek komut sayısı, aşılırsa BUSY (sadece lider için)")
+    parser.add_argument("--conn-inflight", type=int, default=16,
+                        help="Bağlantı başına aynı anda işlenebilecek komut sayısı (sadece lider için)")
+    parser.add_argument("--max-connections", type=int, default=256,
+                        help="Aynı anda kabul edilen istemci bağlantısı sayısı (sadece lider için)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Lider worker process sayısı; >1 ise portlar SO_REUSEPORT ile paylaşılır (sadece lider için)")
+    parser.add_argument("--read-strategy", type=str, default="p2c", choices=["p2c", "least", "ordered"],
+                        help="GET için replika seçimi: p2c (power-of-two-choices), least (en düşük skor), ordered (metadata sırası)")
+    parser.add_argument("--compression", type=str, default="none", choices=available_codecs(),
+                        help="Mesajların node'lara gönderilmeden önce sıkıştırılması (sadece lider için)")
+    parser.add_argument("--compression-level", type=int, default=None,
+                        help="Sıkıştırma seviyesi, verilmezse codec'in varsayılanı (sadece lider için)")
+    parser.add_argument("--compression-min-size", type=int, default=256,
+                        help="Bu boyuttan (bayt) küçük mesajlar sıkıştırılmaz (sadece lider için)")
+    parser.add_argument("--grpc-compression", type=str, default="none", choices=["none", "gzip", "deflate"],
+                        help="Lider-node arası gRPC kanal sıkıştırması")
+    parser.add_argument("--grpc-workers", type=int, default=10,
+                        help="gRPC sunucusunun eş zamanlı RPC işleyen thread sayısı")
+    parser.add_argument("--channels-per-node", type=int, default=1,
+                        help="Liderin her node'a açtığı gRPC bağlantı sayısı; RPC'ler sırayla dağıtılır (sadece lider için)")
+    parser.add_argument("--filter-sync-interval", type=int, default=30,
+                        help="Node id filtrelerinin (Bloom) yenilenme aralığı, saniye; 0 ise sadece kayıtta (sadece lider için)")
+    parser.add_argument("--storage-layout", type=str, default="flat", choices=["flat", "sharded"],
+                        help="Mesaj dosyalarının yerleşimi: flat (tek klasör) veya sharded (hash'li alt klasörler); "
+                             "klasör diğer yerleşimdeyse dosyalar arka planda taşınır")
+    parser.add_argument("--dedup", action="store_true",
+                        help="İçerik adresli depolama: aynı içerik diskte bir kez saklanır; lider içeriği zaten tutan node'a sadece özetini gönderir")
+    parser.add_argument("--gc-rate", type=int, default=500,
+                        help="Silinen/süresi dolan mesajlar için saniyede en fazla dosya/RPC silme sayısı; 0 ise sınırsız (sadece lider için)")
+    parser.add_argument("--tombstone-grace", type=int, default=3600,
+                        help="Silinen mesajın tombstone'unun tutulma süresi, saniye; çevrimdışı node'lar bu sürede dönerse kopyaları silinir (sadece lider için)")
+    parser.add_argument("--memtable-mb", type=int, default=0,
+                        help="Write-behind memtable bellek limiti (MB); 0 ise her yazma senkron diske gider (sadece node için)")
+    parser.add_argument("--memtable-flush-kb", type=int, default=4096,
+                        help="Memtable bu boyuta (KB) ulaşınca diske yazılır (sadece node için)")
+    parser.add_argument("--memtable-flush-interval", type=float, default=1.0,
+                        help="Memtable en fazla bu kadar saniye bellekte bekler (sadece node için)")
+    parser.add_argument("--wal", type=str, default="on", choices=["off", "on", "fsync"],
+                        help="Memtable yazmaları için WAL: off, on (işletim sistemine yazılır), fsync (her kayıtta fsync)")
+    parser.add_argument("--bootstrap", action="store_true",
+                        help="Boş (yeni veya yerine gelen) node'u kayıtta sahip olması gereken mesajların toplu snapshot'ı ile doldur (sadece node için)")
+    parser.add_argument("--log-level", type=str, default="info", choices=["debug", "info", "warning", "error"],
+                        help="Log seviyesi; mesaj başına senkronizasyon olayları debug seviyesindedir")
+    parser.add_argument("--log-sample", type=int, default=1,
+                        help="Mesaj başına olaylardan (kayıt, silme, istemci bağlantısı) her N olaydan sadece biri loglanır")
+    parser.add_argument("--log-format", type=str, default="text", choices=["text", "json"],
+                        help="Log biçimi: text (okunur satırlar) veya json (satır başına bir JSON kayıt)")
+    parser.add_argument("--log-buffer", type=int, default=65536,
+                        help="Log halka tamponu kapasitesi (kayıt); doluysa en eski kayıtlar düşer, yazan thread beklemez")
+    parser.add_argument("--bloom-capacity", type=int, default=100000,
+                        help="Id filtresinin başlangıç kapasitesi, aşılınca büyütülür (sadece node için)")
+    parser.add_argument("--bloom-error-rate", type=float, default=0.01,
+                        help="Id filtresinin hedef yanlış pozitif oranı (sadece node için)")
     
     args = parser.parse_args()
+    log_options = {"level": args.log_level, "sample": args.log_sample, "fmt": args.log_format,
+                   "capacity": args.log_buffer}
 
     print("=" * 60)
     print("     DAĞITIK MESAJ KAYIT SİSTEMİ (HaToKuSe)")
@@ -26,7 +86,18 @@ def main():
         if args.mode == "leader":
             print("\n[MOD] Lider (Koordinatör/Beyin) başlatılıyor...")
             grpc_port = args.port or "5550"
-            server.serve(grpc_port=grpc_port, socket_port=6666)
+            server.serve(grpc_port=grpc_port, socket_port=6666,
+                         client_workers=args.client_workers, client_queue=args.client_queue,
+                         conn_inflight=args.conn_inflight, max_connections=args.max_connections,
+                         workers=args.workers, read_strategy=args.read_strategy,
+                         compression=args.compression, compression_level=args.compression_level,
+                         compression_min_size=args.compression_min_size,
+                         grpc_compression=args.grpc_compression,
+                         filter_sync_interval=args.filter_sync_interval,
+                         storage_layout=args.storage_layout,
+                         gc_rate=args.gc_rate, tombstone_grace=args.tombstone_grace,
+                         grpc_workers=args.grpc_workers, channels_per_node=args.channels_per_node,
+                         dedup=args.dedup, log_options=log_options)
         
         elif args.mode == "node":
             if not args.id or not args.port:
@@ -34,7 +105,13 @@ def main():
                 print("Örnek: python main.py --mode node --id 1 --port 50061")
                 sys.exit(1)
             print(f"\n[MOD] Node (İşçi) başlatılıyor... ID={args.id}, Port={args.port}")
-            node.serve(args.id, args.port, io_mode=args.io_mode)
+            node.serve(args.id, args.port, io_mode=args.io_mode, grpc_compression=args.grpc_compression,
+                       bloom_capacity=args.bloom_capacity, bloom_error_rate=args.bloom_error_rate,
+                       storage_layout=args.storage_layout, memtable_bytes=args.memtable_mb * 1024 * 1024,
+                       memtable_flush_bytes=args.memtable_flush_kb * 1024,
+                       memtable_flush_interval=args.memtable_flush_interval, wal=args.wal,
+                       grpc_workers=args.grpc_workers, bootstrap=args.bootstrap, dedup=args.dedup,
+                       log_options=log_options)
     
     except KeyboardInterrupt:
         print("\n\n[BİLGİ] Sistem kapatılıyor...")
@@ -0,0 +1,277 @@
+import os
+import struct
+import threading
+import time
+import zlib
+
+from eventlog import log
+
+# WAL kaydi: message_id(int32) | payload_len(uint32) | crc32(uint32) | payload
+WAL_RECORD = struct.Struct(">iII")
+WAL_DELETE = 0xFFFFFFFF  # payload_len bu degerse kayit silme (tombstone), payload yok
+
+
+def _seq_of(name):
+    """'wal-<seq>.log' segment adindan sira numarasi; uymuyorsa None"""
+    if name.startswith("wal-") and name.endswith(".log"):
+        try:
+            return int(name[4:-4])
+        except ValueError:
+            return None
+    return None
+
+
+def wal_segments(directory):
+    """Klasordeki WAL segment yollari (eskiden yeniye)"""
+    names = sorted((_seq_of(n), n) for n in os.listdir(directory) if _seq_of(n) is not None)
+    return [os.path.join(directory, n) for _seq, n in names]
+
+
+class WriteAheadLog:
+    """Memtable'a alinan yazmalarin diske sirayla eklendigi log.
+
+    Her memtable icin ayri bir segment dosyasi (wal-<seq>.log) tutulur;
+    memtable diske yazilinca segmenti silinir. Process coktugunde
+    kalan segmentler acilista replay edilir.
+    """
+
+    def __init__(self, directory, sync=False):
+        self.directory = directory
+        self.sync = sync  # True: her kayitta fsync (en guvenli, en yavas)
+        os.makedirs(directory, exist_ok=True)
+        self.seq = max((_seq_of(n) for n in os.listdir(directory) if _seq_of(n) is not None),
+                       default=0)
+        self.f = None
+        self.path = None
+        self.rotate()
+
+    def rotate(self):
+        """Yeni segmente gecer; onceki segmentin yolunu doner"""
+        previous = self.path
+        if self.f:
+            self.f.close()
+        self.seq += 1
+        self.path = os.path.join(self.directory, f"wal-{self.seq:08d}.log")
+        self.f = open(self.path, "ab")
+        return previous
+
+    def append(self, msg_id, data):
+        """data None ise silme kaydi yazilir"""
+        if data is None:
+            self.f.write(WAL_RECORD.pack(msg_id, WAL_DELETE, 0))
+        else:
+            self.f.write(WAL_RECORD.pack(msg_id, len(data), zlib.crc32(data)))
+            self.f.write(data)
+        self.f.flush()
+        if self.sync:
+            os.fsync(self.f.fileno())
+
+    def close(self):
+        if self.f:
+            self.f.close()
+            self.f = None
+
+    @staticmethod
+    def replay(path):
+        """Segmentteki (msg_id, payload) kayitlari; yarim kalan son kayit atlanir.
+
+        Silme kayitlari (msg_id, None) olarak doner.
+        """
+        with open(path, "rb") as f:
+            while True:
+                header = f.read(WAL_RECORD.size)
+                if len(header) < WAL_RECORD.size:
+                    return
+                msg_id, length, crc = WAL_RECORD.unpack(header)
+                if length == WAL_DELETE:
+                    yield msg_id, None
+                    continue
+                data = f.read(length)
+                if len(data) < length or zlib.crc32(data) != crc:
+                    return
+                yield msg_id, data
+
+
+class _Table:
+    def __init__(self, wal_path=None):
+        self.entries = {}
+        self.bytes = 0
+        self.created = time.monotonic()
+        self.wal_path = wal_path
+
+
+class WriteBehindStore:
+    """MessageStore onunde yazmayi bellekte toplayan katman (memtable).
+
+    StoreMessage bellege ekleyip (ve WAL'a yazip) hemen doner; arka plan
+    thread'i memtable flush_bytes'a ulasinca veya flush_interval saniye
+    dolunca diske yazar. Bellekteki toplam bayt max_bytes ile sinirlidir;
+    flush geride kalirsa yazanlar bekler (geri basinc).
+    """
+
+    def __init__(self, store, max_bytes=64 * 1024 * 1024, flush_bytes=4 * 1024 * 1024,
+                 flush_interval=1.0, wal_dir=None, wal_sync=False):
+        self.store = store
+        self.max_bytes = max_bytes
+        self.flush_bytes = flush_bytes
+        self.flush_interval = flush_interval
+        self.cond = threading.Condition()
+        self.wal = None
+        if wal_dir:
+            self._recover(wal_dir)
+            self.wal = WriteAheadLog(wal_dir, sync=wal_sync)
+        self.active = _Table(self.wal.path if self.wal else None)
+        self.flushing = []  # Diske yazilmakta olan (donmus) tablolar, eskiden yeniye
+        self.total_bytes = 0
+        self.flushed = 0
+        self.stalls = 0  # Geri basinc nedeniyle bekleyen yazma sayisi
+        self.closed = False
+        self.thread = threading.Thread(target=self._flush_loop, name="memtable-flush", daemon=True)
+        self.thread.start()
+
+    def _recover(self, wal_dir):
+        """Onceki calismadan kalan WAL segmentlerini diske yazar"""
+        if not os.path.isdir(wal_dir):
+            return
+        recovered = 0
+        for path in wal_segments(wal_dir):
+            for msg_id, data in WriteAheadLog.replay(path):
+                if data is None:
+                    self.store.remove(msg_id)
+                else:
+                    self.store.write(msg_id, data)
+                recovered += 1
+            os.remove(path)
+        if recovered:
+            log.info("MEMTABLE", "wal_recovered", "WAL'dan {count} kayit kurtarildi", count=recovered)
+
+    # --- yazma / okuma ---
+
+    def put(self, msg_id, data):
+        with self.cond:
+            # Geri basinc: bellek limiti dolduysa flush'in yer acmasini bekle
+            stalled = False
+            while self.total_bytes and self.total_bytes + len(data) > self.max_bytes:
+                if not stalled:
+                    stalled = True
+                    self.stalls += 1
+                self.cond.notify_all()  # Flush thread'ini hemen uyandir
+                self.cond.wait(0.5)
+            if self.wal:
+                self.wal.append(msg_id, data)
+            table = self.active
+            old = table.entries.get(msg_id)
+            if old is not None:
+                table.bytes -= len(old)
+                self.total_bytes -= len(old)
+            table.entries[msg_id] = data
+            table.bytes += len(data)
+            self.total_bytes += len(data)
+            if table.bytes >= self.flush_bytes:
+                self.cond.notify_all()
+
+    def delete(self, msg_id):
+        """Mesaji bellekten atar; diske inmekte olan eski deger varsa once o biter.
+
+        Diskteki dosyayi silmek cagirana kalir; WAL'a silme kaydi yazildigi icin
+        replay silinen degeri geri getirmez.
+        """
+        with self.cond:
+            while any(msg_id in t.entries for t in self.flushing):
+                self.cond.wait(0.5)
+            if self.wal:
+                self.wal.append(msg_id, None)
+            data = self.active.entries.pop(msg_id, None)
+            if data is not None:
+                self.active.bytes -= len(data)
+                self.total_bytes -= len(data)
+                self.cond.notify_all()
+
+    def get(self, msg_id):
+        """Bellekteki en guncel deger; yoksa None (diskten okunmali)"""
+        with self.cond:
+            data = self.active.entries.get(msg_id)
+            if data is not None:
+                return data
+            for table in reversed(self.flushing):
+                data = table.entries.get(msg_id)
+                if data is not None:
+                    return data
+        return None
+
+    def snapshot(self):
+        """Bellekteki tum (msg_id, payload) ciftleri (en guncel deger)"""
+        with self.cond:
+            merged = {}
+            for table in self.flushing:
+                merged.update(table.entries)
+            merged.update(self.active.entries)
+            return merged
+
+    def wait_flushed(self, msg_id):
+        """msg_id bellekte kalmayana kadar bekler.
+
+        Memtable'i atlayan dogrudan yazmalardan (stream) once cagrilir; yoksa
+        sonradan diske yazilan eski deger yeni degeri ezebilirdi.
+        """
+        with self.cond:
+            while msg_id in self.active.entries or any(msg_id in t.entries for t in self.flushing):
+                self.active.created = 0  # Yas esigini hemen dolmus say
+                self.cond.notify_all()
+                self.cond.wait(0.5)
+
+    # --- flush ---
+
+    def _should_flush(self):
+        table = self.active
+        if not table.entries:
+            return False
+        if self.closed or table.bytes >= self.flush_bytes or self.total_bytes >= self.max_bytes:
+            return True
+        return time.monotonic() - table.created >= self.flush_interval
+
+    def _flush_loop(self):
+        while True:
+            with self.cond:
+                while not self._should_flush():
+                    if self.closed:
+                        return
+                    self.cond.wait(self.flush_interval / 2 or 0.05)
+                table = self.active
+                self.flushing.append(table)
+                new_wal = None
+                if self.wal:
+                    self.wal.rotate()
+                    new_wal = self.wal.path
+                self.active = _Table(new_wal)
+            for msg_id, data in table.entries.items():
+                self.store.write(msg_id, data)
+            with self.cond:
+                self.flushing.remove(table)
+                self.total_bytes -= table.bytes
+                self.flushed += len(table.entries)
+                self.cond.notify_all()
+            if table.wal_path:
+                os.remove(table.wal_path)
+
+    def close(self):
+        """Kalan tum kayitlari diske yazar ve flush thread'ini durdurur"""
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+        self.thread.join()
+        if self.wal:
+            self.wal.close()
+            # Aktif tablo bos; bos segment birakma
+            if os.path.exists(self.wal.path) and os.path.getsize(self.wal.path) == 0:
+                os.remove(self.wal.path)
+
+    def stats(self):
+        with self.cond:
+            return {
+                "entries": len(self.active.entries) + sum(len(t.entries) for t in self.flushing),
+                "bytes": self.total_bytes,
+                "flushing": len(self.flushing),
+                "flushed": self.flushed,
+                "stalls": self.stalls,
+            }
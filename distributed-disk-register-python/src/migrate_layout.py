@@ -0,0 +1,48 @@
+"""
+Mesaj klasorlerini flat <-> sharded yerlesim arasinda tasir.
+
+Offline: node/lider kapaliyken calistirilir, klasoru tek seferde tasir.
+    python src/migrate_layout.py storage_node_1 --to sharded
+
+Online: process'i yeni yerlesimle (--storage-layout sharded) baslatmak yeterlidir;
+okumalar eski yerlesime de bakar ve dosyalar arka planda tasinir. Bu arac online
+gecisi hizlandirmak icin calisan bir process'in klasorunde de kullanilabilir
+(os.link ile tasidigi icin yeni yazilan degerleri ezmez).
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+from storage import LAYOUTS, MessageStore
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mesaj klasoru yerlesim gecisi (flat <-> sharded)")
+    parser.add_argument("dirs", nargs="+", help="Tasinacak klasorler (storage_node_<id>, leader_messages/...)")
+    parser.add_argument("--to", type=str, default="sharded", choices=sorted(LAYOUTS),
+                        help="Hedef yerlesim")
+    parser.add_argument("--batch", type=int, default=1000, help="Ilerleme/bekleme araligi (dosya)")
+    parser.add_argument("--pause", type=float, default=0.0,
+                        help="Her batch sonrasi bekleme (sn); online geciste disk yukunu sinirlar")
+    args = parser.parse_args()
+
+    for directory in args.dirs:
+        if not os.path.isdir(directory):
+            print(f"[HATA] Klasor bulunamadi: {directory}")
+            continue
+        store = MessageStore(directory, layout=args.to)
+        if not store.legacy:
+            print(f"[MIGRATE] {directory}: zaten {args.to} ({store.count} mesaj)")
+            continue
+        print(f"[MIGRATE] {directory}: {store.legacy.name} -> {args.to}, {store.count} mesaj")
+        start = time.time()
+        moved = store.migrate(batch=args.batch, pause=args.pause,
+                              progress=lambda n: print(f"  {n} mesaj tasindi", end="\r"))
+        print(f"\n[MIGRATE] {directory}: {moved} mesaj {time.time() - start:.2f} sn'de tasindi")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,7 @@ import grpc
 from concurrent import futures
 import sys
 import os
+import signal
 import threading
 import time
 
@@ -12,95 +13,340 @@ sys.path.append(os.path.join(base_dir, 'generated'))
 
 from generated import family_pb2
 from generated import family_pb2_grpc
+from compression import GRPC_COMPRESSION
+from bloom import BloomFilter
+from channels import SERVER_OPTIONS, open_channel
+from eventlog import INFO, configure as configure_log, log
+from memtable import WriteBehindStore
+from snapshot import RecordReader, pack_records
+from sorted_index import MAX_ID, MIN_ID, SortedIdIndex
+from storage import MessageStore, content_hash
+from streaming import CHUNK_SIZE, STREAM_THRESHOLD, iter_file_chunks
 
 class WorkerNode(family_pb2_grpc.FamilyServiceServicer):
-    def __init__(self, node_id, storage_dir, io_mode="buffered"):
+    def __init__(self, node_id, storage_dir, io_mode="buffered", bloom_capacity=100000,
+                 bloom_error_rate=0.01, storage_layout="flat", memtable_bytes=0,
+                 memtable_flush_bytes=4 * 1024 * 1024, memtable_flush_interval=1.0, wal="on",
+                 dedup=False):
         self.node_id = node_id
+        self.log_name = f"NODE {node_id}"  # Log bileseni (sicak yolda her seferinde olusturulmasin)
         self.storage_dir = storage_dir
         self.io_mode = io_mode  # "buffered" veya "unbuffered"
-        if not os.path.exists(storage_dir):
-            os.makedirs(storage_dir)
+        # dedup: ayni icerik diskte bir kez saklanir (mesaj dosyalari ortak blob'a link)
+        self.store = MessageStore(storage_dir, layout=storage_layout,
+                                  unbuffered=(io_mode == "unbuffered"), dedup=dedup)
+        if self.store.legacy:
+            # Klasor baska yerlesimde: okumalar eski yerlesime de bakar, dosyalar arka planda tasinir
+            threading.Thread(target=self._migrate_layout, daemon=True).start()
+        # Write-behind memtable: yazma bellege alinip hemen onaylanir, arka planda diske yazilir
+        self.memtable = None
+        if memtable_bytes > 0:
+            wal_dir = os.path.join(storage_dir, "wal") if wal != "off" else None
+            self.memtable = WriteBehindStore(self.store, max_bytes=memtable_bytes,
+                                             flush_bytes=memtable_flush_bytes,
+                                             flush_interval=memtable_flush_interval,
+                                             wal_dir=wal_dir, wal_sync=(wal == "fsync"))
+        # Saklanan id'lerin sirali indeksi (ScanMessages) ve Bloom filtresi
+        # (lider GET'te bu node'u atlayip atlamayacagina filtreyle karar verir)
+        self.index = SortedIdIndex(self.store.ids())
+        self.bloom_error_rate = bloom_error_rate
+        self.filter_lock = threading.Lock()
+        self.filter_deletes = 0  # Filtre olusturulduktan sonra silinen id sayisi
+        self.id_filter = self._build_id_filter(bloom_capacity)
+
+    def _migrate_layout(self):
+        legacy = self.store.legacy.name
+        log.info(self.log_name, "migrate_start", "{legacy} -> {layout} yerlesim gecisi basladi",
+                 legacy=legacy, layout=self.store.layout.name)
+        moved = self.store.migrate(pause=0.05)
+        log.info(self.log_name, "migrate_done", "Yerlesim gecisi tamamlandi: {moved} mesaj tasindi", moved=moved)
+
+    def _build_id_filter(self, capacity):
+        """Indeksteki (disk + memtable) id'lerden filtreyi olusturur"""
+        ids = self.index.range(MIN_ID, MAX_ID)
+        self.filter_deletes = 0
+        id_filter = BloomFilter(max(capacity, 2 * len(ids)), self.bloom_error_rate)
+        for msg_id in ids:
+            id_filter.add(msg_id)
+        return id_filter
+
+    def _remember(self, msg_id):
+        """Kaydedilen mesaji indekse ve filtreye ekler; kapasite asilirsa filtre buyutulur"""
+        self.index.add(msg_id)
+        with self.filter_lock:
+            self.id_filter.add(msg_id)
+            if self.id_filter.is_full():
+                self.id_filter = self._build_id_filter(2 * self.id_filter.capacity)
 
     def StoreMessage(self, request, context):
         msg = request.chat_message
-        file_path = os.path.join(self.storage_dir, f"{msg.message_id}.txt")
+        # Ham baytlar; eski lider sadece message (string) alanini doldurur
+        payload = msg.payload or msg.message.encode()
+        digest = request.content_hash
+        if request.content_only:
+            return self._store_by_hash(msg.message_id, digest)
+        if self.store.dedup and not digest:
+            digest = content_hash(payload)
         
-        if self.io_mode == "unbuffered":
-            # Unbuffered IO: Doğrudan işletim sistemi çağrısı
-            fd = os.open(file_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC)
-            os.write(fd, msg.message.encode())
-            os.close(fd)
-            print(f"[NODE {self.node_id}] Mesaj kaydedildi (UNBUFFERED): ID={msg.message_id}")
+        if self.memtable:
+            self.memtable.put(msg.message_id, payload)
+            mode = "MEMTABLE"
         else:
-            # Buffered IO: Python'un standart buffered write
-            with open(file_path, "w", buffering=8192) as f:
-                f.write(msg.message)
-            print(f"[NODE {self.node_id}] Mesaj kaydedildi (BUFFERED): ID={msg.message_id}")
+            # Unbuffered: doğrudan os.write, Buffered: Python'un standart buffered write
+            self.store.write(msg.message_id, payload)
+            mode = self.io_mode.upper()
+        log.sampled(INFO, self.log_name, "store", "Mesaj kaydedildi ({mode}): ID={id}", mode=mode, id=msg.message_id)
         
-        return family_pb2.StoreResponse(success=True)
+        self._remember(msg.message_id)
+        # Dedup kapaliysa ozet donulmez; lider bu node'a hep payload gonderir
+        return family_pb2.StoreResponse(success=True, content_hash=digest if self.store.dedup else b"")
+
+    def _store_by_hash(self, msg_id, digest):
+        """Sadece ozetle gelen yazma: icerik depoda varsa ona baglanir, yoksa lider payload'u yollar"""
+        if self.memtable:
+            # Memtable'daki yazma diske ayni sirayla insin diye icerik okunup kuyruga alinir
+            payload = self.store.read_content(digest)
+            if payload is None:
+                return family_pb2.StoreResponse(success=False, missing_content=True)
+            self.memtable.put(msg_id, payload)
+        else:
+            if not self.store.link_content(msg_id, digest):
+                return family_pb2.StoreResponse(success=False, missing_content=True)
+        log.sampled(INFO, self.log_name, "store", "Mesaj kaydedildi ({mode}): ID={id}", mode="DEDUP", id=msg_id)
+        self._remember(msg_id)
+        return family_pb2.StoreResponse(success=True, content_hash=digest)
+
+    def _read(self, msg_id):
+        """Once memtable'a (henuz diske yazilmamis olabilir), sonra diske bakar"""
+        if self.memtable:
+            content = self.memtable.get(msg_id)
+            if content is not None:
+                return content
+        return self.store.read(msg_id)
 
     def GetMessage(self, request, context):
         msg_id = request.message_id
-        file_path = os.path.join(self.storage_dir, f"{msg_id}.txt")
-        if os.path.exists(file_path):
-            with open(file_path, "r") as f:
-                content = f.read()
+        content = self._read(msg_id)
+        if content is not None:
             return family_pb2.GetResponse(
-                chat_message=family_pb2.ChatMessage(message_id=msg_id, message=content),
+                chat_message=family_pb2.ChatMessage(message_id=msg_id, payload=content),
                 found=True
             )
         return family_pb2.GetResponse(found=False)
 
+    def StoreMessageStream(self, request_iterator, context):
+        """Buyuk mesaji parca parca diske yazar; bellekte tamami tutulmaz"""
+        out = None
+        msg_id = None
+        try:
+            for chunk in request_iterator:
+                if out is None:
+                    msg_id = chunk.message_id
+                    if self.memtable:
+                        # Bellekteki eski deger sonradan yeni degerin ustune yazilmasin
+                        self.memtable.wait_flushed(msg_id)
+                    out = self.store.open_incremental(msg_id)
+                out.write(chunk.data)
+        except Exception:
+            if out:
+                out.abort()
+            raise
+        if out is None:
+            return family_pb2.StoreResponse(success=False, error="Bos stream")
+        out.commit()
+        self._remember(msg_id)
+        log.sampled(INFO, self.log_name, "store_stream", "Mesaj kaydedildi (STREAM, {size} bayt): ID={id}",
+                    size=out.size, id=msg_id)
+        digest = out.hasher.digest() if self.store.dedup else b""
+        return family_pb2.StoreResponse(success=True, content_hash=digest)
+
+    def GetMessageStream(self, request, context):
+        """Mesaji parca parca gonderir; ilk parca toplam boyutu tasir, yoksa bos stream"""
+        msg_id = request.message_id
+        if self.memtable:
+            content = self.memtable.get(msg_id)
+            if content is not None:
+                yield family_pb2.MessageChunk(message_id=msg_id, data=content, total_size=len(content))
+                return
+        file_path = self.store.locate(msg_id)
+        if file_path is None:
+            return
+        try:
+            total = os.path.getsize(file_path)
+            chunks = iter_file_chunks(file_path, chunk_size=CHUNK_SIZE)
+            first = next(chunks, b"")
+        except FileNotFoundError:
+            return
+        yield family_pb2.MessageChunk(message_id=msg_id, data=first, total_size=total)
+        for data in chunks:
+            yield family_pb2.MessageChunk(message_id=msg_id, data=data)
+
+    def GetIdFilter(self, request, context):
+        """Saklanan id'lerin Bloom filtresini lidere gonderir"""
+        id_filter = self.id_filter
+        return family_pb2.IdFilter(bits=id_filter.to_bytes(), num_hashes=id_filter.num_hashes,
+                                   count=id_filter.count)
+
+    def ScanMessages(self, request, context):
+        """Id araligindaki (veya istenen id listesindeki) mesajlari id sirasinda gonderir.
+
+        Buyuk mesajlarin payload'u bos gonderilir; onlar GetMessageStream ile cekilir.
+        """
+        if request.ids:
+            ids = sorted(set(request.ids))
+        else:
+            ids = self.index.range(request.from_id, request.to_id, request.limit or None)
+        for msg_id in ids:
+            content = self.memtable.get(msg_id) if self.memtable else None
+            if content is None:
+                size = self.store.size(msg_id)
+                if size is None:
+                    continue
+                content = self.store.read(msg_id) if size <= STREAM_THRESHOLD else b""
+                if content is None:
+                    continue
+            yield family_pb2.ChatMessage(message_id=msg_id, payload=content)
+
+    def SnapshotMessages(self, request, context):
+        """Istenen id'lerin (veya araligin) mesajlarini buyuk ardisik parcalar halinde gonderir.
+
+        Yeni/yerine gelen node'un toplu doldurulmasinda kaynak olarak kullanilir;
+        node'da olmayan id'ler atlanir.
+        """
+        if request.ids:
+            ids = sorted(set(request.ids))
+        else:
+            ids = self.index.range(request.from_id, request.to_id, request.limit or None)
+        records = ((msg_id, content) for msg_id in ids
+                   for content in (self._read(msg_id),) if content is not None)
+        for data in pack_records(records):
+            yield family_pb2.SnapshotChunk(data=data)
+
+    def InstallSnapshot(self, request_iterator, context):
+        """Snapshot parcalarindaki mesajlari kaydeder; yazilan id'leri doner"""
+        reader = RecordReader()
+        ids = []
+        for chunk in request_iterator:
+            for msg_id, payload in reader.feed(chunk.data):
+                if self.memtable:
+                    self.memtable.put(msg_id, payload)
+                else:
+                    self.store.write(msg_id, payload)
+                self._remember(msg_id)
+                ids.append(msg_id)
+        reader.finish()
+        log.info(self.log_name, "snapshot_installed", "Snapshot kuruldu: {count} mesaj, {bytes} bayt",
+                 count=len(ids), bytes=reader.bytes)
+        return family_pb2.SnapshotResult(ids=ids, bytes=reader.bytes)
+
+    def DeleteMessage(self, request, context):
+        """Mesaji memtable'dan ve diskten siler.
+
+        Bloom filtresinden eleman silinemez; silinen id'ler birikince filtre
+        indeksten yeniden olusturulur (o zamana kadar sadece yanlis pozitif olurlar).
+        """
+        msg_id = request.message_id
+        if self.memtable:
+            self.memtable.delete(msg_id)
+        removed = self.store.remove(msg_id)
+        self.index.discard(msg_id)
+        with self.filter_lock:
+            self.filter_deletes += 1
+            if self.filter_deletes > max(1000, self.id_filter.count // 4):
+                self.id_filter = self._build_id_filter(self.id_filter.capacity)
+        if removed:
+            log.sampled(INFO, self.log_name, "delete", "Mesaj silindi: ID={id}", id=msg_id)
+        return family_pb2.StoreResponse(success=True)
+
     def ListMessages(self, request, context):
         """Node'daki tüm mesajları listele"""
         try:
-            files = os.listdir(self.storage_dir)
-            for filename in files:
-                if filename.endswith('.txt'):
-                    try:
-                        msg_id = int(filename.replace('.txt', ''))
-                        file_path = os.path.join(self.storage_dir, filename)
-                        with open(file_path, "r") as f:
+            pending = self.memtable.snapshot() if self.memtable else {}
+            for msg_id, content in pending.items():
+                yield family_pb2.ChatMessage(message_id=msg_id, payload=content)
+            for msg_id, file_path in self.store.iter_entries():
+                if msg_id in pending:
+                    continue
+                try:
+                    # Buyuk mesajlar bos gonderilir; lider onlari GetMessageStream ile ceker
+                    content = b""
+                    if os.path.getsize(file_path) <= STREAM_THRESHOLD:
+                        with open(file_path, "rb") as f:
                             content = f.read()
-                        yield family_pb2.ChatMessage(message_id=msg_id, message=content)
-                    except:
-                        pass
+                    yield family_pb2.ChatMessage(message_id=msg_id, payload=content)
+                except:
+                    pass
         except Exception as e:
-            print(f"[NODE {self.node_id}] ListMessages hatası: {e}")
+            log.error(self.log_name, "list_error", "ListMessages hatası: {error}", error=e)
+
+    def close(self):
+        """Bellekte bekleyen yazmalari diske indirir"""
+        if self.memtable:
+            self.memtable.close()
 
     def report_status(self):
         while True:
             time.sleep(5)
-            files = os.listdir(self.storage_dir)
             # Terminal temizle
             os.system('cls' if os.name == 'nt' else 'clear')
             print("=" * 40)
             print(f"    NODE {self.node_id} - CANLI RAPOR")
             print("=" * 40)
             print(f"\nIO Modu: {self.io_mode.upper()}")
-            print(f"Disk Klasoru: {self.storage_dir}")
-            print(f"\nSaklanan Mesaj Sayisi: {len(files)}")
+            print(f"Disk Klasoru: {self.storage_dir} ({self.store.layout.name})")
+            print(f"\nSaklanan Mesaj Sayisi: {self.store.count}")
+            if self.memtable:
+                st = self.memtable.stats()
+                print(f"Memtable: {st['entries']} mesaj, {st['bytes']} bayt | flush edilen: {st['flushed']} | "
+                      f"geri basinc: {st['stalls']}")
+            if self.store.dedup:
+                st = self.store.dedup_stats()
+                print(f"Dedup: {st['blobs']} farkli icerik | tekrar eden yazma: {st['hits']} | "
+                      f"kazanilan: {st['saved_bytes']} bayt")
+            st = log.stats()
+            print(f"Log: yazilan {st['written']} | ornekleme ile atlanan {st['sampled_out']} | "
+                  f"tampon dolu, dusen {st['dropped']}")
             print("=" * 40)
 
-def serve(node_id, port, leader_addr="localhost:5550", io_mode="buffered"):
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
-    worker = WorkerNode(node_id, f"storage_node_{node_id}", io_mode=io_mode)
+def serve(node_id, port, leader_addr="localhost:5550", io_mode="buffered", grpc_compression="none",
+          bloom_capacity=100000, bloom_error_rate=0.01, storage_layout="flat", memtable_bytes=0,
+          memtable_flush_bytes=4 * 1024 * 1024, memtable_flush_interval=1.0, wal="on", grpc_workers=10,
+          bootstrap=False, dedup=False, log_options=None):
+    configure_log(**(log_options or {}))
+    # Kanal (wire) sikistirmasi: node'dan giden yanitlar ve lidere kayit kanali
+    compression = GRPC_COMPRESSION[grpc_compression]
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=grpc_workers), options=SERVER_OPTIONS,
+                         compression=compression)
+    worker = WorkerNode(node_id, f"storage_node_{node_id}", io_mode=io_mode,
+                        bloom_capacity=bloom_capacity, bloom_error_rate=bloom_error_rate,
+                        storage_layout=storage_layout, memtable_bytes=memtable_bytes,
+                        memtable_flush_bytes=memtable_flush_bytes,
+                        memtable_flush_interval=memtable_flush_interval, wal=wal, dedup=dedup)
     family_pb2_grpc.add_FamilyServiceServicer_to_server(worker, server)
     server.add_insecure_port(f'0.0.0.0:{port}')
     server.start()
     
-    print(f"[NODE {node_id}] Baslatildi, Port: {port}")
+    log.info(f"NODE {node_id}", "listening", "Baslatildi, Port: {port}", port=port)
     
     # Lidere kaydol
-    channel = grpc.insecure_channel(leader_addr)
-    stub = family_pb2_grpc.FamilyServiceStub(channel)
-    node_info = family_pb2.NodeInfo(node_id=int(node_id), address=f"localhost:{port}")
-    stub.RegisterNode(family_pb2.RegisterNodeRequest(node_info=node_info))
+    # Kayittan sonra kanal kapatilir; lider node'a kendi kanal havuzuyla baglanir
+    with open_channel(leader_addr, compression) as channel:
+        stub = family_pb2_grpc.FamilyServiceStub(channel)
+        node_info = family_pb2.NodeInfo(node_id=int(node_id), address=f"localhost:{port}")
+        if bootstrap:
+            log.info(f"NODE {node_id}", "bootstrap", "Snapshot ile doldurulmak uzere kaydoluyor...")
+        stub.RegisterNode(family_pb2.RegisterNodeRequest(node_info=node_info, bootstrap=bootstrap))
     
     # Raporlama thread'i
     threading.Thread(target=worker.report_status, daemon=True).start()
     
-    server.wait_for_termination()
+    # SIGTERM'de de memtable diske indirilsin
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        server.wait_for_termination()
+    finally:
+        server.stop(grace=2).wait()
+        worker.close()
 
 if __name__ == "__main__":
     import argparse
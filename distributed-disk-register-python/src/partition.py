@@ -0,0 +1,131 @@
+import queue
+import socket
+import threading
+
+from binary_protocol import HEADER, HEADER_SIZE, MAGIC, ST_ERROR, encode_frame
+from streaming import CHUNK_SIZE, STREAM_THRESHOLD, StreamedPayload
+
+# Worker'lar arasi ic haberlesmede gRPC cagrilarini isaretleyen metadata anahtari
+FORWARDED_METADATA_KEY = "x-hatokuse-forwarded"
+
+
+def partition_of(msg_id, worker_count):
+    """Mesaj id'sinin hangi worker'a ait oldugunu doner (hash partition)"""
+    return hash(msg_id) % worker_count
+
+
+def internal_socket_port(internal_base, worker_index):
+    """Worker'in ic (forward edilen komutlar icin) socket portu"""
+    return internal_base + worker_index
+
+
+def internal_grpc_port(internal_base, worker_index):
+    """Worker'in ic gRPC portu (node kayitlarinin dagitimi icin)"""
+    return internal_base + 100 + worker_index
+
+
+class PeerRouter:
+    """Baska partition'a ait komutlari sahibi olan worker'a iletir.
+
+    Her kardes worker icin kalici socket baglantilarindan olusan kucuk bir
+    havuz tutulur; komutlar binary protokolle gonderilir, payload hic decode
+    edilmeden aktarilir.
+    """
+
+    def __init__(self, worker_index, worker_count, internal_base, pool_size=8):
+        self.worker_index = worker_index
+        self.worker_count = worker_count
+        self.internal_base = internal_base
+        self.pool_size = pool_size
+        self.idle = {i: queue.LifoQueue() for i in range(worker_count) if i != worker_index}
+        self.lock = threading.Lock()
+        self.forwarded = 0
+        self.errors = 0
+
+    def owns(self, msg_id):
+        return partition_of(msg_id, self.worker_count) == self.worker_index
+
+    def owner_of(self, msg_id):
+        return partition_of(msg_id, self.worker_count)
+
+    def _acquire(self, peer):
+        try:
+            return self.idle[peer].get_nowait()
+        except queue.Empty:
+            sock = socket.create_connection(("127.0.0.1", internal_socket_port(self.internal_base, peer)))
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            rfile = sock.makefile("rb")
+            sock.sendall(MAGIC)
+            if rfile.read(len(MAGIC)) != MAGIC:
+                sock.close()
+                raise ConnectionError("binary protokol onaylanmadi")
+            return sock, rfile
+
+    def _release(self, peer, link):
+        if self.idle[peer].qsize() < self.pool_size:
+            self.idle[peer].put(link)
+        else:
+            self._close(link)
+
+    @staticmethod
+    def _close(link):
+        sock, rfile = link
+        try:
+            rfile.close()
+            sock.close()
+        except OSError:
+            pass
+
+    def forward(self, peer, op, msg_id, payload=b"", flags=0):
+        """Komutu sahibi olan worker'a gonderir; (status, payload) doner.
+
+        Buyuk payload'lar (StreamedPayload) iki yonde de parca parca aktarilir.
+        """
+        try:
+            link = self._acquire(peer)
+        except OSError as e:
+            with self.lock:
+                self.errors += 1
+            return ST_ERROR, f"Worker {peer} erisilemedi ({e})".encode()
+        try:
+            if isinstance(payload, StreamedPayload):
+                link[0].sendall(HEADER.pack(op, flags, msg_id, len(payload)))
+                for data in payload:
+                    link[0].sendall(data)
+            else:
+                link[0].sendall(encode_frame(op, msg_id, payload, flags))
+            header = link[1].read(HEADER_SIZE)
+            if len(header) < HEADER_SIZE:
+                raise ConnectionError("baglanti kapandi")
+            status, _flags, _msg_id, length = HEADER.unpack(header)
+            if length > STREAM_THRESHOLD:
+                reply = StreamedPayload(length, self._stream_reply(peer, link, length))
+            else:
+                reply = link[1].read(length)
+                if len(reply) < length:
+                    raise ConnectionError("eksik yanit")
+                self._release(peer, link)
+        except OSError as e:
+            self._close(link)
+            with self.lock:
+                self.errors += 1
+            return ST_ERROR, f"Worker {peer} yanit vermedi ({e})".encode()
+        with self.lock:
+            self.forwarded += 1
+        return status, reply
+
+    def _stream_reply(self, peer, link, length):
+        """Buyuk yaniti parca parca okur; tamamen okunursa baglanti havuza doner"""
+        remaining = length
+        try:
+            while remaining > 0:
+                data = link[1].read(min(CHUNK_SIZE, remaining))
+                if not data:
+                    raise ConnectionError("eksik yanit")
+                remaining -= len(data)
+                yield data
+        finally:
+            if remaining == 0:
+                self._release(peer, link)
+            else:
+                self._close(link)
@@ -0,0 +1,84 @@
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+
+class ReplicaSelector:
+    """Node bazinda RPC gecikmesini (EWMA) ve ucustaki istek sayisini izler.
+
+    GET icin replikalar skora gore siralanir: skor = ewma_ms * (in_flight + 1).
+    "p2c" stratejisinde rastgele iki replikadan skoru dusuk olan once denenir
+    (power-of-two-choices), "least" stratejisinde tum replikalar skora gore
+    siralanir, "ordered" ise metadata'daki sirayi korur.
+    """
+
+    STRATEGIES = ("p2c", "least", "ordered")
+
+    def __init__(self, strategy="p2c", alpha=0.2, initial_ms=5.0, failure_penalty_ms=500.0):
+        if strategy not in self.STRATEGIES:
+            raise ValueError(f"Gecersiz okuma stratejisi: {strategy}")
+        self.strategy = strategy
+        self.alpha = alpha
+        self.initial_ms = initial_ms
+        self.failure_penalty_ms = failure_penalty_ms
+        self.lock = threading.Lock()
+        self.stats = {}  # node_id -> {"ewma_ms", "in_flight", "requests", "errors"}
+
+    def _entry(self, node_id):
+        entry = self.stats.get(node_id)
+        if entry is None:
+            entry = {"ewma_ms": self.initial_ms, "in_flight": 0, "requests": 0, "errors": 0}
+            self.stats[node_id] = entry
+        return entry
+
+    @contextmanager
+    def track(self, node_id):
+        """Bir node RPC'sinin suresini ve sonucunu kaydeder"""
+        with self.lock:
+            self._entry(node_id)["in_flight"] += 1
+        start = time.perf_counter()
+        ok = False
+        try:
+            yield
+            ok = True
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            with self.lock:
+                entry = self._entry(node_id)
+                entry["in_flight"] -= 1
+                entry["requests"] += 1
+                if not ok:
+                    entry["errors"] += 1
+                    elapsed_ms = max(elapsed_ms, self.failure_penalty_ms)
+                entry["ewma_ms"] += self.alpha * (elapsed_ms - entry["ewma_ms"])
+
+    def score(self, node_id):
+        with self.lock:
+            entry = self._entry(node_id)
+            return entry["ewma_ms"] * (entry["in_flight"] + 1)
+
+    def order(self, node_ids):
+        """Replikalari okuma denemesi sirasina dizer"""
+        node_ids = list(node_ids)
+        if self.strategy == "ordered" or len(node_ids) < 2:
+            return node_ids
+        with self.lock:
+            scores = {nid: self._entry(nid)["ewma_ms"] * (self._entry(nid)["in_flight"] + 1)
+                      for nid in node_ids}
+        if self.strategy == "least":
+            return sorted(node_ids, key=scores.__getitem__)
+        # Power-of-two-choices: iki rastgele adaydan iyisi basa, geri kalanlar skora gore
+        a, b = random.sample(node_ids, 2)
+        first = a if scores[a] <= scores[b] else b
+        rest = sorted((nid for nid in node_ids if nid != first), key=scores.__getitem__)
+        return [first] + rest
+
+    def forget(self, node_id):
+        with self.lock:
+            self.stats.pop(node_id, None)
+
+    def snapshot(self):
+        with self.lock:
+            return {nid: dict(entry, score=entry["ewma_ms"] * (entry["in_flight"] + 1))
+                    for nid, entry in self.stats.items()}
@@ -1,5 +1,9 @@
 import grpc
 from concurrent import futures
+import itertools
+import multiprocessing
+import queue
+import signal
 import sys
 import os
 import socket
@@ -13,63 +17,232 @@ sys.path.append(os.path.join(base_dir, 'generated'))
 
 from generated import family_pb2
 from generated import family_pb2_grpc
+from admission import AdmissionController
+from binary_protocol import (FLAG_LOCAL, FLAG_TTL, HEADER, MAGIC, OP_DEL, OP_GET, OP_SCAN,
+                             OP_SET, ST_BUSY, ST_ERROR, ST_NOT_FOUND, ST_OK, ST_VALUE,
+                             TTL_PREFIX, ProtocolError, busy_payload, encode_frame,
+                             encode_scan_page, encode_scan_request, encode_ttl_payload,
+                             parse_busy_payload, parse_frames, parse_scan_page,
+                             parse_scan_request, split_ttl)
+from streaming import (CHUNK_SIZE, STREAM_THRESHOLD, ChunkFanout,
+                       StreamedPayload, iter_file_chunks, rechunk)
+from replica_selector import ReplicaSelector
+from bloom import BloomFilter
+from channels import SERVER_OPTIONS, ChannelManager, open_channel
+from eventlog import DEBUG, INFO, WARNING, configure as configure_log, log
+from expiry import ExpiryIndex, TokenBucket
+from snapshot import pack_records
+from sorted_index import SortedIdIndex
+from storage import MessageStore, content_hash
+from compression import GRPC_COMPRESSION, Compressor, decode, escape_stream, stream_header_size
+from partition import (FORWARDED_METADATA_KEY, PeerRouter,
+                       internal_grpc_port, internal_socket_port)
+
+# Silme/TTL garbage collection ayarlari
+GC_INTERVAL = 0.5  # Is yoksa GC thread'inin bekleme suresi (sn)
+GC_BATCH = 256  # Tur basina islenen suresi dolan / temizlenen mesaj sayisi
+GC_SWEEP_INTERVAL = 60  # Eski tombstone'lari unutma ve metadata sikistirma araligi (sn)
+GC_COMPACT_MIN = 10000  # Metadata bu kadar gecersiz satirdan once sikistirilmaz
+BOOTSTRAP_BATCH = 10000  # Tek snapshot akisinda aktarilan en fazla mesaj
+BOOTSTRAP_CATCHUP_TIMEOUT = 600  # Kilit disindaki catch-up turlarinin kalan kumeyi kucultmek icin toplam suresi (sn)
+BOOTSTRAP_CATCHUP_FINAL = 64  # Bu kadar mesaj kalinca son tur kilit altinda yapilir
+BOOTSTRAP_FINAL_TIMEOUT = 3.0  # Kilit altindaki son turun toplam suresi (sn); yetismeyenler replika sayilmaz
+# Kilit altinda alinmis stub'la yapilan RPC hatalari; kanal bu arada kapatildiysa
+# (node listeden cikti / yeni adresle kaydoldu) grpc ValueError atar
+STUB_ERRORS = (grpc.RpcError, ValueError)
 
 class LeaderService(family_pb2_grpc.FamilyServiceServicer):
-    def __init__(self, tolerance_level):
+    def __init__(self, tolerance_level, worker_index=0, worker_count=1, read_strategy="p2c",
+                 compressor=None, grpc_compression="none", filter_sync_interval=30,
+                 storage_layout="flat", gc_rate=500, tombstone_grace=3600, channels_per_node=1,
+                 dedup=False):
         self.tolerance_level = tolerance_level
+        self.worker_index = worker_index
+        self.worker_count = worker_count
         self.nodes = {}  # node_id -> {info: NodeInfo, stub: FamilyServiceStub}
         self.message_to_nodes = {}  # message_id -> list of node_ids
         self.lock = threading.Lock()
+        self.admission = None  # Istemci sunucusu baslayinca AdmissionController atanir
+        self.router = None  # Cok worker'li modda PeerRouter atanir
+        self.replica_selector = ReplicaSelector(read_strategy)  # Node gecikme/yuk skorlari
+        self.compressor = compressor or Compressor()  # Replikasyondan once bir kez uygulanir
+        self.channel_compression = GRPC_COMPRESSION[grpc_compression]  # Lider -> node kanallari
+        # Adres basina kanal havuzu; yeniden kayit eden node ayni kanallari kullanir
+        self.channels = ChannelManager(channels_per_node, self.channel_compression)
+        self.node_filters = {}  # node_id -> BloomFilter (node'da saklanan id'ler)
+        self.filter_pending = {}  # node_id -> senkronizasyon surerken eklenen id'ler
+        self.filter_sync_interval = filter_sync_interval
+        self.filter_skipped = 0  # Filtre sayesinde atlanan GetMessage cagrilari
+        self.filter_negative = 0  # Hic RPC yapilmadan cevaplanan "bulunamadi"lar
+        self.expiry = ExpiryIndex()  # TTL'li mesajlarin son kullanma zamanlari
+        self.tombstones = {}  # message_id -> (silinme zamani, kopyasi silinecek node_id'ler)
+        self.tombstone_grace = tombstone_grace  # Cevrimdisi node'lar icin tombstone'un tutulma suresi
+        self.reclaim_queue = queue.Queue()  # Kopyalari henuz silinmemis tombstone'lar
+        self.reclaiming = {}  # message_id -> kopyasi su an silinen node_id (DeleteMessage ucusta)
+        self.reclaim_done = threading.Condition(self.lock)  # Ucustaki silme bitince SET'i uyandirir
+        self.gc_limiter = TokenBucket(gc_rate)  # Saniyede en fazla gc_rate dosya/RPC silme
+        self.deleted = 0
+        self.expired = 0
+        self.reclaimed = 0  # Silinen node/lider kopyasi sayisi
+        self.metadata_garbage = 0  # Metadata dosyasindaki gecersiz (ustune yazilmis/silinmis) satirlar
+        self.bootstraps = {}  # node_id -> (aktarilan id'ler, aktarim sirasinda degisenler)
+        self.bootstrap_stats = {}  # node_id -> son snapshot bootstrap olcumleri
+        # Icerik adresli dedup: ayni icerik diskte bir kez tutulur, icerigi zaten
+        # tasidigini bildiren node'a payload yerine sadece ozet gonderilir
+        self.dedup = dedup
+        self.content_nodes = {}  # icerik ozeti -> {node_id: o node'da bu icerikli mesaj sayisi}
+        self.message_content = {}  # message_id -> (icerik ozeti, icerigi bildiren node_id'ler)
+        self.dedup_skipped = 0  # Payload'siz (sadece ozet) yapilan node yazmalari
+        self.dedup_skipped_bytes = 0  # Bu yazmalarda gonderilmeyen bayt
+        self.dedup_resent = 0  # Node icerigi bulamadi, payload ile tekrar gonderildi
         self.leader_storage = "leader_metadata"
         self.leader_messages_dir = "leader_messages"  # Lider'in kendi mesaj storage'ı
+        if worker_count > 1:
+            # Her worker kendi partition'inin metadata ve mesajlarini tutar
+            self.leader_storage = os.path.join(self.leader_storage, f"worker_{worker_index}")
+            self.leader_messages_dir = os.path.join(self.leader_messages_dir, f"worker_{worker_index}")
         if not os.path.exists(self.leader_storage):
             os.makedirs(self.leader_storage)
-        if not os.path.exists(self.leader_messages_dir):
-            os.makedirs(self.leader_messages_dir)
+        self.leader_store = MessageStore(self.leader_messages_dir, layout=storage_layout, dedup=dedup)
+        if self.leader_store.legacy:
+            # Eski yerlesimdeki mesajlar arka planda tasinir, bu sirada okumalar iki yere de bakar
+            threading.Thread(target=self.leader_store.migrate, kwargs={"pause": 0.05}, daemon=True).start()
         self._load_metadata()
+        self.id_index = SortedIdIndex(self.message_to_nodes)  # SCAN icin sirali id'ler
+        for msg_id, (_deleted_at, pending) in self.tombstones.items():
+            if pending:
+                self.reclaim_queue.put(msg_id)
         self._load_leader_messages()
 
+    def owns(self, msg_id):
+        """Mesaj bu worker'in partition'ina mi ait?"""
+        return self.router is None or self.router.owns(msg_id)
+
     def _load_metadata(self):
         """Lider başlarken eski kayıtları yükler"""
         metadata_file = os.path.join(self.leader_storage, "message_mapping.txt")
+        lines = 0
         if os.path.exists(metadata_file):
             with open(metadata_file, "r") as f:
                 for line in f:
+                    # <id>:<node'lar>[:<expires_at>] veya silinmisse <id>:DEL:<zaman>:<node'lar>
                     parts = line.strip().split(":")
-                    if len(parts) == 2:
-                        msg_id = int(parts[0])
-                        node_ids = [int(x) for x in parts[1].split(",") if x]
-                        self.message_to_nodes[msg_id] = node_ids
+                    if len(parts) < 2:
+                        continue
+                    lines += 1
+                    msg_id = int(parts[0])
+                    if parts[1] == "DEL":
+                        self.message_to_nodes.pop(msg_id, None)
+                        self.expiry.discard(msg_id)
+                        pending = {int(x) for x in parts[3].split(",") if x}
+                        self.tombstones[msg_id] = (float(parts[2]), pending)
+                        continue
+                    node_ids = [int(x) for x in parts[1].split(",") if x]
+                    self.message_to_nodes[msg_id] = node_ids
+                    if len(parts) > 2 and parts[2]:
+                        self.expiry.set(msg_id, float(parts[2]))
+                    else:
+                        self.expiry.discard(msg_id)
+        self.metadata_garbage = lines - len(self.message_to_nodes) - len(self.tombstones)
 
     def _load_leader_messages(self):
         """Lider'in kendi diskindeki mesajları yükler"""
-        try:
-            files = os.listdir(self.leader_messages_dir)
-            msg_count = len([f for f in files if f.endswith('.txt')])
-            if msg_count > 0:
-                print(f"[LIDER] Kendi diskinden {msg_count} mesaj yüklendi")
-        except:
-            pass
+        msg_count = self.leader_store.count
+        if msg_count > 0:
+            log.info("LIDER", "leader_load", "Kendi diskinden {count} mesaj yüklendi", count=msg_count)
+
+    def _leader_file_path(self, msg_id):
+        """Lider diskindeki mesajin dosya yolu; yoksa None"""
+        return self.leader_store.locate(msg_id)
 
-    def _save_message_to_leader(self, msg_id, message):
-        """Liderin kendi diskine mesaj kaydet"""
-        file_path = os.path.join(self.leader_messages_dir, f"{msg_id}.txt")
-        with open(file_path, "w") as f:
-            f.write(message)
+    def _save_message_to_leader(self, msg_id, payload):
+        """Liderin kendi diskine mesaj kaydet (ham baytlar)"""
+        self.leader_store.write(msg_id, payload)
+
+    def _open_leader_file(self, msg_id):
+        """Buyuk mesajlari lider diskine parca parca yazmak icin dosya acar"""
+        return self.leader_store.open_incremental(msg_id)
+
+    def _leader_message_size(self, msg_id):
+        """Lider diskindeki mesajin boyutu; yoksa None"""
+        return self.leader_store.size(msg_id)
 
     def _get_message_from_leader(self, msg_id):
         """Liderin kendi diskinden mesaj oku"""
-        file_path = os.path.join(self.leader_messages_dir, f"{msg_id}.txt")
-        if os.path.exists(file_path):
-            with open(file_path, "r") as f:
-                return f.read()
-        return None
+        return self.leader_store.read(msg_id)
+
+    def _fetch_stream_to_leader(self, stub, msg_id):
+        """Node'daki mesaji parca parca cekip lider diskine yazar"""
+        out = None
+        try:
+            for chunk in stub.GetMessageStream(family_pb2.GetRequest(message_id=msg_id)):
+                if out is None:
+                    out = self._open_leader_file(msg_id)
+                out.write(chunk.data)
+        except Exception:
+            if out:
+                out.abort()
+            raise
+        if out:
+            out.commit()
+
+    def _push_leader_copy(self, stub, msg_id, timeout=None):
+        """Lider diskindeki mesaji node'a gonderir; buyukse parca parca.
+
+        timeout verilirse RPC'nin suresi onunla sinirlanir (varsayilan 2 sn, stream 60 sn).
+        """
+        size = self._leader_message_size(msg_id)
+        if size is None:
+            return False
+        if size > STREAM_THRESHOLD:
+            chunks = (family_pb2.MessageChunk(message_id=msg_id, data=data, total_size=size)
+                      for data in iter_file_chunks(self._leader_file_path(msg_id)))
+            return stub.StoreMessageStream(chunks, timeout=min(60.0, timeout or 60.0)).success
+        req = family_pb2.StoreRequest(
+            chat_message=family_pb2.ChatMessage(message_id=msg_id,
+                                                payload=self._get_message_from_leader(msg_id))
+        )
+        return stub.StoreMessage(req, timeout=min(2.0, timeout or 2.0)).success
+
+    def _metadata_line(self, msg_id, node_ids=None):
+        """Metadata satiri: <id>:<node'lar>[:<expires_at>] veya <id>:DEL:<zaman>:<node'lar>"""
+        if node_ids is None:
+            node_ids = self.message_to_nodes.get(msg_id)
+        if node_ids is None:
+            deleted_at, pending = self.tombstones[msg_id]
+            return f"{msg_id}:DEL:{deleted_at:.3f}:{','.join(map(str, sorted(pending)))}\n"
+        line = f"{msg_id}:{','.join(map(str, node_ids))}"
+        expires_at = self.expiry.get(msg_id)
+        if expires_at is not None:
+            line += f":{expires_at:.3f}"
+        return line + "\n"
 
     def _save_metadata(self, msg_id, node_ids):
         """Lider her mesajın hangi node'larda olduğunu diske kaydeder"""
         metadata_file = os.path.join(self.leader_storage, "message_mapping.txt")
         with open(metadata_file, "a") as f:
-            f.write(f"{msg_id}:{','.join(map(str, node_ids))}\n")
+            f.write(self._metadata_line(msg_id, node_ids))
+
+    def _save_tombstone(self, msg_id):
+        metadata_file = os.path.join(self.leader_storage, "message_mapping.txt")
+        with open(metadata_file, "a") as f:
+            f.write(self._metadata_line(msg_id))
+
+    def _rewrite_metadata(self):
+        """Metadata dosyasini guncel durumla yeniden yazar (self.lock altinda cagrilir)"""
+        metadata_file = os.path.join(self.leader_storage, "message_mapping.txt")
+        tmp_file = metadata_file + ".tmp"
+        with open(tmp_file, "w") as f:
+            for msg_id in sorted(self.message_to_nodes.keys() | self.tombstones.keys()):
+                tomb = self.tombstones.get(msg_id)
+                if tomb is not None and tomb[1] and msg_id in self.message_to_nodes:
+                    # Yeniden yazilmis mesaj: eski kopyalarin silinecegi node'lar unutulmasin
+                    # (yuklemede DEL satiri once, guncel satir sonra okunur)
+                    deleted_at, pending = tomb
+                    f.write(f"{msg_id}:DEL:{deleted_at:.3f}:{','.join(map(str, sorted(pending)))}\n")
+                f.write(self._metadata_line(msg_id))
+        os.replace(tmp_file, metadata_file)
+        self.metadata_garbage = 0
 
     def _discover_node_messages(self, node_id, stub):
         """Node'daki mevcut tum mesajlari kesfeder ve senkronize eder"""
@@ -82,22 +255,34 @@ class LeaderService(family_pb2_grpc.FamilyServiceServicer):
             for msg in messages:
                 try:
                     msg_id = msg.message_id
-                    message_content = msg.message
+                    message_content = _payload_of(msg)
+                    if not self.owns(msg_id):
+                        continue  # Baska worker'in partition'i
                     
                     # 1. Node'da var ama metadata'da yok -> Lider'e kaydet
                     with self.lock:
+                        if msg_id in self.tombstones and node_id not in self.message_to_nodes.get(msg_id, ()):
+                            # Silinmis (veya baska node'lara yeniden yazilmis) mesajin eski kopyasi
+                            self.tombstones[msg_id][1].add(node_id)
+                            self.reclaim_queue.put(msg_id)
+                            continue
                         if msg_id not in self.message_to_nodes:
                             self.message_to_nodes[msg_id] = []
-                            # Lider'in diskine de kaydet
-                            self._save_message_to_leader(msg_id, message_content)
+                            self.id_index.add(msg_id)
+                            # Lider'in diskine de kaydet (buyuk mesajlar bos gelir, stream ile cekilir)
+                            if message_content:
+                                self._save_message_to_leader(msg_id, message_content)
+                            else:
+                                self._fetch_stream_to_leader(stub, msg_id)
                             synced_to_leader += 1
-                            print(f"[SYNC] Mesaj {msg_id} node {node_id}'den lider'e kopyalandı")
+                            log.sampled(DEBUG, "SYNC", "sync_to_leader",
+                                        "Mesaj {id} node {node}'den lider'e kopyalandı", id=msg_id, node=node_id)
                         
                         if node_id not in self.message_to_nodes[msg_id]:
                             self.message_to_nodes[msg_id].append(node_id)
                             discovered_count += 1
                 except Exception as e:
-                    print(f"[LIDER] Mesaj işleme hatası: {e}")
+                    log.warning("LIDER", "sync_error", "Mesaj işleme hatası: {error}", error=e)
             
             # 2. Metadata'da var ama node'da yok -> Lider'den node'a dağıt
             synced_to_node = 0
@@ -109,51 +294,520 @@ class LeaderService(family_pb2_grpc.FamilyServiceServicer):
                             resp = stub.GetMessage(family_pb2.GetRequest(message_id=msg_id), timeout=1.0)
                             if not resp.found:
                                 # Node'da yok ama metadata'da var -> Lider'den gönder
-                                leader_msg = self._get_message_from_leader(msg_id)
-                                if leader_msg:
-                                    req = family_pb2.StoreRequest(
-                                        chat_message=family_pb2.ChatMessage(message_id=msg_id, message=leader_msg)
-                                    )
-                                    stub.StoreMessage(req, timeout=2.0)
+                                if self._push_leader_copy(stub, msg_id):
                                     synced_to_node += 1
-                                    print(f"[SYNC] Mesaj {msg_id} lider'den node {node_id}'e gönderildi")
+                                    log.sampled(DEBUG, "SYNC", "sync_to_node",
+                                                "Mesaj {id} lider'den node {node}'e gönderildi",
+                                                id=msg_id, node=node_id)
                         except:
                             pass
             
             if discovered_count > 0 or synced_to_leader > 0 or synced_to_node > 0:
                 # Tum metadata'yi yeniden kaydet
-                metadata_file = os.path.join(self.leader_storage, "message_mapping.txt")
-                with open(metadata_file, "w") as f:
-                    for msg_id in sorted(self.message_to_nodes.keys()):
-                        node_ids = self.message_to_nodes[msg_id]
-                        f.write(f"{msg_id}:{','.join(map(str, node_ids))}\n")
-                print(f"[LIDER] Node {node_id} senkronizasyonu: {discovered_count} keşfedildi, {synced_to_leader} lider'e alındı, {synced_to_node} node'a gönderildi")
+                with self.lock:
+                    self._rewrite_metadata()
+                log.info("LIDER", "sync_done", "Node {node} senkronizasyonu: {discovered} keşfedildi, {to_leader} lider'e alındı, "
+                         "{to_node} node'a gönderildi", node=node_id, discovered=discovered_count,
+                         to_leader=synced_to_leader, to_node=synced_to_node)
             else:
-                print(f"[LIDER] Node {node_id} zaten senkronize")
+                log.info("LIDER", "sync_done", "Node {node} zaten senkronize", node=node_id)
         except Exception as e:
-            print(f"[LIDER] Node {node_id} kesfinde hata: {e}")
+            log.error("LIDER", "sync_error", "Node {node} kesfinde hata: {error}", node=node_id, error=e)
 
     def RegisterNode(self, request, context):
         node_id = request.node_info.node_id
         addr = request.node_info.address
+
+        # Cok worker'li modda kaydi diger worker'lara da ilet
+        forwarded = any(key == FORWARDED_METADATA_KEY for key, _ in context.invocation_metadata())
+        peers = []
+        if self.router and not forwarded:
+            peers = [threading.Thread(target=self._forward_registration, args=(request, peer))
+                     for peer in self.router.idle]
+            for t in peers:
+                t.start()
         
-        # Node ile iletisim kurmak icin yeni bir kanal ac
-        channel = grpc.insecure_channel(addr)
-        stub = family_pb2_grpc.FamilyServiceStub(channel)
+        # Node ile iletisim icin adresin kanal havuzunu al (varsa yeniden kullanilir)
+        stub = self.channels.stub(addr)
         
+        entry = {
+            "info": request.node_info,
+            "stub": stub,
+            "last_seen": time.time()  # Son görülme zamanı ekle
+        }
         with self.lock:
-            self.nodes[node_id] = {
-                "info": request.node_info,
-                "stub": stub,
-                "last_seen": time.time()  # Son görülme zamanı ekle
-            }
+            old = self.nodes.get(node_id)
+            if old and old["info"].address != addr:
+                self._release_channel(old["info"].address, exclude=node_id)
+            self._forget_node_content(node_id)
+            if request.bootstrap:
+                # Snapshot bitene kadar SET/GET hedefi olmasin
+                self.nodes.pop(node_id, None)
+            else:
+                self.nodes[node_id] = entry
         
-        # Node'daki mevcut mesajlari kesfet ve metadata'ya ekle
-        self._discover_node_messages(node_id, stub)
+        if request.bootstrap:
+            # Sahip olmasi gereken mesajlari toplu al, sonra kaydol
+            try:
+                self._bootstrap_node(node_id, entry)
+            except RuntimeError as e:
+                log.error("BOOTSTRAP", "bootstrap_failed", "Node {node} kaydedilmedi: {error}", node=node_id, error=e)
+                context.abort(grpc.StatusCode.UNAVAILABLE, f"Bootstrap basarisiz: {e}")
+        else:
+            # Node'daki mevcut mesajlari kesfet ve metadata'ya ekle
+            self._discover_node_messages(node_id, stub)
+        self._sync_node_filter(node_id, stub)
         
-        print(f"[LIDER] Yeni uye kaydedildi: ID={node_id}, Adres={addr}")
+        for t in peers:
+            t.join()
+
+        log.info("LIDER", "node_registered", "Yeni uye kaydedildi: ID={node}, Adres={address}", node=node_id, address=addr)
         return family_pb2.RegisterNodeResponse(success=True)
 
+    def _forward_registration(self, request, peer):
+        """Node kaydini kardes worker'in ic gRPC portuna iletir"""
+        addr = f"127.0.0.1:{internal_grpc_port(self.router.internal_base, peer)}"
+        try:
+            with open_channel(addr) as channel:
+                stub = family_pb2_grpc.FamilyServiceStub(channel)
+                # Snapshot aktarimi uzun surebilir
+                stub.RegisterNode(request, metadata=((FORWARDED_METADATA_KEY, "1"),),
+                                  timeout=None if request.bootstrap else 30.0)
+        except Exception as e:
+            log.warning("LIDER", "forward_error", "Kayit worker {peer}'e iletilemedi: {error}", peer=peer, error=e)
+
+    def _bootstrap_wants(self, node_id, msg_id):
+        """Node bu mesajin replikasini tutmali mi? (metadata'da ona yazilmis veya
+        canli replika sayisi toleransin altinda)"""
+        node_ids = self.message_to_nodes.get(msg_id)
+        if node_ids is None or self.expiry.is_expired(msg_id):
+            return False
+        live = sum(1 for nid in node_ids if nid != node_id and nid in self.nodes)
+        return node_id in node_ids or live < self.tolerance_level
+
+    def _bootstrap_plan(self, node_id):
+        """Node'a aktarilacak mesajlar ve canli replikalari (self.lock altinda cagrilir)"""
+        plan = {}
+        for msg_id, node_ids in self.message_to_nodes.items():
+            if self._bootstrap_wants(node_id, msg_id):
+                plan[msg_id] = [nid for nid in node_ids if nid != node_id and nid in self.nodes]
+        return plan
+
+    def _snapshot_chunks(self, source, ids):
+        """Kaynaktaki (node veya lider diski icin None) mesajlarin snapshot parcalari"""
+        if source is None:
+            records = ((msg_id, data) for msg_id in ids
+                       for data in (self._get_message_from_leader(msg_id),) if data is not None)
+            for data in pack_records(records):
+                yield family_pb2.SnapshotChunk(data=data)
+            return
+        with self.lock:
+            source_stub = self.nodes[source]["stub"]
+        yield from source_stub.SnapshotMessages(family_pb2.ScanRequest(ids=ids), timeout=300.0)
+
+    def _transfer_snapshot(self, node_id, stub, source, ids):
+        """Kaynaktan hedef node'a toplu aktarim; (yazilan id'ler, bayt, basarisiz id'ler) doner"""
+        installed, transferred, failed = set(), 0, set()
+        for i in range(0, len(ids), BOOTSTRAP_BATCH):
+            batch = ids[i:i + BOOTSTRAP_BATCH]
+            try:
+                result = stub.InstallSnapshot(self._snapshot_chunks(source, batch))
+            except Exception as e:
+                # Yarim kalan akisin yazdiklari catch-up'ta duzeltilir
+                name = "lider diski" if source is None else f"node {source}"
+                log.warning("BOOTSTRAP", "transfer_error", "Node {node}: {source} kaynakli aktarim basarisiz: {error}",
+                            node=node_id, source=name, error=e)
+                failed.update(batch)
+                continue
+            installed.update(result.ids)
+            transferred += result.bytes
+        return installed, transferred, failed
+
+    def _catch_up(self, node_id, stub, ids, installed, failed, deadline=None):
+        """Aktarimdan sonra degisen/eksik mesajlari tek tek duzeltir; installed'i gunceller.
+
+        deadline (monotonic) verilirse RPC'ler onunla sinirlanir; sure dolduktan
+        sonra kalan id'ler denenmez ve yakalanamamis sayilir. Yakalanamayan
+        id'lerin kumesi doner.
+        """
+        missed = set()
+        for msg_id in sorted(ids):
+            timeout = None
+            if deadline is not None:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    installed.discard(msg_id)
+                    missed.add(msg_id)
+                    continue
+            try:
+                if self._bootstrap_wants(node_id, msg_id) and self._push_leader_copy(stub, msg_id, timeout):
+                    installed.add(msg_id)
+                elif msg_id in installed or msg_id in failed:
+                    # Silinmis veya baska node'lara yeniden yazilmis; eski kopya kalmasin
+                    installed.discard(msg_id)
+                    stub.DeleteMessage(family_pb2.DeleteRequest(message_id=msg_id),
+                                       timeout=min(2.0, timeout or 2.0))
+            except STUB_ERRORS as e:
+                installed.discard(msg_id)
+                missed.add(msg_id)
+                log.warning("BOOTSTRAP", "catch_up_error", "Node {node}: mesaj {id} yakalanamadi: {code}",
+                            node=node_id, id=msg_id, code=_error_code(e))
+        return missed
+
+    def _drop_stale_replica(self, msg_id, node_id):
+        """Yakalanamayan mesajda node'u replika listesinden cikarir, node'daki olasi eski
+        kopyayi GC'ye silinecek olarak birakir (self.lock altinda cagrilir).
+
+        Listede baska replika yoksa dokunulmaz (kopya hic degilse oradadir).
+        """
+        node_ids = self.message_to_nodes.get(msg_id)
+        if not node_ids or node_id not in node_ids or len(node_ids) == 1:
+            return
+        node_ids.remove(node_id)
+        deleted_at, pending = self.tombstones.get(msg_id, (time.time(), set()))
+        self.tombstones[msg_id] = (deleted_at, pending | {node_id})
+        self.reclaim_queue.put(msg_id)
+
+    def _bootstrap_node(self, node_id, entry):
+        """Yeni/yerine gelen node'u sahip olmasi gereken mesajlarin snapshot'i ile doldurur.
+
+        Aktarim zaten liderin uzerinden gectigi icin mesajlar once lider
+        diskinden, lider kopyasi olmayanlar canli replikalardan (paralel, yuk
+        dengeli) buyuk ardisik parcalar halinde aktarilir. Aktarim boyunca node
+        SET/GET hedefi degildir; bu sirada yazilan/silinen mesajlar isaretlenir
+        ve catch-up turlarinda tek tek duzeltilir. Turlar kalan kume
+        BOOTSTRAP_CATCHUP_FINAL'a inene kadar kilit disinda tekrarlanir; inmezse
+        (yazma hizi yetismiyorsa) bootstrap basarisiz olur. Son tur kilit
+        altinda, BOOTSTRAP_FINAL_TIMEOUT ile sinirli yapilir ve node ayni anda
+        kaydedilir, boylece hicbir yazma kacmaz ve kilit uzun tutulmaz.
+        """
+        stub = entry["stub"]
+        started = time.perf_counter()
+        with self.lock:
+            plan = self._bootstrap_plan(node_id)
+            dirty = set()
+            self.bootstraps[node_id] = (plan.keys(), dirty)
+        log.info("BOOTSTRAP", "bootstrap_start", "Node {node}: {count} mesaj aktariliyor", node=node_id, count=len(plan))
+
+        try:
+            installed, transferred, failed = self._transfer_snapshot(node_id, stub, None, sorted(plan))
+            # Lider kopyasi olmayanlar: her mesaj en az yuklu canli replikadan
+            sources = {}
+            for msg_id in sorted(plan.keys() - installed):
+                live = plan[msg_id]
+                if live:
+                    source = min(live, key=lambda nid: len(sources.get(nid, ())))
+                    sources.setdefault(source, []).append(msg_id)
+            if sources:
+                with futures.ThreadPoolExecutor(max_workers=len(sources)) as pool:
+                    for ids, size, bad in pool.map(
+                            lambda item: self._transfer_snapshot(node_id, stub, *item), sources.items()):
+                        installed |= ids
+                        transferred += size
+                        failed |= bad
+            snapshot_s = time.perf_counter() - started
+
+            # Catch-up: aktarim sirasinda degisenler ve hicbir kaynakta bulunamayanlar
+            fix = plan.keys() - installed
+            caught_up = 0
+            catchup_deadline = time.monotonic() + BOOTSTRAP_CATCHUP_TIMEOUT
+            while True:
+                with self.lock:
+                    fix |= dirty
+                    dirty.clear()
+                if len(fix) <= BOOTSTRAP_CATCHUP_FINAL:
+                    break
+                if time.monotonic() > catchup_deadline:
+                    raise RuntimeError(f"catch-up {BOOTSTRAP_CATCHUP_TIMEOUT} sn icinde yetismedi "
+                                       f"({len(fix)} mesaj kaldi)")
+                self._catch_up(node_id, stub, fix, installed, failed)
+                caught_up += len(fix)
+                fix = set()
+            with self.lock:
+                fix |= dirty
+                missed = self._catch_up(node_id, stub, fix, installed, failed,
+                                        deadline=time.monotonic() + BOOTSTRAP_FINAL_TIMEOUT)
+                caught_up += len(fix) - len(missed)
+                for msg_id in missed:
+                    self._drop_stale_replica(msg_id, node_id)
+                del self.bootstraps[node_id]
+                adopted = 0
+                for msg_id in installed:
+                    node_ids = self.message_to_nodes.get(msg_id)
+                    if node_ids is not None and node_id not in node_ids:
+                        node_ids.append(node_id)
+                        adopted += 1
+                entry["last_seen"] = time.time()
+                self.nodes[node_id] = entry
+                self._rewrite_metadata()
+        finally:
+            self.bootstraps.pop(node_id, None)
+
+        total_s = time.perf_counter() - started
+        self.bootstrap_stats[node_id] = {
+            "messages": len(installed), "bytes": transferred, "adopted": adopted,
+            "caught_up": caught_up, "snapshot_s": snapshot_s, "total_s": total_s,
+        }
+        log.info("BOOTSTRAP", "bootstrap_done",
+                 "Node {node} tam replika: {messages} mesaj ({mb:.1f} MB), {total_s:.2f} sn "
+                 "(snapshot {snapshot_s:.2f} sn, catch-up {caught_up} mesaj, {adopted} eksik replika tamamlandi)",
+                 node=node_id, messages=len(installed), mb=transferred / (1024 * 1024), total_s=total_s,
+                 snapshot_s=snapshot_s, caught_up=caught_up, adopted=adopted)
+
+    def _note_bootstrap_write(self, msg_id):
+        """Snapshot aktarimi surerken degisen mesaji isaretler (self.lock altinda cagrilir)"""
+        for planned, dirty in self.bootstraps.values():
+            if msg_id in planned:
+                dirty.add(msg_id)
+
+    def _sync_node_filter(self, node_id, stub):
+        """Node'un id filtresini ceker; eski node'lar (RPC yok) her GET'te sorulmaya devam eder"""
+        with self.lock:
+            self.filter_pending[node_id] = []
+        try:
+            resp = stub.GetIdFilter(family_pb2.Empty(), timeout=5.0)
+        except STUB_ERRORS:
+            with self.lock:
+                self.filter_pending.pop(node_id, None)
+                self.node_filters.pop(node_id, None)
+            return
+        id_filter = BloomFilter.from_bytes(resp.bits, resp.num_hashes, resp.count)
+        with self.lock:
+            # Node filtreyi gonderdikten sonra kaydedilen id'ler kaybolmasin
+            for msg_id in self.filter_pending.pop(node_id, []):
+                id_filter.add(msg_id)
+            if node_id in self.nodes:
+                self.node_filters[node_id] = id_filter
+
+    def _note_stored(self, node_ids, msg_id):
+        """Yeni kaydi node filtrelerine ekler (self.lock altinda cagrilir)"""
+        if self.bootstraps:
+            self._note_bootstrap_write(msg_id)
+        for nid in node_ids:
+            if nid in self.node_filters:
+                self.node_filters[nid].add(msg_id)
+            if nid in self.filter_pending:
+                self.filter_pending[nid].append(msg_id)
+
+    def _note_content(self, msg_id, digest, node_ids):
+        """Mesajin icerigini tasidigini bildiren node'lari kaydeder (self.lock altinda cagrilir).
+
+        Node basina referans sayilir; mesaj silinince/ustune yazilinca ve node
+        listeden cikinca _forget_content / _forget_node_content ile azaltilir.
+        Lider disinda kaybolan icerik icin node missing_content doner ve payload
+        tekrar gonderilir.
+        """
+        self._forget_content(msg_id)
+        if not node_ids:
+            return
+        self.message_content[msg_id] = (digest, tuple(node_ids))
+        holders = self.content_nodes.setdefault(digest, {})
+        for nid in node_ids:
+            holders[nid] = holders.get(nid, 0) + 1
+
+    def _forget_content(self, msg_id):
+        """Mesajin icerik referanslarini birakir (self.lock altinda cagrilir)"""
+        entry = self.message_content.pop(msg_id, None)
+        if entry is None:
+            return
+        digest, node_ids = entry
+        holders = self.content_nodes.get(digest)
+        if holders is None:
+            return
+        for nid in node_ids:
+            count = holders.get(nid, 0) - 1
+            if count > 0:
+                holders[nid] = count
+            else:
+                holders.pop(nid, None)
+        if not holders:
+            del self.content_nodes[digest]
+
+    def _forget_node_content(self, node_id):
+        """Listeden cikan/yeniden kaydolan node'un icerik bilgisini siler (self.lock altinda);
+        node bos diskle donmus olabilir"""
+        for digest in [d for d, holders in self.content_nodes.items() if node_id in holders]:
+            holders = self.content_nodes[digest]
+            del holders[node_id]
+            if not holders:
+                del self.content_nodes[digest]
+
+    def _sync_filters(self):
+        """Filtreleri periyodik olarak node'lardan yeniler"""
+        while True:
+            time.sleep(self.filter_sync_interval)
+            with self.lock:
+                nodes = [(nid, data["stub"]) for nid, data in self.nodes.items()]
+            for node_id, stub in nodes:
+                self._sync_node_filter(node_id, stub)
+
+    def _candidate_nodes(self, msg_id):
+        """Metadata'da olmayan mesaj icin sorulacak node'lar (self.lock altinda cagrilir).
+
+        Filtresi mesaji kesinlikle icermeyen node'lar atlanir.
+        """
+        candidates = []
+        for nid in self.nodes:
+            id_filter = self.node_filters.get(nid)
+            if id_filter is None or msg_id in id_filter:
+                candidates.append(nid)
+        self.filter_skipped += len(self.nodes) - len(candidates)
+        if self.nodes and not candidates:
+            self.filter_negative += 1
+        return candidates
+
+    def _set_expiry(self, msg_id, ttl):
+        """SET sonrasi TTL'i ayarlar; TTL'siz SET eski TTL'i kaldirir (self.lock altinda cagrilir)"""
+        if msg_id in self.message_to_nodes:
+            self.metadata_garbage += 1  # Onceki satirin yerine gecer
+        if ttl:
+            self.expiry.set(msg_id, time.time() + ttl)
+        else:
+            self.expiry.discard(msg_id)
+
+    def _is_gone(self, msg_id):
+        """Mesaj silinmis veya suresi dolmus mu? (kopyalari henuz temizlenmemis olabilir)"""
+        if msg_id in self.tombstones and msg_id not in self.message_to_nodes:
+            return True
+        return self.expiry.is_expired(msg_id)
+
+    def _delete(self, msg_id):
+        """Mesaji metadata'dan siler ve tombstone birakir (self.lock altinda cagrilir).
+
+        Node'lardaki ve lider diskindeki kopyalar GC thread'i tarafindan hiz
+        sinirli olarak silinir. Mesaj yoksa False doner.
+        """
+        node_ids = self.message_to_nodes.pop(msg_id, None)
+        if node_ids is None:
+            return False
+        self.id_index.discard(msg_id)
+        self._forget_content(msg_id)
+        self.expiry.discard(msg_id)
+        _deleted_at, pending = self.tombstones.get(msg_id, (0, set()))
+        self.tombstones[msg_id] = (time.time(), pending | set(node_ids))
+        self._save_tombstone(msg_id)
+        self.metadata_garbage += 1
+        self.reclaim_queue.put(msg_id)
+        if self.bootstraps:
+            self._note_bootstrap_write(msg_id)
+        return True
+
+    def _reclaim(self, msg_id):
+        """Silinmis mesajin kopyalarini siler; hata alan kayitli node kaldiysa False.
+
+        Karar ile silme arasinda ayni id yeniden yazilabilir: her silmeden hemen
+        once kilit altinda kopyanin hala silinecek (yeniden yazilmamis) oldugu
+        kontrol edilir. Silme ucustayken ayni node'a yazacak SET _claim_targets'ta
+        bekler.
+        """
+        with self.lock:
+            tomb = self.tombstones.get(msg_id)
+            if tomb is None:
+                return True
+            targets = list(tomb[1])
+            leader_copy = msg_id not in self.message_to_nodes
+        if leader_copy:
+            self.gc_limiter.acquire()
+            with self.lock:
+                # Arada yeniden yazildiysa lider diskindeki kopya guncel degerdir
+                if msg_id not in self.message_to_nodes and self.leader_store.remove(msg_id):
+                    self.reclaimed += 1
+        failed = 0
+        for nid in targets:
+            self.gc_limiter.acquire()
+            with self.lock:
+                tomb = self.tombstones.get(msg_id)
+                # Yeniden yazilmis mesajin guncel replikalarina ve kayitsiz node'lara dokunulmaz
+                if (tomb is None or nid not in tomb[1] or nid in self.message_to_nodes.get(msg_id, ())
+                        or nid not in self.nodes):
+                    continue
+                stub = self.nodes[nid]["stub"]
+                self.reclaiming[msg_id] = nid
+            ok = False
+            try:
+                ok = stub.DeleteMessage(family_pb2.DeleteRequest(message_id=msg_id), timeout=2.0).success
+            except STUB_ERRORS as e:
+                log.sampled(WARNING, "GC", "reclaim_error", "Node {node} mesaj {id} silinemedi: {code}",
+                            node=nid, id=msg_id, code=_error_code(e))
+            finally:
+                with self.lock:
+                    del self.reclaiming[msg_id]
+                    self.reclaim_done.notify_all()
+                    tomb = self.tombstones.get(msg_id)
+                    if ok and tomb is not None:
+                        tomb[1].discard(nid)
+                        self.reclaimed += 1
+            if not ok:
+                failed += 1
+        return failed == 0
+
+    def _claim_targets(self, msg_id, node_ids):
+        """SET'in yazacagi node'lari tombstone'un silinecekler listesinden cikarir ve
+        bu node'lardan birinde eski kopyanin silinmesi ucustaysa bitmesini bekler
+        (self.lock altinda cagrilir)"""
+        tomb = self.tombstones.get(msg_id)
+        if tomb is not None:
+            tomb[1].difference_update(node_ids)
+        while self.reclaiming.get(msg_id) in node_ids:
+            self.reclaim_done.wait()
+
+    def _unclaim_failed(self, msg_id, node_ids, stored_ids):
+        """Yazilamayan node'lardaki olasi eski kopyalari tekrar silinecekler listesine
+        alir (self.lock altinda cagrilir)"""
+        tomb = self.tombstones.get(msg_id)
+        failed = set(node_ids) - set(stored_ids)
+        if tomb is not None and failed:
+            tomb[1].update(failed)
+            self.reclaim_queue.put(msg_id)
+
+    def _collect_garbage(self):
+        """Suresi dolan mesajlari siler, silinenlerin kopyalarini hiz sinirli temizler.
+
+        Cevrimdisi node'lardaki kopyalar node tekrar kaydolunca (kesifte) silinir;
+        tombstone tombstone_grace saniye sonra unutulur.
+        """
+        last_sweep = time.monotonic()
+        while True:
+            with self.lock:
+                for msg_id in self.expiry.pop_expired(limit=GC_BATCH):
+                    if self._delete(msg_id):
+                        self.expired += 1
+            retry = []
+            for _ in range(GC_BATCH):
+                try:
+                    msg_id = self.reclaim_queue.get_nowait()
+                except queue.Empty:
+                    break
+                if not self._reclaim(msg_id):
+                    retry.append(msg_id)
+            for msg_id in retry:
+                self.reclaim_queue.put(msg_id)
+            if time.monotonic() - last_sweep >= GC_SWEEP_INTERVAL:
+                last_sweep = time.monotonic()
+                with self.lock:
+                    cutoff = time.time() - self.tombstone_grace
+                    for msg_id in [m for m, (t, _p) in self.tombstones.items() if t < cutoff]:
+                        del self.tombstones[msg_id]
+                        self.metadata_garbage += 1
+                    if self.metadata_garbage > max(GC_COMPACT_MIN, len(self.message_to_nodes)):
+                        self._rewrite_metadata()
+            if self.reclaim_queue.qsize() <= len(retry):
+                time.sleep(GC_INTERVAL)
+
+    def ScanMessages(self, request, context):
+        """Id araligindaki mesajlari id sirasinda stream eder (tum partition'lar)"""
+        start, end = request.from_id, request.to_id
+        remaining = request.limit or None
+        while start is not None and start <= end and (remaining is None or remaining > 0):
+            try:
+                items, start = scan(self, start, end, min(remaining or SCAN_MAX_LIMIT, SCAN_MAX_LIMIT))
+            except ConnectionError as e:
+                context.abort(grpc.StatusCode.UNAVAILABLE, str(e))
+            for msg_id, data in items:
+                yield family_pb2.ChatMessage(message_id=msg_id, payload=data)
+            if remaining is not None:
+                remaining -= len(items)
+
     def _check_node_health(self):
         """Periyodik olarak node'ların sağlığını kontrol eder"""
         while True:
@@ -175,8 +829,17 @@ class LeaderService(family_pb2_grpc.FamilyServiceServicer):
                 
                 # Ölü node'ları kaldır
                 for node_id in dead_nodes:
-                    print(f"[LIDER] Node {node_id} yanıt vermiyor, listeden çıkarılıyor...")
-                    del self.nodes[node_id]
+                    log.warning("LIDER", "node_removed", "Node {node} yanıt vermiyor, listeden çıkarılıyor...", node=node_id)
+                    addr = self.nodes.pop(node_id)["info"].address
+                    self.node_filters.pop(node_id, None)
+                    self.replica_selector.forget(node_id)
+                    self._forget_node_content(node_id)
+                    self._release_channel(addr, exclude=node_id)
+
+    def _release_channel(self, addr, exclude):
+        """Adresi kullanan baska node kalmadiysa kanallarini kapatir (self.lock altinda cagrilir)"""
+        if not any(data["info"].address == addr for nid, data in self.nodes.items() if nid != exclude):
+            self.channels.close(addr)
 
     def status_report(self):
         """Periyodik raporlama yapar - Terminal temizleyerek"""
@@ -185,132 +848,750 @@ class LeaderService(family_pb2_grpc.FamilyServiceServicer):
             with self.lock:
                 total_msgs = len(self.message_to_nodes)
                 # Terminal temizle (Windows)
-                os.system('cls' if os.name == 'nt' else 'clear')
+                if self.worker_count == 1:
+                    os.system('cls' if os.name == 'nt' else 'clear')
                 print("=" * 50)
-                print("       LIDER DURUM RAPORU (CANLI)")
+                if self.worker_count == 1:
+                    print("       LIDER DURUM RAPORU (CANLI)")
+                else:
+                    print(f"  LIDER DURUM RAPORU - WORKER {self.worker_index}/{self.worker_count}")
                 print("=" * 50)
                 print(f"\nToplam Mesaj Sayisi: {total_msgs}")
                 print(f"Aktif Node Sayisi: {len(self.nodes)}\n")
                 print("-" * 50)
+                scores = self.replica_selector.snapshot()
                 for node_id, data in self.nodes.items():
                     count = sum(1 for msgs in self.message_to_nodes.values() if node_id in msgs)
                     print(f"  Node {node_id} ({data['info'].address}): {count} mesaj")
+                    sc = scores.get(node_id)
+                    if sc:
+                        print(f"      gecikme(EWMA): {sc['ewma_ms']:.2f} ms | ucusta: {sc['in_flight']} | "
+                              f"istek: {sc['requests']} | hata: {sc['errors']} | skor: {sc['score']:.2f}")
+                if self.admission:
+                    st = self.admission.stats()
+                    print("-" * 50)
+                    print(f"  Istemci baglantisi: {st['connections']} | Ucustaki komut: {st['in_flight']}")
+                    print(f"  Kuyruk derinligi: {st['queue_depth']} (en yuksek: {st['peak_queue_depth']})")
+                    print(f"  Kabul: {st['accepted']} | BUSY (red): {st['rejected']} | Reddedilen baglanti: {st['rejected_connections']}")
+                if self.compressor.codec != "none":
+                    c = self.compressor
+                    print(f"  Sikistirma ({c.codec}/{c.level}): {c.bytes_in} -> {c.bytes_out} bayt "
+                          f"(oran: {c.ratio():.2f})")
+                print(f"  Filtre ile atlanan GET RPC: {self.filter_skipped} | "
+                      f"RPC'siz bulunamadi: {self.filter_negative}")
+                print(f"  Silinen: {self.deleted} | Suresi dolan: {self.expired} | TTL'li: {len(self.expiry)} | "
+                      f"Tombstone: {len(self.tombstones)} | Temizlenen kopya: {self.reclaimed} | "
+                      f"GC kuyrugu: {self.reclaim_queue.qsize()}")
+                for node_id, st in self.bootstrap_stats.items():
+                    print(f"  Snapshot bootstrap node {node_id}: {st['messages']} mesaj, {st['total_s']:.2f} sn "
+                          f"(catch-up {st['caught_up']})")
+                if self.dedup:
+                    st = self.leader_store.dedup_stats()
+                    print(f"  Dedup: lider diskinde {st['blobs']} farkli icerik, kazanilan {st['saved_bytes']} bayt | "
+                          f"ozetle yazma: {self.dedup_skipped} ({self.dedup_skipped_bytes} bayt gonderilmedi) | "
+                          f"tekrar gonderim: {self.dedup_resent}")
+                ch = self.channels
+                print(f"  Node kanallari: {len(ch)} adres x {ch.size} | Acilan: {ch.opened} | "
+                      f"Yeniden kullanilan: {ch.reused}")
+                ls = log.stats()
+                print(f"  Log: yazilan {ls['written']} | ornekleme ile atlanan {ls['sampled_out']} | "
+                      f"tampon dolu, dusen {ls['dropped']} | bekleyen {ls['pending']}")
+                if self.router:
+                    print(f"  Iletilen komut: {self.router.forwarded} | Iletim hatasi: {self.router.errors}")
                 print("=" * 50)
 
-def handle_client(conn, addr, leader_service):
-    print(f"[LIDER] Istemci baglandi: {addr}")
+def execute(leader_service, op, msg_id, payload=b"", flags=0):
+    """Komutu (SET/GET/DEL/SCAN) isler; (status, payload) ikilisi doner"""
+    if op == OP_SCAN:
+        # Aralik tum partition'lara yayilir; sahiplik kontrolu scan icinde yapilir
+        try:
+            start, end, limit = parse_scan_request(payload)
+            items, next_from = scan(leader_service, start, end, limit, local_only=bool(flags & FLAG_LOCAL))
+        except (ProtocolError, ConnectionError) as e:
+            return ST_ERROR, str(e).encode()
+        return ST_VALUE, encode_scan_page(items, next_from)
+    if not leader_service.owns(msg_id):
+        # Baska worker'in partition'i -> sahibine ilet
+        router = leader_service.router
+        return router.forward(router.owner_of(msg_id), op, msg_id, payload, flags=flags)
+    if op == OP_SET:
+        ttl = None
+        if flags & FLAG_TTL:
+            try:
+                ttl, payload = _split_ttl(payload)
+            except ProtocolError as e:
+                return ST_ERROR, str(e).encode()
+            if ttl <= 0:
+                return ST_ERROR, b"Gecersiz TTL"
+        if not isinstance(payload, StreamedPayload) and len(payload) > STREAM_THRESHOLD:
+            # Bellekte olsa da gRPC mesaj limitine takilmamasi icin parca parca gonder
+            payload = StreamedPayload(len(payload), iter([payload]))
+        if isinstance(payload, StreamedPayload):
+            return _handle_stream_set(leader_service, msg_id, payload, ttl)
+        return _handle_set(leader_service, msg_id, payload, ttl)
+    if op == OP_GET:
+        return _handle_get(leader_service, msg_id)
+    if op == OP_DEL:
+        return _handle_delete(leader_service, msg_id)
+    return ST_ERROR, b"Gecersiz komut"
+
+def _split_ttl(payload):
+    """FLAG_TTL'li SET payload'undan TTL'i ayirir; stream edilen payload bellege alinmaz"""
+    if not isinstance(payload, StreamedPayload):
+        return split_ttl(payload)
+    chunks = iter(payload)
+    head = b""
+    while len(head) < TTL_PREFIX.size:
+        data = next(chunks, None)
+        if data is None:
+            raise ProtocolError("TTL eksik")
+        head += data
+    rest = head[TTL_PREFIX.size:]
+    return (TTL_PREFIX.unpack_from(head)[0],
+            StreamedPayload(len(payload) - TTL_PREFIX.size, itertools.chain([rest] if rest else [], chunks)))
+
+# Binary protokolle yazilan degerler satir sonu icerebilir; metin yanitinda
+# satir sinirini bozup ayni baglantidaki sonraki yanitlari kaydiracagi icin gonderilmez
+TEXT_UNSAFE_VALUE = b"ERROR: Deger satir sonu iceriyor, metin protokolunde gonderilemez (binary protokolu kullanin)"
+
+def format_text_reply(status, payload):
+    """(status, payload) sonucunu metin protokolu yanitina cevirir"""
+    if status == ST_OK:
+        return b"OK\n"
+    if status == ST_VALUE:
+        if isinstance(payload, StreamedPayload):
+            return _stream_text_value(payload)
+        if b"\n" in payload:
+            return TEXT_UNSAFE_VALUE + b"\n"
+        return b"VALUE " + payload + b"\n"
+    if status == ST_BUSY:
+        return f"BUSY {parse_busy_payload(payload)}\n".encode()
+    return b"ERROR: " + payload + b"\n"
+
+def _stream_text_value(payload):
+    """Buyuk degeri tek satir olarak aktarir.
+
+    Satir sonu ilk parcadaysa yerine ERROR gider; sonraki bir parcadaysa yanit
+    yarim kaldigi icin ProtocolError ile baglanti kapatilir (istemci kalan
+    baytlari sonraki komutun yaniti sanmasin).
+    """
+    parts = iter(payload)
     try:
-        while True:
-            data = conn.recv(1024).decode().strip()
-            if not data: break
-            
-            parts = data.split(' ', 2)
-            command = parts[0].upper()
-            
-            if command == "SET" and len(parts) == 3:
-                msg_id = int(parts[1])
-                message = parts[2]
-                
-                with leader_service.lock:
-                    # YUK DAGITIMI MANTIGI: Node'lari mesaj sayisina gore sirala
-                    # En az mesaji olan node'lari secerek yuk dengelemis oluruz.
-                    node_message_counts = []
-                    for nid in leader_service.nodes.keys():
-                        count = sum(1 for msgs in leader_service.message_to_nodes.values() if nid in msgs)
-                        node_message_counts.append((nid, count))
-                    
-                    # Sayiya gore kucukten buyuge sirala
-                    node_message_counts.sort(key=lambda x: x[1])
-                    available_node_ids = [x[0] for x in node_message_counts]
-                
-                if len(available_node_ids) < leader_service.tolerance_level:
-                    conn.sendall(b"ERROR: Yeterli aktif uye yok\n")
-                    continue
+        first = next(parts, b"")
+        if b"\n" in first:
+            yield TEXT_UNSAFE_VALUE + b"\n"
+            return
+        yield b"VALUE " + first
+        for data in parts:
+            if b"\n" in data:
+                raise ProtocolError("Stream edilen deger satir sonu iceriyor")
+            yield data
+        yield b"\n"
+    finally:
+        parts.close()
 
-                # En "bos" olan node'lari secelim
-                target_node_ids = available_node_ids[:leader_service.tolerance_level]
-                
-                success_count = 0
-                stored_ids = []
-                for nid in target_node_ids:
-                    try:
-                        node_stub = leader_service.nodes[nid]["stub"]
-                        req = family_pb2.StoreRequest(chat_message=family_pb2.ChatMessage(message_id=msg_id, message=message))
+def format_text_scan(items, next_from):
+    """SCAN sonucunu metin yanitina cevirir: ITEM satirlari + END <sonraki|->.
+
+    Sayfada satir sonu iceren deger varsa sayfa yerine ERROR doner.
+    """
+    for msg_id, data in items:
+        if b"\n" in data:
+            return TEXT_UNSAFE_VALUE + b" (id %d)\n" % msg_id
+    lines = [b"ITEM %d " % msg_id + data + b"\n" for msg_id, data in items]
+    lines.append(b"END " + (str(next_from).encode() if next_from is not None else b"-") + b"\n")
+    return b"".join(lines)
+
+def execute_command(leader_service, line):
+    """Tek bir metin komutunu (SET/SETEX/GET/DEL/SCAN) isler ve istemciye gidecek yaniti doner"""
+    parts = line.split(b' ', 2)
+    command = parts[0].upper()
+
+    try:
+        if command == b"SCAN":
+            args = [int(x) for x in line.split()[1:]]
+            if len(args) in (2, 3):
+                limit = args[2] if len(args) == 3 else 0
+                try:
+                    return format_text_scan(*scan(leader_service, args[0], args[1], limit))
+                except ConnectionError as e:
+                    return b"ERROR: " + str(e).encode() + b"\n"
+        elif command == b"SETEX":
+            # SETEX <id> <saniye> <mesaj>: mesaj TTL sonunda silinir. TTL mesajdan once
+            # gelir; SET'in mesaji (" EX 5" ile bitse de) her zaman oldugu gibi saklanir
+            args = line.split(b' ', 3)
+            if len(args) == 4 and args[2].isdigit():
+                payload = encode_ttl_payload(int(args[2]), args[3])
+                return format_text_reply(*execute(leader_service, OP_SET, int(args[1]), payload, FLAG_TTL))
+        elif command == b"SET" and len(parts) == 3:
+            return format_text_reply(*execute(leader_service, OP_SET, int(parts[1]), parts[2]))
+        elif command == b"GET" and len(parts) == 2:
+            return format_text_reply(*execute(leader_service, OP_GET, int(parts[1])))
+        elif command == b"DEL" and len(parts) == 2:
+            return format_text_reply(*execute(leader_service, OP_DEL, int(parts[1])))
+    except ValueError:
+        pass
+    return b"ERROR: Gecersiz komut\n"
+
+def execute_frame(leader_service, op, msg_id, payload, flags=0):
+    """Binary cerceveyi isler ve yanit cercevesini doner"""
+    status, reply = execute(leader_service, op, msg_id, payload, flags)
+    if isinstance(reply, StreamedPayload):
+        return _stream_frame(status, msg_id, reply)
+    return encode_frame(status, msg_id, reply)
+
+def _stream_frame(status, msg_id, payload):
+    """Buyuk yaniti baslik + parcalar olarak uretir (bellege toplanmaz)"""
+    yield HEADER.pack(status, 0, msg_id, len(payload))
+    yield from payload
+
+def _payload_of(chat_message):
+    """ChatMessage'in ham baytlari (eski node'lar sadece message alanini doldurur)"""
+    return chat_message.payload or chat_message.message.encode()
+
+def _error_code(e):
+    """STUB_ERRORS icin log'a yazilacak kisa hata (RpcError'da durum kodu)"""
+    return e.code() if isinstance(e, grpc.RpcError) else e
+
+def _pick_targets(leader_service, msg_id):
+    """Yeni mesajin yazilacagi node'lari secer; yeterli node yoksa None.
+
+    Secilen node'lar mesajin tombstone'undan cikarilir; GC bu node'lardaki
+    (yeniden yazilacak) kopyayi artik silmez.
+    """
+    with leader_service.lock:
+        # YUK DAGITIMI MANTIGI: Node'lari mesaj sayisina gore sirala
+        # En az mesaji olan node'lari secerek yuk dengelemis oluruz.
+        node_message_counts = []
+        for nid in leader_service.nodes.keys():
+            count = sum(1 for msgs in leader_service.message_to_nodes.values() if nid in msgs)
+            node_message_counts.append((nid, count))
+
+        # Sayiya gore kucukten buyuge sirala
+        node_message_counts.sort(key=lambda x: x[1])
+        available_node_ids = [x[0] for x in node_message_counts]
+
+        if len(available_node_ids) < leader_service.tolerance_level:
+            return None
+
+        # En "bos" olan node'lari secelim
+        targets = available_node_ids[:leader_service.tolerance_level]
+        leader_service._claim_targets(msg_id, targets)
+    return targets
+
+def _handle_set(leader_service, msg_id, payload, ttl=None):
+    target_node_ids = _pick_targets(leader_service, msg_id)
+    if target_node_ids is None:
+        return ST_ERROR, b"Yeterli aktif uye yok"
+
+    # Sikistirma fan-out'tan once bir kez yapilir; node'lar ve lider ayni baytlari saklar
+    payload = leader_service.compressor.encode(payload)
+    success_count = 0
+    stored_ids = []
+    digest = b""
+    holders = ()
+    if leader_service.dedup:
+        # Ozet sikistirilmis baytlarin ozetidir (node'larin sakladigi icerik)
+        digest = content_hash(payload)
+        with leader_service.lock:
+            holders = set(leader_service.content_nodes.get(digest, ()))
+    req = family_pb2.StoreRequest(chat_message=family_pb2.ChatMessage(message_id=msg_id, payload=payload),
+                                  content_hash=digest)
+    hash_req = family_pb2.StoreRequest(chat_message=family_pb2.ChatMessage(message_id=msg_id),
+                                       content_hash=digest, content_only=True)
+    content_ids = []
+    skipped = resent = 0
+    for nid in target_node_ids:
+        try:
+            node_stub = leader_service.nodes[nid]["stub"]
+            with leader_service.replica_selector.track(nid):
+                if nid in holders:
+                    # Node bu icerigi zaten tasiyor: payload gonderilmez
+                    resp = node_stub.StoreMessage(hash_req)
+                    if resp.missing_content:
+                        resent += 1
                         resp = node_stub.StoreMessage(req)
-                        if resp.success:
-                            success_count += 1
-                            stored_ids.append(nid)
-                    except Exception as e:
-                        print(f"Node {nid} hatasi: {e}")
-
-                if success_count >= leader_service.tolerance_level:
-                    with leader_service.lock:
-                        # Lider kendi diskine de kaydet
-                        leader_service._save_message_to_leader(msg_id, message)
-                        leader_service.message_to_nodes[msg_id] = stored_ids
-                        leader_service._save_metadata(msg_id, stored_ids)  # Diske kaydet
-                    conn.sendall(b"OK\n")
+                    elif resp.success:
+                        skipped += 1
                 else:
-                    conn.sendall(b"ERROR: Kayit tamamlanamadi\n")
+                    resp = node_stub.StoreMessage(req)
+            if resp.success:
+                success_count += 1
+                stored_ids.append(nid)
+                if resp.content_hash == digest and digest:
+                    content_ids.append(nid)
+        except Exception as e:
+            log.sampled(WARNING, "LIDER", "node_error", "Node {node} hatasi: {error}", node=nid, error=e)
 
-            elif command == "GET" and len(parts) == 2:
-                msg_id = int(parts[1])
-                
-                # Önce lider'in kendi diskinden dene
-                leader_msg = leader_service._get_message_from_leader(msg_id)
-                if leader_msg:
-                    conn.sendall(f"VALUE {leader_msg}\n".encode())
-                    continue
-                
-                # Lider'de yoksa node'lardan ara
-                with leader_service.lock:
-                    target_nodes = leader_service.message_to_nodes.get(msg_id, [])
-                    # Eger metadata'da yoksa, tum node'larda ara
-                    if not target_nodes:
-                        target_nodes = list(leader_service.nodes.keys())
-                
-                found = False
-                found_node_ids = []
-                for nid in target_nodes:
-                    try:
-                        if nid not in leader_service.nodes:
-                            continue  # Node artik kayitli degil
-                        node_stub = leader_service.nodes[nid]["stub"]
-                        resp = node_stub.GetMessage(family_pb2.GetRequest(message_id=msg_id))
-                        if resp.found:
-                            if not found:  # Ilk bulunusta cevap gonder
-                                conn.sendall(f"VALUE {resp.chat_message.message}\n".encode())
-                                found = True
-                                # Lider'in diskine de kaydet (senkronizasyon)
-                                leader_service._save_message_to_leader(msg_id, resp.chat_message.message)
-                            found_node_ids.append(nid)
-                    except:
-                        continue # Diger node'u dene (Hata toleransi burada devreye girer)
-                
-                # Eger bulunduysa ve metadata'da yoksa, metadata'yi guncelle
-                if found and msg_id not in leader_service.message_to_nodes:
-                    with leader_service.lock:
-                        leader_service.message_to_nodes[msg_id] = found_node_ids
-                        leader_service._save_metadata(msg_id, found_node_ids)
-                
-                if not found:
-                    conn.sendall(b"ERROR: Mesaj bulunamadi\n")
+    if success_count >= leader_service.tolerance_level:
+        with leader_service.lock:
+            # Lider kendi diskine de kaydet
+            leader_service._save_message_to_leader(msg_id, payload)
+            leader_service._set_expiry(msg_id, ttl)
+            leader_service.message_to_nodes[msg_id] = stored_ids
+            leader_service.id_index.add(msg_id)
+            leader_service._save_metadata(msg_id, stored_ids)  # Diske kaydet
+            leader_service._note_stored(stored_ids, msg_id)
+            leader_service._unclaim_failed(msg_id, target_node_ids, stored_ids)
+            if digest:
+                leader_service._note_content(msg_id, digest, content_ids)
+                leader_service.dedup_skipped += skipped
+                leader_service.dedup_skipped_bytes += skipped * len(payload)
+                leader_service.dedup_resent += resent
+        return ST_OK, b""
+    with leader_service.lock:
+        leader_service._unclaim_failed(msg_id, target_node_ids, stored_ids)
+    return ST_ERROR, b"Kayit tamamlanamadi"
+
+def _handle_stream_set(leader_service, msg_id, payload, ttl=None):
+    """Buyuk mesaji bellege almadan node'lara ve lider diskine parca parca yazar"""
+    target_node_ids = _pick_targets(leader_service, msg_id)
+    if target_node_ids is None:
+        return ST_ERROR, b"Yeterli aktif uye yok"
+
+    # Buyuk mesajlar sikistirilmaz (bellege toplanmamasi icin); gerekirse sadece kacirilir
+    total_size, body = escape_stream(len(payload), payload)
+    fanout = ChunkFanout(target_node_ids)
+    results = {}
+
+    def replicate(nid):
+        try:
+            node_stub = leader_service.nodes[nid]["stub"]
+            chunks = (family_pb2.MessageChunk(message_id=msg_id, data=data, total_size=total_size)
+                      for data in fanout.consume(nid))
+            with leader_service.replica_selector.track(nid):
+                results[nid] = node_stub.StoreMessageStream(chunks).success
+        except Exception as e:
+            log.sampled(WARNING, "LIDER", "node_error", "Node {node} hatasi: {error}", node=nid, error=e)
+        finally:
+            fanout.finish(nid)
+
+    # Dosya thread'lerden once acilir; acilamazsa bekleyen replikasyon thread'i kalmaz
+    try:
+        out = leader_service._open_leader_file(msg_id)
+    except Exception:
+        with leader_service.lock:
+            leader_service._unclaim_failed(msg_id, target_node_ids, [])
+        raise
+    threads = [threading.Thread(target=replicate, args=(nid,), daemon=True) for nid in target_node_ids]
+    for t in threads:
+        t.start()
+    try:
+        for data in rechunk(body):
+            fanout.publish(data)
+            out.write(data)
+    except Exception:
+        out.abort()
+        fanout.abort()
+        with leader_service.lock:
+            leader_service._unclaim_failed(msg_id, target_node_ids, [])
+        raise
+    else:
+        fanout.close()
+    finally:
+        for t in threads:
+            t.join()
+
+    stored_ids = [nid for nid in target_node_ids if results.get(nid)]
+    if len(stored_ids) >= leader_service.tolerance_level:
+        with leader_service.lock:
+            out.commit()
+            leader_service._forget_content(msg_id)  # Ustune yazilan kucuk mesajin icerigi
+            leader_service._set_expiry(msg_id, ttl)
+            leader_service.message_to_nodes[msg_id] = stored_ids
+            leader_service.id_index.add(msg_id)
+            leader_service._save_metadata(msg_id, stored_ids)
+            leader_service._note_stored(stored_ids, msg_id)
+            leader_service._unclaim_failed(msg_id, target_node_ids, stored_ids)
+        return ST_OK, b""
+    out.abort()
+    with leader_service.lock:
+        leader_service._unclaim_failed(msg_id, target_node_ids, stored_ids)
+    return ST_ERROR, b"Kayit tamamlanamadi"
+
+def _read_node_stream(leader_service, msg_id, first, stream):
+    """Node'dan gelen mesaj stream'ini okur.
+
+    Kucuk mesajlar acilmis (decode) bytes olarak doner. Buyukler StreamedPayload
+    olarak doner; istemciye aktarilirken lider diskine de parca parca yazilir.
+    Lider diskine her zaman node'daki (saklanan) bicim yazilir.
+    """
+    if first.total_size <= STREAM_THRESHOLD:
+        value = first.data + b"".join(chunk.data for chunk in stream)
+        # Lider'in diskine de kaydet (senkronizasyon)
+        leader_service._save_message_to_leader(msg_id, value)
+        return decode(value)
+
+    skip = stream_header_size(first.data)
+
+    def relay():
+        out = leader_service._open_leader_file(msg_id)
+        completed = False
+        try:
+            out.write(first.data)
+            yield first.data[skip:]
+            for chunk in stream:
+                out.write(chunk.data)
+                yield chunk.data
+            completed = True
+        finally:
+            if completed:
+                out.commit()
             else:
-                conn.sendall(b"ERROR: Gecersiz komut\n")
+                out.abort()
+                stream.cancel()
+
+    return StreamedPayload(first.total_size - skip, relay())
+
+def _handle_get(leader_service, msg_id):
+    if leader_service._is_gone(msg_id):
+        # Kopyalar GC ile silinene kadar diskte durabilir
+        return ST_NOT_FOUND, b"Mesaj bulunamadi"
+    # Önce lider'in kendi diskinden dene
+    size = leader_service._leader_message_size(msg_id)
+    if size is not None and size > STREAM_THRESHOLD:
+        path = leader_service._leader_file_path(msg_id)
+        with open(path, "rb") as f:
+            skip = stream_header_size(f.read(CHUNK_SIZE))
+        return ST_VALUE, StreamedPayload(size - skip, iter_file_chunks(path, offset=skip))
+    leader_msg = leader_service._get_message_from_leader(msg_id) if size is not None else None
+    if leader_msg is not None:
+        # Acma islemi sadece istemci okurken yapilir
+        return ST_VALUE, decode(leader_msg)
+
+    # Lider'de yoksa node'lardan ara
+    with leader_service.lock:
+        target_nodes = leader_service.message_to_nodes.get(msg_id, [])
+        known = bool(target_nodes)
+        # Eger metadata'da yoksa, filtresi "olabilir" diyen node'larda ara
+        if not target_nodes:
+            target_nodes = leader_service._candidate_nodes(msg_id)
+
+    value = None
+    found_node_ids = []
+    # Replikalari gecikme/yuk skoruna gore sirala (en iyi once denenir)
+    for nid in leader_service.replica_selector.order(target_nodes):
+        try:
+            if nid not in leader_service.nodes:
+                continue  # Node artik kayitli degil
+            node_stub = leader_service.nodes[nid]["stub"]
+            with leader_service.replica_selector.track(nid):
+                stream = node_stub.GetMessageStream(family_pb2.GetRequest(message_id=msg_id))
+                first = next(stream, None)
+            if first is not None:
+                if value is None:  # Ilk bulunusta cevabi hazirla
+                    value = _read_node_stream(leader_service, msg_id, first, stream)
+                else:
+                    stream.cancel()
+                found_node_ids.append(nid)
+                if known or isinstance(value, StreamedPayload):
+                    break  # Metadata zaten biliyor, diger replikalari beklemeye gerek yok
+        except:
+            continue # Diger node'u dene (Hata toleransi burada devreye girer)
+
+    # Eger bulunduysa ve metadata'da yoksa, metadata'yi guncelle
+    if value is not None and msg_id not in leader_service.message_to_nodes:
+        with leader_service.lock:
+            leader_service.message_to_nodes[msg_id] = found_node_ids
+            leader_service.id_index.add(msg_id)
+            leader_service._save_metadata(msg_id, found_node_ids)
+
+    if value is None:
+        return ST_NOT_FOUND, b"Mesaj bulunamadi"
+    return ST_VALUE, value
+
+def _handle_delete(leader_service, msg_id):
+    with leader_service.lock:
+        if leader_service.expiry.is_expired(msg_id) or not leader_service._delete(msg_id):
+            return ST_NOT_FOUND, b"Mesaj bulunamadi"
+        leader_service.deleted += 1
+    return ST_OK, b""
+
+SCAN_DEFAULT_LIMIT = 100
+SCAN_MAX_LIMIT = 1000
+SCAN_PAGE_BYTES = 8 * 1024 * 1024  # Tek sayfada donen toplam (saklanan) bayt siniri
+SCAN_FETCH_BATCH = 64  # Lider diskinde olmayan id'lerin replikalardan tek seferde cekilen en fazla sayisi
+
+def scan(leader_service, start, end, limit=0, local_only=False):
+    """[start, end] araligindaki mesajlari id sirasinda doner.
+
+    (items, next_from) doner; items (id, deger) listesi, next_from sonraki
+    sayfanin baslangici (aralik bittiyse None). Cok worker'li modda her
+    worker kendi partition'ini tarar ve sayfalar id sirasinda birlestirilir.
+    """
+    limit = max(1, min(limit or SCAN_DEFAULT_LIMIT, SCAN_MAX_LIMIT))
+    pages = [_scan_local(leader_service, start, end, limit)]
+    router = leader_service.router
+    if router and not local_only:
+        request = encode_scan_request(start, end, limit)
+        peers = list(router.idle)
+        replies = list(_scan_pool.map(
+            lambda peer: router.forward(peer, OP_SCAN, 0, request, flags=FLAG_LOCAL), peers))
+        for peer, (status, payload) in zip(peers, replies):
+            if isinstance(payload, StreamedPayload):
+                payload = payload.read_all()
+            if status != ST_VALUE:
+                raise ConnectionError(f"Worker {peer} taranamadi: {payload.decode(errors='replace')}")
+            pages.append(parse_scan_page(payload))
+    return _merge_scan_pages(pages, limit)
+
+_scan_pool = futures.ThreadPoolExecutor(max_workers=8, thread_name_prefix="scan")
+
+def _merge_scan_pages(pages, limit):
+    """Partition sayfalarini id sirasinda birlestirir.
+
+    Devami olan bir sayfanin next_from'undan buyuk id'ler bu sayfaya alinmaz;
+    o partition'da arada kalan id'ler olabilir. Birlesik sayfa da limit ve
+    SCAN_PAGE_BYTES ile kesilir; next_from sayfaya girmeyen ilk id olur
+    (son id + 1 MAX_ID'de tasardi).
+    """
+    cutoff = min((next_from for _items, next_from in pages if next_from is not None), default=None)
+    merged = sorted((item for items, _next in pages for item in items
+                     if cutoff is None or item[0] < cutoff), key=lambda item: item[0])
+    size = 0
+    for count, (msg_id, data) in enumerate(merged):
+        size += len(data)
+        if count == limit or (count and size > SCAN_PAGE_BYTES):
+            return merged[:count], msg_id
+    return merged, cutoff
+
+def _scan_local(leader_service, start, end, limit):
+    """Bu worker'in partition'indaki aralik taramasi.
+
+    Sayfa hem adetle (limit) hem saklanan bayt toplamiyla (SCAN_PAGE_BYTES)
+    sinirlanir; siniri tek basina asan mesaj kendi sayfasinda tek doner.
+    Lider diskinde olmayan mesajlar once kucuk gruplar halinde replikalardan
+    lider diskine cekilir, boyutlari okunmadan once bilinir.
+    """
+    ids = leader_service.id_index.range(start, end, limit + 1)
+    next_from = ids[limit] if len(ids) > limit else None
+    # GC'nin henuz silmedigi suresi dolmus id'ler atlanir
+    candidates = [msg_id for msg_id in ids[:limit] if not leader_service.expiry.is_expired(msg_id)]
+    items = []
+    size = 0
+    for offset in range(0, len(candidates), SCAN_FETCH_BATCH):
+        batch = candidates[offset:offset + SCAN_FETCH_BATCH]
+        missing = [msg_id for msg_id in batch if leader_service._leader_message_size(msg_id) is None]
+        if missing:
+            _fetch_from_replicas(leader_service, missing)
+        for msg_id in batch:
+            stored = leader_service._leader_message_size(msg_id)
+            if stored is None:
+                continue  # Silinmis/hicbir replikada bulunamadi
+            if items and size + stored > SCAN_PAGE_BYTES:
+                return items, msg_id
+            data = leader_service._get_message_from_leader(msg_id)
+            if data is None:
+                continue
+            items.append((msg_id, decode(data)))
+            size += stored
+    return items, next_from
+
+def _fetch_from_replicas(leader_service, ids, rounds=3):
+    """Lider diskinde olmayan mesajlari node basina tek ScanMessages cagrisiyla
+    lider diskine ceker; cekilen id'lerin kumesini doner.
+
+    Degerler bellekte toplanmaz (buyukler parca parca yazilir). Cevap vermeyen
+    node'un id'leri sonraki turda diger replikalardan istenir.
+    """
+    fetched = set()
+    failed = set()
+    remaining = list(ids)
+    for _ in range(rounds):
+        groups = {}
+        with leader_service.lock:
+            for msg_id in remaining:
+                replicas = [nid for nid in leader_service.message_to_nodes.get(msg_id, [])
+                            if nid in leader_service.nodes and nid not in failed]
+                if replicas:
+                    nid = leader_service.replica_selector.order(replicas)[0]
+                    groups.setdefault(nid, []).append(msg_id)
+        if not groups:
+            break
+        for nid, group in groups.items():
+            try:
+                stub = leader_service.nodes[nid]["stub"]
+                with leader_service.replica_selector.track(nid):
+                    replies = list(stub.ScanMessages(family_pb2.ScanRequest(ids=group), timeout=10.0))
+                for msg in replies:
+                    if msg.payload:
+                        leader_service._save_message_to_leader(msg.message_id, msg.payload)
+                    else:
+                        # Buyuk mesaj: parca parca lider diskine cekilir
+                        leader_service._fetch_stream_to_leader(stub, msg.message_id)
+                    fetched.add(msg.message_id)
+            except Exception as e:
+                log.sampled(WARNING, "LIDER", "node_error", "Node {node} hatasi: {error}", node=nid, error=e)
+                failed.add(nid)
+        remaining = [msg_id for msg_id in remaining if msg_id not in fetched]
+        if not remaining:
+            break
+    return fetched
+
+def _reply_in_order(conn, pending, busy_reply, error_reply):
+    """Havuza gonderilen komutlarin yanitlarini gelis sirasina gore yazar"""
+    for future, busy_args in pending:
+        if future is None:
+            conn.sendall(busy_reply(*busy_args))
+            continue
+        try:
+            reply = future.result()
+        except Exception as e:
+            log.sampled(WARNING, "LIDER", "command_error", "Komut hatasi: {error}", error=e)
+            reply = error_reply(*busy_args)
+        if isinstance(reply, bytes):
+            conn.sendall(reply)
+        else:
+            # Stream edilen yanit: yarida hata olursa baglanti kapanir
+            for part in reply:
+                conn.sendall(part)
+
+def _serve_text(conn, buffer, leader_service, admission):
+    """Metin protokolu: her satir bir komuttur"""
+    while True:
+        *lines, buffer = buffer.split(b"\n")
+
+        pending = []
+        for raw in lines:
+            line = raw.strip()
+            if not line:
+                continue
+            if line.upper() == b"EXIT":
+                return
+            future = None
+            if len(pending) < admission.per_conn_limit:
+                future = admission.try_submit(execute_command, leader_service, line)
+            else:
+                admission.reject()
+            pending.append((future, ()))
+        _reply_in_order(conn, pending, admission.busy_reply,
+                        lambda: b"ERROR: Komut islenemedi\n")
+
+        data = conn.recv(65536)
+        if not data: break
+        buffer += data
+
+def _serve_binary(conn, buffer, leader_service, admission):
+    """Binary protokol: uzunluk onekli cerceveler, payload hic decode edilmez"""
+    busy = busy_payload(admission.retry_after_ms)
+    while True:
+        try:
+            frames, buffer, big = parse_frames(buffer, stream_threshold=STREAM_THRESHOLD)
+        except ProtocolError as e:
+            conn.sendall(encode_frame(ST_ERROR, 0, str(e).encode()))
+            return
+
+        pending = []
+        for op, flags, msg_id, payload in frames:
+            future = None
+            if len(pending) < admission.per_conn_limit:
+                future = admission.try_submit(execute_frame, leader_service, op, msg_id, payload, flags)
+            else:
+                admission.reject()
+            pending.append((future, (msg_id,)))
+        _reply_in_order(conn, pending, lambda msg_id: encode_frame(ST_BUSY, msg_id, busy),
+                        lambda msg_id: encode_frame(ST_ERROR, msg_id, b"Komut islenemedi"))
+
+        if big:
+            # Buyuk cerceve: payload socket'ten parca parca okunup dogrudan aktarilir
+            buffer = _serve_big_frame(conn, buffer, big, leader_service, admission, busy)
+            continue
+
+        data = conn.recv(262144)
+        if not data: break
+        buffer += data
+
+class _SocketBody:
+    """Socket'ten tam olarak length bayt okuyan parca iteratoru"""
+
+    def __init__(self, conn, buffer, length):
+        self.conn = conn
+        self.head = buffer[:length]
+        self.leftover = buffer[length:]  # Sonraki cercevelere ait baytlar
+        self.remaining = length - len(self.head)
+
+    def __iter__(self):
+        if self.head:
+            head, self.head = self.head, b""
+            yield head
+        while self.remaining > 0:
+            data = self.conn.recv(min(CHUNK_SIZE, self.remaining))
+            if not data:
+                raise ConnectionError("Payload tamamlanmadan baglanti kapandi")
+            self.remaining -= len(data)
+            yield data
+
+    def drain(self):
+        for _ in self:
+            pass
+
+def _serve_big_frame(conn, buffer, header, leader_service, admission, busy):
+    """Esigi asan SET cercevesini stream eder; kalan tamponu doner"""
+    op, flags, msg_id, length = header
+    body = _SocketBody(conn, buffer, length)
+    if op != OP_SET:
+        status, reply = ST_ERROR, b"Gecersiz komut"
+    elif not admission.try_acquire():
+        status, reply = ST_BUSY, busy
+    else:
+        try:
+            status, reply = execute(leader_service, OP_SET, msg_id, StreamedPayload(length, body), flags)
+        finally:
+            admission.release()
+    body.drain()  # Hata durumunda okunmamis payload'u atla, cerceve sinirlari korunsun
+    conn.sendall(encode_frame(status, msg_id, reply))
+    return body.leftover
+
+def handle_client(conn, addr, leader_service, admission):
+    """Istemci baglantisini okur ve protokolu belirler.
+
+    Baglanti MAGIC ile basliyorsa binary, aksi halde metin protokolu kullanilir.
+    Ayni pakette gelen komutlar (pipelining) havuzda paralel calisir,
+    yanitlar gelis sirasina gore yazilir.
+    """
+    log.sampled(INFO, "LIDER", "client_connected", "Istemci baglandi: {address}", address=addr)
+    try:
+        buffer = conn.recv(65536)
+        # MAGIC parcali gelmis olabilir, tamamlanana kadar oku
+        while buffer and len(buffer) < len(MAGIC) and MAGIC.startswith(buffer):
+            data = conn.recv(65536)
+            if not data: break
+            buffer += data
+        if buffer.startswith(MAGIC):
+            conn.sendall(MAGIC)
+            _serve_binary(conn, buffer[len(MAGIC):], leader_service, admission)
+        elif buffer:
+            _serve_text(conn, buffer, leader_service, admission)
     except Exception as e:
-        print(f"Istemci hatasi: {e}")
+        log.sampled(WARNING, "LIDER", "client_error", "Istemci hatasi: {error}", error=e)
     finally:
+        admission.release_connection()
         conn.close()
 
-def run_socket_server(leader_service, port=50052):
+def run_socket_server(leader_service, port=50052, admission=None, host='0.0.0.0', reuse_port=False):
     """Clientlar icin text tabanlı socket sunucusu"""
+    admission = admission or AdmissionController()
+    if leader_service.admission is None:
+        leader_service.admission = admission
     s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-    s.bind(('0.0.0.0', port))
-    s.listen(5)
-    print(f"[LIDER] Istemci (Socket) sunucusu baslatildi, Port: {port}")
+    s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if reuse_port:
+        # Birden fazla worker process ayni portu paylasir, kernel baglantilari dagitir
+        s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    s.bind((host, port))
+    s.listen(128)
+    log.info("LIDER", "listening", "Istemci (Socket) sunucusu baslatildi, Port: {port}", port=port)
     while True:
         conn, addr = s.accept()
-        threading.Thread(target=handle_client, args=(conn, addr, leader_service)).start()
+        if not admission.try_acquire_connection():
+            # Global baglanti limiti asildi -> BUSY deyip kapat
+            try:
+                conn.sendall(admission.busy_reply())
+            except OSError:
+                pass
+            conn.close()
+            continue
+        threading.Thread(target=handle_client, args=(conn, addr, leader_service, admission), daemon=True).start()
 
 def load_tolerance():
     try:
@@ -321,18 +1602,65 @@ def load_tolerance():
     except:
         return 2 # Varsayilan
 
-def serve(grpc_port="5550", socket_port=6666):
+def serve(grpc_port="5550", socket_port=6666, workers=1, **options):
+    """Lideri baslatir; options _serve_worker'in ayarlaridir (havuz, sikistirma vb.)"""
+    configure_log(**(options.get("log_options") or {}))
+    if workers <= 1:
+        _serve_worker(0, 1, grpc_port, socket_port, **options)
+        return
+
+    # Cok cekirdekli mod: her worker ayri bir process (ayri GIL) ve kendi partition'i
+    log.info("LIDER", "workers", "{workers} worker process baslatiliyor (SO_REUSEPORT)", workers=workers)
+    ctx = multiprocessing.get_context("spawn")
+    procs = []
+    for index in range(workers):
+        proc = ctx.Process(target=_serve_worker, name=f"lider-worker-{index}",
+                           args=(index, workers, grpc_port, socket_port), kwargs=options)
+        proc.start()
+        procs.append(proc)
+    # SIGTERM alindiginda worker'lar da kapansin (finally blogu calissin)
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        for proc in procs:
+            proc.join()
+    finally:
+        for proc in procs:
+            if proc.is_alive():
+                proc.terminate()
+
+def _serve_worker(worker_index, worker_count, grpc_port, socket_port, client_workers=16,
+                  client_queue=64, conn_inflight=16, max_connections=256, retry_after_ms=50,
+                  internal_base=7000, read_strategy="p2c", compression="none",
+                  compression_level=None, compression_min_size=256, grpc_compression="none",
+                  filter_sync_interval=30, storage_layout="flat", gc_rate=500, tombstone_grace=3600,
+                  grpc_workers=10, channels_per_node=1, dedup=False, log_options=None):
+    # Worker process'leri spawn ile baslar; log ayarlari her process'te yeniden verilir
+    configure_log(**(log_options or {}))
     tolerance = load_tolerance()
-    print(f"[LIDER] Tolerans Seviyesi: {tolerance}")
+    log.info("LIDER", "tolerance", "Tolerans Seviyesi: {tolerance}", tolerance=tolerance)
     
-    leader_service = LeaderService(tolerance)
+    compressor = Compressor(compression, compression_level, compression_min_size)
+    leader_service = LeaderService(tolerance, worker_index=worker_index, worker_count=worker_count,
+                                   read_strategy=read_strategy, compressor=compressor,
+                                   grpc_compression=grpc_compression,
+                                   filter_sync_interval=filter_sync_interval,
+                                   storage_layout=storage_layout, gc_rate=gc_rate,
+                                   tombstone_grace=tombstone_grace,
+                                   channels_per_node=channels_per_node, dedup=dedup)
+    multi = worker_count > 1
+    if multi:
+        leader_service.router = PeerRouter(worker_index, worker_count, internal_base)
     
     # gRPC Sunucusu (Aile ici haberlesme)
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=grpc_workers),
+                         options=SERVER_OPTIONS + ([("grpc.so_reuseport", 1)] if multi else []),
+                         compression=GRPC_COMPRESSION[grpc_compression])
     family_pb2_grpc.add_FamilyServiceServicer_to_server(leader_service, server)
     server.add_insecure_port(f'0.0.0.0:{grpc_port}')
+    if multi:
+        server.add_insecure_port(f'127.0.0.1:{internal_grpc_port(internal_base, worker_index)}')
     server.start()
-    print(f"[LIDER] Aile (gRPC) sunucusu baslatildi, Port: {grpc_port}")
+    log.info("LIDER", "listening", "Aile (gRPC) sunucusu baslatildi, Port: {port}", port=grpc_port)
 
     # Raporlama thread'ini baslat
     threading.Thread(target=leader_service.status_report, daemon=True).start()
@@ -340,8 +1668,32 @@ def serve(grpc_port="5550", socket_port=6666):
     # Health check thread'ini baslat
     threading.Thread(target=leader_service._check_node_health, daemon=True).start()
 
+    # Node id filtrelerini periyodik senkronize et
+    if filter_sync_interval > 0:
+        threading.Thread(target=leader_service._sync_filters, daemon=True).start()
+
+    # Silme/TTL garbage collection
+    threading.Thread(target=leader_service._collect_garbage, daemon=True).start()
+
+    # Istemci komutlari icin sinirli havuz ve geri basinc
+    admission = AdmissionController(max_workers=client_workers, max_queue=client_queue,
+                                    per_conn_limit=conn_inflight, max_connections=max_connections,
+                                    retry_after_ms=retry_after_ms)
+    leader_service.admission = admission
+
+    if multi:
+        # Kardes worker'lardan iletilen komutlar icin ic socket. Ayri havuz kullanir;
+        # boylece iki worker'in havuzlari birbirini bekleyip kilitlenemez.
+        internal_admission = AdmissionController(max_workers=client_workers, max_queue=client_queue,
+                                                 per_conn_limit=conn_inflight,
+                                                 max_connections=max_connections,
+                                                 retry_after_ms=retry_after_ms)
+        threading.Thread(target=run_socket_server, daemon=True,
+                         args=(leader_service, internal_socket_port(internal_base, worker_index)),
+                         kwargs={"admission": internal_admission, "host": "127.0.0.1"}).start()
+
     # Socket Sunucusu (Istemci haberlesmesi) - Ana thread'de kalsin
-    run_socket_server(leader_service, port=socket_port)
+    run_socket_server(leader_service, port=socket_port, admission=admission, reuse_port=multi)
 
 if __name__ == "__main__":
     serve(grpc_port="5550", socket_port=6666)
@@ -0,0 +1,48 @@
+import struct
+
+# Snapshot akisi: ardisik kayitlar [id (int32) | uzunluk (uint32) | veri], buyuk
+# sabit boyutlu parcalara bolunmus. Kayitlar parca sinirini asabilir.
+RECORD_HEADER = struct.Struct(">iI")
+SNAPSHOT_CHUNK_SIZE = 4 * 1024 * 1024
+
+
+def pack_records(records, chunk_size=SNAPSHOT_CHUNK_SIZE):
+    """(msg_id, veri) kayitlarini chunk_size buyuklugunde parcalar halinde uretir"""
+    buf = bytearray()
+    for msg_id, data in records:
+        buf += RECORD_HEADER.pack(msg_id, len(data))
+        buf += data
+        while len(buf) >= chunk_size:
+            yield bytes(buf[:chunk_size])
+            del buf[:chunk_size]
+    if buf:
+        yield bytes(buf)
+
+
+class RecordReader:
+    """Snapshot parcalarindan kayitlari geri cikarir (parca sinirlari onemsiz)"""
+
+    def __init__(self):
+        self.buf = bytearray()
+        self.bytes = 0
+
+    def feed(self, data):
+        """Parcayi ekler; tamamlanan (msg_id, veri) kayitlarini doner"""
+        self.buf += data
+        self.bytes += len(data)
+        records = []
+        pos = 0
+        while len(self.buf) - pos >= RECORD_HEADER.size:
+            msg_id, length = RECORD_HEADER.unpack_from(self.buf, pos)
+            end = pos + RECORD_HEADER.size + length
+            if end > len(self.buf):
+                break
+            records.append((msg_id, bytes(self.buf[pos + RECORD_HEADER.size:end])))
+            pos = end
+        del self.buf[:pos]
+        return records
+
+    def finish(self):
+        """Akis bittiginde yarim kayit kaldiysa hata verir"""
+        if self.buf:
+            raise ValueError(f"Snapshot yarim kayitla bitti ({len(self.buf)} bayt)")
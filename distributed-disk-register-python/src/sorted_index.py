@@ -0,0 +1,46 @@
+import bisect
+import threading
+
+# Mesaj id'leri int32 (proto); tam aralik taramasi icin sinirlar
+MIN_ID = -2 ** 31
+MAX_ID = 2 ** 31 - 1
+
+
+class SortedIdIndex:
+    """Mesaj id'lerinin sirali indeksi (SCAN/aralik sorgulari icin).
+
+    Id'ler genelde artan sirada geldigi icin sona ekleme O(1)'dir; araya
+    ekleme bisect ile bulunan konuma yapilir.
+    """
+
+    def __init__(self, ids=()):
+        self.ids = sorted(set(ids))
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.ids)
+
+    def add(self, msg_id):
+        with self.lock:
+            ids = self.ids
+            if not ids or msg_id > ids[-1]:
+                ids.append(msg_id)
+                return
+            pos = bisect.bisect_left(ids, msg_id)
+            if pos == len(ids) or ids[pos] != msg_id:
+                ids.insert(pos, msg_id)
+
+    def discard(self, msg_id):
+        with self.lock:
+            pos = bisect.bisect_left(self.ids, msg_id)
+            if pos < len(self.ids) and self.ids[pos] == msg_id:
+                del self.ids[pos]
+
+    def range(self, start, end, limit=None):
+        """start <= id <= end araligindaki id'ler (artan sirada, en fazla limit)"""
+        with self.lock:
+            lo = bisect.bisect_left(self.ids, start)
+            hi = bisect.bisect_right(self.ids, end)
+            if limit is not None:
+                hi = min(hi, lo + limit)
+            return self.ids[lo:hi]
@@ -0,0 +1,434 @@
+import errno
+import hashlib
+import os
+import threading
+import time
+
+from streaming import IncrementalFile
+
+SUFFIX = ".txt"
+BLOB_DIR = ".blobs"  # Icerik adresli depo: <root>/.blobs/<ilk 2 hex>/<sha256 hex>
+
+
+def content_hash(data):
+    """Icerik adresli depolamada kullanilan ozet (sha256, 32 bayt)"""
+    return hashlib.sha256(data).digest()
+
+
+def _id_of(filename):
+    """'<id>.txt' dosya adindan mesaj id'si; uymuyorsa None"""
+    if not filename.endswith(SUFFIX):
+        return None
+    try:
+        return int(filename[:-len(SUFFIX)])
+    except ValueError:
+        return None
+
+
+class FlatLayout:
+    """Tum mesajlar tek klasorde: <root>/<id>.txt"""
+
+    name = "flat"
+
+    def __init__(self, root):
+        self.root = root
+
+    def path_for(self, msg_id):
+        return os.path.join(self.root, f"{msg_id}{SUFFIX}")
+
+    def dir_for(self, msg_id):
+        return self.root
+
+    def iter_entries(self):
+        """(msg_id, path) ciftleri; os.scandir ile bellege liste toplamadan"""
+        with os.scandir(self.root) as it:
+            for entry in it:
+                msg_id = _id_of(entry.name)
+                if msg_id is not None and entry.is_file():
+                    yield msg_id, entry.path
+
+
+class ShardedLayout:
+    """Hash'lenmis alt klasorler: <root>/<a>/<b>/<id>.txt
+
+    Her seviye width hex karakterdir (16^width klasor). Varsayilan 2 seviye x
+    1 karakter = 256 yaprak klasor; milyonlarca mesajda bile tek klasordeki
+    dosya sayisi 256'da birine iner, klasor sayisi da taramayi yavaslatmaz.
+    """
+
+    name = "sharded"
+
+    def __init__(self, root, levels=2, width=1):
+        self.root = root
+        self.levels = levels
+        self.width = width
+
+    def dir_for(self, msg_id):
+        digest = hashlib.blake2b(str(msg_id).encode(), digest_size=8).hexdigest()
+        w = self.width
+        return os.path.join(self.root, *(digest[i * w:(i + 1) * w] for i in range(self.levels)))
+
+    def path_for(self, msg_id):
+        return os.path.join(self.dir_for(msg_id), f"{msg_id}{SUFFIX}")
+
+    def iter_entries(self):
+        yield from self._walk(self.root, self.levels)
+
+    def _walk(self, path, depth):
+        try:
+            with os.scandir(path) as it:
+                entries = list(it)  # Shard klasorleri kucuk
+        except FileNotFoundError:
+            return
+        for entry in entries:
+            if depth == 0:
+                msg_id = _id_of(entry.name)
+                if msg_id is not None and entry.is_file():
+                    yield msg_id, entry.path
+            elif len(entry.name) == self.width and entry.is_dir():
+                yield from self._walk(entry.path, depth - 1)
+
+
+LAYOUTS = {"flat": FlatLayout, "sharded": ShardedLayout}
+
+
+def make_layout(name, root):
+    return LAYOUTS[name](root)
+
+
+def _has_entries(layout):
+    return next(iter(layout.iter_entries()), None) is not None
+
+
+class _DedupIncrementalFile(IncrementalFile):
+    """Yazarken icerigin ozetini de hesaplar; commit'te icerik blob deposuna alinir"""
+
+    def __init__(self, store, msg_id, path, on_commit):
+        super().__init__(path, unbuffered=store.unbuffered, on_commit=on_commit)
+        self.store = store
+        self.msg_id = msg_id
+        self.hasher = hashlib.sha256()
+
+    def write(self, data):
+        super().write(data)
+        self.hasher.update(data)
+
+    def commit(self):
+        self._close()
+        self.store._store_content(self.path, self.hasher.digest(), tmp_path=self.tmp_path)
+        if self.on_commit:
+            self.on_commit()
+
+
+class MessageStore:
+    """Dosya-basina-mesaj deposu (node ve lider ortak kullanir).
+
+    Yazmalar secilen yerlesime (layout) gider. Klasorde diger yerlesimde
+    dosyalar varsa (eski yerlesim) okumalar oraya da bakar; migrate() bu
+    dosyalari yeni yerlesime tasir. Mesaj sayisi bellekte tutulur, rapor icin
+    klasor listelenmez.
+
+    dedup=True ise her farkli icerik bir kez .blobs altinda saklanir ve mesaj
+    dosyalari blob'a hard link olur. Referans sayisi dosya sisteminin link
+    sayisidir (st_nlink - 1); son referans silinince blob da silinir. Okuma
+    yollari degismez, mesaj dosyasi dogrudan icerigi gosterir.
+    """
+
+    def __init__(self, root, layout="flat", unbuffered=False, dedup=False):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self.layout = make_layout(layout, root)
+        self.unbuffered = unbuffered
+        # Diger yerlesimde kalmis dosyalar varsa okuma icin yedek yerlesim
+        legacy = [make_layout(name, root) for name in LAYOUTS if name != layout]
+        self.legacy = next((l for l in legacy if _has_entries(l)), None)
+        self.lock = threading.Lock()
+        self.known_dirs = set()
+        self.count = sum(1 for _ in self.iter_entries())
+        self.dedup = dedup
+        self.blob_root = os.path.join(root, BLOB_DIR)
+        # Daha once dedup ile kullanilmis klasorde mesaj dosyalari blob'larla ayni
+        # inode'u paylasir; yerinde (truncate) yazma ayni icerikli diger id'leri bozar
+        self.linked = dedup or os.path.isdir(self.blob_root)
+        self.dedup_lock = threading.Lock()  # Link/unlink ve blob silme sirasi
+        self.blob_inodes = {}  # inode -> blob yolu (son referans silinince blob'u bulmak icin)
+        self.dedup_hits = 0  # Icerigi zaten var olan yazmalar
+        self.saved_bytes = 0  # Bu yazmalarda diske yazilmayan bayt
+        if dedup:
+            self._load_blobs()
+
+    # --- yol islemleri ---
+
+    def locate(self, msg_id):
+        """Mesajin diskteki yolu; yoksa None"""
+        for path in self._candidates(msg_id):
+            if os.path.exists(path):
+                return path
+        return None
+
+    def _write_path(self, msg_id):
+        directory = self.layout.dir_for(msg_id)
+        if directory not in self.known_dirs:
+            os.makedirs(directory, exist_ok=True)
+            self.known_dirs.add(directory)
+        return self.layout.path_for(msg_id)
+
+    def _written(self, msg_id, existed):
+        if self.legacy:
+            # Yeni yerlesime yazildi; eski kopya kalirsa listelemede iki kez gorunur
+            try:
+                os.remove(self.legacy.path_for(msg_id))
+            except FileNotFoundError:
+                pass
+        if not existed:
+            with self.lock:
+                self.count += 1
+
+    # --- okuma/yazma ---
+
+    def _write_file(self, path, data):
+        if self.unbuffered:
+            # Unbuffered IO: Doğrudan işletim sistemi çağrısı
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC)
+            try:
+                view = memoryview(data)
+                while view:
+                    view = view[os.write(fd, view):]
+            finally:
+                os.close(fd)
+        else:
+            with open(path, "wb", buffering=8192) as f:
+                f.write(data)
+
+    def write(self, msg_id, data):
+        existed = self.locate(msg_id) is not None
+        path = self._write_path(msg_id)
+        if self.dedup:
+            self._store_content(path, content_hash(data), data=data)
+        elif self.linked:
+            # Dosya bir blob'a link olabilir: yeni dosya yazilip yerine konur
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            self._write_file(tmp_path, data)
+            os.replace(tmp_path, path)
+        else:
+            self._write_file(path, data)
+        self._written(msg_id, existed)
+
+    def open_incremental(self, msg_id):
+        """Buyuk mesaj icin parca parca yazilan dosya; commit ile yerine konur"""
+        existed = self.locate(msg_id) is not None
+        path = self._write_path(msg_id)
+        on_commit = lambda: self._written(msg_id, existed)
+        if self.dedup:
+            return _DedupIncrementalFile(self, msg_id, path, on_commit)
+        return IncrementalFile(path, unbuffered=self.unbuffered, on_commit=on_commit)
+
+    # --- icerik adresli depolama (dedup) ---
+
+    def _blob_path(self, digest):
+        name = digest.hex()
+        return os.path.join(self.blob_root, name[:2], name)
+
+    def _load_blobs(self):
+        """Blob inode tablosunu kurar; referanssiz (yarim kalmis) blob'lari siler"""
+        for directory, _dirs, files in os.walk(self.blob_root):
+            for name in files:
+                path = os.path.join(directory, name)
+                st = os.stat(path)
+                if name.endswith(".tmp") or st.st_nlink <= 1:
+                    os.remove(path)
+                else:
+                    self.blob_inodes[st.st_ino] = path
+
+    def has_content(self, digest):
+        return self.dedup and os.path.exists(self._blob_path(digest))
+
+    def read_content(self, digest):
+        """Ozeti verilen icerik; depoda yoksa None"""
+        if not self.dedup:
+            return None
+        try:
+            with open(self._blob_path(digest), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def link_content(self, msg_id, digest):
+        """Mesaji depoda zaten bulunan icerige baglar (veri yazilmaz); icerik yoksa False"""
+        if not self.has_content(digest):
+            return False
+        existed = self.locate(msg_id) is not None
+        if not self._store_content(self._write_path(msg_id), digest):
+            return False
+        self._written(msg_id, existed)
+        return True
+
+    def _store_content(self, path, digest, data=None, tmp_path=None):
+        """Icerigi blob olarak (yoksa) saklar ve path'i ona baglar.
+
+        Icerik data veya tmp_path (yazilmis gecici dosya) ile verilir; ikisi de
+        yoksa sadece mevcut blob'a baglanir (blob yoksa False).
+        """
+        blob = self._blob_path(digest)
+        if data is not None and not os.path.exists(blob):
+            # Veri kilit disinda yazilir; ayni anda ayni icerik gelirse biri atilir
+            tmp_path = f"{blob}.{threading.get_ident()}.tmp"
+            os.makedirs(os.path.dirname(blob), exist_ok=True)
+            self._write_file(tmp_path, data)
+        size = len(data) if data is not None else None
+        with self.dedup_lock:
+            if os.path.exists(blob):
+                if tmp_path:
+                    os.remove(tmp_path)
+                self.dedup_hits += 1
+                self.saved_bytes += size if size is not None else os.path.getsize(blob)
+            elif tmp_path:
+                os.makedirs(os.path.dirname(blob), exist_ok=True)
+                os.replace(tmp_path, blob)
+                self.blob_inodes[os.stat(blob).st_ino] = blob
+            elif data is not None:
+                # Kilit disinda kontrol edilirken vardi, arada son referansi silindi
+                self._write_file(blob, data)
+                self.blob_inodes[os.stat(blob).st_ino] = blob
+            else:
+                return False
+            old = self._stat(path)
+            if old is not None and old.st_ino == os.stat(blob).st_ino:
+                return True  # Ayni icerik tekrar yazildi (rename ayni inode'da bir sey yapmaz)
+            link_path = f"{path}.{threading.get_ident()}.lnk"
+            try:
+                os.link(blob, link_path)
+            except OSError as e:
+                if e.errno != errno.EMLINK:
+                    raise
+                # Link siniri (ext4: 65000) doldu: bu id icin ayri kopya
+                with open(blob, "rb") as src:
+                    self._write_file(link_path, src.read())
+            os.replace(link_path, path)
+            self._release(old)
+        return True
+
+    @staticmethod
+    def _stat(path):
+        try:
+            return os.stat(path)
+        except FileNotFoundError:
+            return None
+
+    def _release(self, old):
+        """Silinen/ustune yazilan mesaj dosyasinin blob'u artik referanssizsa siler
+        (dedup_lock altinda, old dosya kaldirilmadan onceki stat)"""
+        if old is None or old.st_nlink > 2:
+            return
+        blob = self.blob_inodes.get(old.st_ino)
+        if blob is None:
+            return  # Dedup oncesi yazilmis duz dosya
+        st = self._stat(blob)
+        if st is not None and st.st_ino == old.st_ino and st.st_nlink <= 1:
+            os.remove(blob)
+            del self.blob_inodes[old.st_ino]
+
+    def dedup_stats(self):
+        return {"blobs": len(self.blob_inodes), "hits": self.dedup_hits, "saved_bytes": self.saved_bytes}
+
+    def _candidates(self, msg_id):
+        yield self.layout.path_for(msg_id)
+        legacy = self.legacy
+        if legacy:
+            yield legacy.path_for(msg_id)
+
+    def read(self, msg_id):
+        # Once stat yapmadan dogrudan acmayi dene (tek sistem cagrisi)
+        for path in self._candidates(msg_id):
+            try:
+                with open(path, "rb") as f:
+                    return f.read()
+            except FileNotFoundError:
+                continue
+        return None
+
+    def size(self, msg_id):
+        for path in self._candidates(msg_id):
+            try:
+                return os.path.getsize(path)
+            except FileNotFoundError:
+                continue
+        return None
+
+    def remove(self, msg_id):
+        """Mesaj dosyasini siler; dosya vardiysa True"""
+        removed = False
+        for path in self._candidates(msg_id):
+            if self.dedup:
+                with self.dedup_lock:
+                    old = self._stat(path)
+                    if old is None:
+                        continue
+                    os.remove(path)
+                    self._release(old)
+                removed = True
+                continue
+            try:
+                os.remove(path)
+                removed = True
+            except FileNotFoundError:
+                continue
+        if removed:
+            with self.lock:
+                self.count -= 1
+        return removed
+
+    def iter_entries(self):
+        """Depodaki tum (msg_id, path) ciftleri"""
+        yield from self.layout.iter_entries()
+        if self.legacy:
+            yield from self.legacy.iter_entries()
+
+    def ids(self):
+        return [msg_id for msg_id, _path in self.iter_entries()]
+
+    # --- yerlesim gecisi ---
+
+    def migrate(self, batch=500, pause=0.0, progress=None):
+        """Eski yerlesimdeki dosyalari yeni yerlesime tasir; tasinan sayiyi doner.
+
+        Calisan bir process'te (online) guvenlidir: os.link hedef varsa
+        basarisiz olur, boylece tasima sirasinda yazilan yeni deger ezilmez.
+        batch dosyada bir pause saniye beklenir (disk yukunu sinirlamak icin).
+        """
+        if not self.legacy:
+            return 0
+        moved = 0
+        for msg_id, old_path in list(self.legacy.iter_entries()):
+            new_path = self._write_path(msg_id)
+            try:
+                os.link(old_path, new_path)
+            except FileExistsError:
+                pass  # Yeni yerlesimde daha guncel kopya var
+            except FileNotFoundError:
+                continue  # Arada yeniden yazildi
+            try:
+                os.remove(old_path)
+            except FileNotFoundError:
+                pass
+            moved += 1
+            if moved % batch == 0:
+                if progress:
+                    progress(moved)
+                if pause:
+                    time.sleep(pause)
+        if progress:
+            progress(moved)
+        if isinstance(self.legacy, ShardedLayout):
+            self._remove_empty_shards()
+        self.legacy = None
+        return moved
+
+    def _remove_empty_shards(self):
+        """sharded -> flat gecisinden sonra bos kalan shard klasorlerini siler"""
+        for path, _dirs, _files in os.walk(self.root, topdown=False):
+            if path != self.root:
+                try:
+                    os.rmdir(path)  # Bos degilse OSError, dokunulmaz
+                except OSError:
+                    pass
@@ -0,0 +1,158 @@
+import os
+import queue
+import threading
+
+# Parca (chunk) boyutu ve bu esigi asan mesajlarin stream ile tasinmasi
+CHUNK_SIZE = 256 * 1024
+STREAM_THRESHOLD = 1024 * 1024
+
+
+class StreamedPayload:
+    """Bellege tamamen alinmadan parca parca aktarilan payload.
+
+    length toplam bayt sayisidir; chunks bir kez tuketilebilen bayt parcalari
+    iteratorudur. Tuketildikten (veya close cagrildiktan) sonra on_close calisir.
+    """
+
+    def __init__(self, length, chunks, on_close=None):
+        self.length = length
+        self.chunks = chunks
+        self.on_close = on_close
+
+    def __len__(self):
+        return self.length
+
+    def __iter__(self):
+        try:
+            yield from self.chunks
+        finally:
+            self.close()
+
+    def read_all(self):
+        return b"".join(self)
+
+    def close(self):
+        if self.on_close:
+            on_close, self.on_close = self.on_close, None
+            on_close()
+
+
+def iter_file_chunks(path, offset=0, chunk_size=CHUNK_SIZE):
+    """Dosyayi parca parca okur"""
+    with open(path, "rb") as f:
+        f.seek(offset)
+        while True:
+            data = f.read(chunk_size)
+            if not data:
+                break
+            yield data
+
+
+def rechunk(chunks, chunk_size=CHUNK_SIZE):
+    """Gelen bayt parcalarini en fazla chunk_size buyuklugunde parcalara boler"""
+    for data in chunks:
+        view = memoryview(data)
+        for i in range(0, len(view), chunk_size):
+            yield bytes(view[i:i + chunk_size])
+
+
+class IncrementalFile:
+    """Parcalari gecici dosyaya yazar, commit'te asil dosyanin yerine koyar.
+
+    Yarim kalan yazma asil dosyayi bozmaz (abort gecici dosyayi siler).
+    """
+
+    def __init__(self, path, unbuffered=False, on_commit=None):
+        self.path = path
+        self.on_commit = on_commit
+        self.tmp_path = path + ".part"
+        self.unbuffered = unbuffered
+        if unbuffered:
+            self.fd = os.open(self.tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC)
+            self.f = None
+        else:
+            self.fd = None
+            self.f = open(self.tmp_path, "wb", buffering=8192)
+        self.size = 0
+
+    def write(self, data):
+        if self.unbuffered:
+            view = memoryview(data)
+            while view:
+                view = view[os.write(self.fd, view):]
+        else:
+            self.f.write(data)
+        self.size += len(data)
+
+    def _close(self):
+        if self.unbuffered:
+            os.close(self.fd)
+        else:
+            self.f.close()
+
+    def commit(self):
+        self._close()
+        os.replace(self.tmp_path, self.path)
+        if self.on_commit:
+            self.on_commit()
+
+    def abort(self):
+        try:
+            self._close()
+        finally:
+            if os.path.exists(self.tmp_path):
+                os.remove(self.tmp_path)
+
+
+class ChunkFanout:
+    """Tek bir parca kaynagini birden fazla tuketiciye (node stream'i) dagitir.
+
+    Her tuketicinin sinirli bir kuyrugu vardir; yavas tuketici ureticiyi
+    yavaslatir (geri basinc), olen tuketici atlanir.
+    """
+
+    _END = object()
+    _ABORT = object()
+
+    def __init__(self, targets, depth=8):
+        self.queues = {t: queue.Queue(maxsize=depth) for t in targets}
+        self.done = {t: threading.Event() for t in targets}
+
+    def consume(self, target):
+        """Tuketici tarafi: kuyruktaki parcalari uretir"""
+        q = self.queues[target]
+        while not self.done[target].is_set():
+            try:
+                item = q.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            if item is self._END:
+                return
+            if item is self._ABORT:
+                # Tuketicinin (gRPC stream) yarim veriyi kaydetmemesi icin hata firlat
+                raise ConnectionAbortedError("Kaynak stream yarida kaldi")
+            yield item
+
+    def finish(self, target):
+        """Tuketici bitti (basarili ya da hatali); artik ona parca gonderilmez"""
+        self.done[target].set()
+
+    def _put(self, target, item):
+        while not self.done[target].is_set():
+            try:
+                self.queues[target].put(item, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+
+    def publish(self, data):
+        for target in self.queues:
+            self._put(target, data)
+
+    def close(self):
+        for target in self.queues:
+            self._put(target, self._END)
+
+    def abort(self):
+        for target in self.queues:
+            self._put(target, self._ABORT)
@@ -0,0 +1,271 @@
+"""
+Hata ve gecikme enjeksiyonu - ayni process icinde calisan sahte node'lar
+
+FaultyNode gercek WorkerNode'un (gecici klasorde) uzerine her RPC'ye
+yapilandirilabilir gecikme, hata orani ve takilma (hang) ekler. FakeNode
+bu servicer'i ayni process'te bir gRPC sunucusunda calistirir; crash()
+sunucuyu aninda durdurur, restart() ayni port ve klasorle yeniden baslatir.
+InProcessCluster lideri (LeaderService) ve sahte node'lari gecici bir
+klasorde ayaga kaldirir; test_fault_scenarios.py bunlari kullanir.
+"""
+
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from concurrent import futures
+from pathlib import Path
+
+import grpc
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+import server as leader_module
+from channels import SERVER_OPTIONS, open_channel
+from generated import family_pb2, family_pb2_grpc
+from node import WorkerNode
+
+# Node'larin lidere sundugu RPC'ler
+NODE_RPCS = ("StoreMessage", "GetMessage", "StoreMessageStream", "GetMessageStream",
+             "ListMessages", "GetIdFilter", "ScanMessages", "DeleteMessage",
+             "SnapshotMessages", "InstallSnapshot")
+
+
+class FaultPolicy:
+    """Tek bir RPC icin enjekte edilecek hatalar.
+
+    delay_ms (+ 0..jitter_ms) kadar bekletir, error_rate olasilikla
+    UNAVAILABLE doner, hang_s > 0 ise RPC hang_s saniye (veya release()
+    cagrilana kadar) takilir.
+    """
+
+    def __init__(self, delay_ms=0.0, jitter_ms=0.0, error_rate=0.0, hang_s=0.0):
+        self.delay_ms = delay_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.hang_s = hang_s
+
+
+class FaultInjector:
+    """RPC adi -> FaultPolicy; "*" tum RPC'ler icin varsayilandir"""
+
+    def __init__(self, seed=None):
+        self.policies = {}
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.released = threading.Event()
+        self.injected = {"delay": 0, "error": 0, "hang": 0}
+
+    def set(self, methods="*", **policy):
+        """Ornek: faults.set("GetMessageStream", delay_ms=50, error_rate=0.1)"""
+        if isinstance(methods, str):
+            methods = (methods,)
+        self.released.clear()
+        with self.lock:
+            for method in methods:
+                self.policies[method] = FaultPolicy(**policy)
+
+    def clear(self):
+        with self.lock:
+            self.policies.clear()
+        self.release()
+
+    def release(self):
+        """Takili RPC'leri birakir"""
+        self.released.set()
+
+    def apply(self, method, context):
+        with self.lock:
+            policy = self.policies.get(method) or self.policies.get("*")
+            if policy is None:
+                return
+            delay = policy.delay_ms + self.rng.random() * policy.jitter_ms
+            fail = self.rng.random() < policy.error_rate
+            self.injected["hang"] += policy.hang_s > 0
+            self.injected["delay"] += delay > 0
+            self.injected["error"] += fail
+        if policy.hang_s > 0:
+            self.released.wait(policy.hang_s)
+        if delay > 0:
+            time.sleep(delay / 1000)
+        if fail:
+            context.abort(grpc.StatusCode.UNAVAILABLE, f"Enjekte edilen hata ({method})")
+
+
+class FaultyNode(WorkerNode):
+    """Her RPC'den once FaultInjector'i uygulayan WorkerNode"""
+
+    def __init__(self, node_id, storage_dir, faults, **options):
+        super().__init__(node_id, storage_dir, **options)
+        self.faults = faults
+
+    def StoreMessage(self, request, context):
+        self.faults.apply("StoreMessage", context)
+        return super().StoreMessage(request, context)
+
+    def GetMessage(self, request, context):
+        self.faults.apply("GetMessage", context)
+        return super().GetMessage(request, context)
+
+    def StoreMessageStream(self, request_iterator, context):
+        self.faults.apply("StoreMessageStream", context)
+        return super().StoreMessageStream(request_iterator, context)
+
+    def GetMessageStream(self, request, context):
+        self.faults.apply("GetMessageStream", context)
+        yield from super().GetMessageStream(request, context)
+
+    def ListMessages(self, request, context):
+        self.faults.apply("ListMessages", context)
+        yield from super().ListMessages(request, context)
+
+    def GetIdFilter(self, request, context):
+        self.faults.apply("GetIdFilter", context)
+        return super().GetIdFilter(request, context)
+
+    def ScanMessages(self, request, context):
+        self.faults.apply("ScanMessages", context)
+        yield from super().ScanMessages(request, context)
+
+    def DeleteMessage(self, request, context):
+        self.faults.apply("DeleteMessage", context)
+        return super().DeleteMessage(request, context)
+
+    def SnapshotMessages(self, request, context):
+        self.faults.apply("SnapshotMessages", context)
+        yield from super().SnapshotMessages(request, context)
+
+    def InstallSnapshot(self, request_iterator, context):
+        self.faults.apply("InstallSnapshot", context)
+        return super().InstallSnapshot(request_iterator, context)
+
+
+class FakeNode:
+    """FaultyNode'u ayni process'te gRPC sunucusuyla calistirir"""
+
+    def __init__(self, node_id, storage_dir, leader_addr, seed=None, grpc_workers=10, bootstrap=False,
+                 **options):
+        self.node_id = node_id
+        self.storage_dir = storage_dir
+        self.leader_addr = leader_addr
+        self.options = options
+        self.grpc_workers = grpc_workers
+        self.bootstrap = bootstrap  # Kayitta snapshot ile doldurulsun mu
+        self.faults = FaultInjector(seed)
+        self.port = 0  # Ilk baslatmada isletim sistemi secer, restart'ta ayni port kullanilir
+        self.server = None
+        self.servicer = None
+
+    @property
+    def alive(self):
+        return self.server is not None
+
+    def start(self):
+        self.servicer = FaultyNode(self.node_id, self.storage_dir, self.faults, **self.options)
+        self.server = grpc.server(futures.ThreadPoolExecutor(max_workers=self.grpc_workers),
+                                  options=SERVER_OPTIONS)
+        family_pb2_grpc.add_FamilyServiceServicer_to_server(self.servicer, self.server)
+        self.port = self.server.add_insecure_port(f"127.0.0.1:{self.port}")
+        self.server.start()
+        with open_channel(self.leader_addr) as channel:
+            stub = family_pb2_grpc.FamilyServiceStub(channel)
+            node_info = family_pb2.NodeInfo(node_id=self.node_id, address=f"127.0.0.1:{self.port}")
+            request = family_pb2.RegisterNodeRequest(node_info=node_info, bootstrap=self.bootstrap)
+            stub.RegisterNode(request, timeout=None if self.bootstrap else 60.0)
+
+    def crash(self):
+        """Process olumunu taklit eder: sunucu aninda durur, ucustaki RPC'ler kesilir"""
+        if self.server:
+            self.faults.release()
+            self.server.stop(None)
+            self.server = None
+
+    def stop(self):
+        """Duzgun kapanis (memtable diske indirilir)"""
+        if self.server:
+            self.faults.release()
+            self.server.stop(1).wait()
+            self.server = None
+            self.servicer.close()
+
+    def restart(self):
+        self.crash()
+        self.start()
+
+    def wipe(self):
+        """Diski bosaltir (yerine bos bir makine gelmis gibi); once crash() cagrilmali"""
+        shutil.rmtree(self.storage_dir, ignore_errors=True)
+
+
+class InProcessCluster:
+    """Gecici klasorde lider + sahte node'lar.
+
+    Lider gercek LeaderService'tir; gRPC sunucusu, saglik kontrolu, filtre
+    senkronizasyonu ve GC thread'leri normal calismadaki gibi baslatilir.
+    Istemci komutlari server.execute ile (socket katmani olmadan) dogrudan
+    verilir.
+    """
+
+    def __init__(self, node_count=3, tolerance=2, seed=1, node_options=None, leader_options=None):
+        self.root = tempfile.mkdtemp(prefix="hatokuse_fault_")
+        self.cwd = os.getcwd()
+        os.chdir(self.root)  # Lider metadata/mesaj klasorlerini calisma klasorune yazar
+        self.leader = leader_module.LeaderService(tolerance, **(leader_options or {}))
+        self.grpc_server = grpc.server(futures.ThreadPoolExecutor(max_workers=10), options=SERVER_OPTIONS)
+        family_pb2_grpc.add_FamilyServiceServicer_to_server(self.leader, self.grpc_server)
+        port = self.grpc_server.add_insecure_port("127.0.0.1:0")
+        self.grpc_server.start()
+        self.leader_addr = f"127.0.0.1:{port}"
+        threading.Thread(target=self.leader._check_node_health, daemon=True).start()
+        self.filter_thread = None
+        if self.leader.filter_sync_interval > 0:
+            self.filter_thread = threading.Thread(target=self.leader._sync_filters, daemon=True)
+            self.filter_thread.start()
+        self.gc_thread = threading.Thread(target=self.leader._collect_garbage, daemon=True)
+        self.gc_thread.start()
+        self.seed = seed
+        self.node_options = node_options or {}
+        self.nodes = {}
+        for node_id in range(1, node_count + 1):
+            self.add_node(node_id)
+
+    def add_node(self, node_id):
+        node = FakeNode(node_id, os.path.join(self.root, f"storage_node_{node_id}"), self.leader_addr,
+                        seed=self.seed * 1000 + node_id, **self.node_options)
+        node.start()
+        self.nodes[node_id] = node
+        return node
+
+    def drop_leader_copies(self):
+        """Liderin disk kopyalarini siler; sonraki GET'ler replikalardan okunur"""
+        store = self.leader.leader_store
+        for msg_id in store.ids():
+            store.remove(msg_id)
+
+    def wait_node_removed(self, node_id, timeout=30.0):
+        """Saglik kontrolu olu node'u listeden cikarana kadar bekler"""
+        deadline = time.monotonic() + timeout
+        while node_id in self.leader.nodes and time.monotonic() < deadline:
+            time.sleep(0.1)
+
+    def execute(self, op, msg_id, payload=b""):
+        return leader_module.execute(self.leader, op, msg_id, payload)
+
+    def close(self):
+        for node in self.nodes.values():
+            node.crash()
+        self.grpc_server.stop(None)
+        with self.leader.lock:
+            # Durdurulamayan GC/filtre thread'leri kapanan kanallara RPC denemesin
+            self.leader.nodes.clear()
+        self.leader.channels.close_all()
+        os.chdir(self.cwd)
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,134 @@
+"""
+Node bootstrap benchmark'i - mesaj mesaj senkronizasyon vs toplu snapshot
+
+Lider ve node'lar ayni process'te calisir (fault_injection.py). Mesajlar on
+yuklendikten sonra bir node coker ve diski silinir; yerine bos bir node gelir:
+
+  replace: ayni id ile geri doner (metadata'da ona yazilmis mesajlari almali)
+  new:     coken node donmez, yeni id'li bos node eklenir (replikasi eksik
+           kalan mesajlari almali)
+
+Her iki durum once mevcut kesif/senkronizasyon (sync), sonra --bootstrap
+(snapshot) ile olculur. Istege bagli olarak aktarim sirasinda yazma yuku
+uygulanir; sonunda node'un sahip olmasi gereken her mesajin guncel halini
+tasidigi dogrulanir.
+"""
+
+import argparse
+import contextlib
+import os
+import sys
+import time
+from concurrent import futures
+from pathlib import Path
+
+os.environ.setdefault("GRPC_VERBOSITY", "ERROR")
+sys.path.insert(0, str(Path(__file__).parent))
+from fault_injection import InProcessCluster
+from test_fault_scenarios import LoadGenerator, summarize
+from binary_protocol import OP_SET, ST_OK
+
+
+def preload(cluster, count, size, threads=16):
+    payload = b"p" * size
+
+    def store(msg_id):
+        status, reply = cluster.execute(OP_SET, msg_id, payload)
+        if status != ST_OK:
+            raise RuntimeError(f"On yukleme basarisiz: {reply}")
+
+    with futures.ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(store, range(count)))
+
+
+def verify(cluster, node_id):
+    """Metadata'ya gore node'da olmasi gereken mesajlardan eksik/eski olanlarin sayisi"""
+    leader = cluster.leader
+    node = cluster.nodes[node_id].servicer
+    with leader.lock:
+        expected = [m for m, nodes in leader.message_to_nodes.items() if node_id in nodes]
+    bad = sum(1 for m in expected if node._read(m) != leader._get_message_from_leader(m))
+    return len(expected), bad
+
+
+def run(mode, scenario, args):
+    log = sys.stdout if args.verbose else open(os.devnull, "w")
+    with contextlib.redirect_stdout(log):
+        cluster = InProcessCluster(args.nodes, args.tolerance, seed=args.seed)
+    load = None
+    try:
+        with contextlib.redirect_stdout(log):
+            preload(cluster, args.count, args.size)
+            cluster.nodes[1].crash()
+            cluster.wait_node_removed(1)
+            cluster.nodes[1].wipe()
+            if args.load_clients:
+                # Aktarim sirasinda on yuklenen id'lere yazmaya devam edilir
+                load = LoadGenerator(cluster, clients=args.load_clients, read_ratio=0.0,
+                                     key_space=args.count, size=args.size, seed=args.seed)
+                load.start()
+            start = time.perf_counter()
+            if scenario == "replace":
+                node_id = 1
+                cluster.nodes[1].bootstrap = mode == "snapshot"
+                cluster.nodes[1].start()
+            else:
+                node_id = args.nodes + 1
+                cluster.node_options = {"bootstrap": mode == "snapshot"}
+                cluster.add_node(node_id)
+            end = time.perf_counter()
+            elapsed = end - start
+            writes = None
+            if load:
+                load.stop()
+                writes = summarize(load.window(start, end), elapsed)[0]
+            expected, bad = verify(cluster, node_id)
+        stats = cluster.leader.bootstrap_stats.get(node_id)
+    finally:
+        if load:
+            load.stop()
+        with contextlib.redirect_stdout(log):
+            cluster.close()
+    return elapsed, expected, bad, stats, writes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bos node'un tam replikaya ulasma suresi: sync vs snapshot")
+    parser.add_argument("--scenario", default="all", choices=["all", "replace", "new"],
+                        help="replace: ayni id ile bos node, new: yeni id'li bos node")
+    parser.add_argument("--count", type=int, default=5000, help="On yuklenen mesaj sayisi")
+    parser.add_argument("--size", type=int, default=4096, help="Mesaj boyutu (bayt)")
+    parser.add_argument("--nodes", type=int, default=3, help="Node sayisi")
+    parser.add_argument("--tolerance", type=int, default=2, help="Tolerans (replika sayisi)")
+    parser.add_argument("--load-clients", type=int, default=4,
+                        help="Aktarim sirasinda yazma yapan istemci sayisi; 0 ise yuk yok")
+    parser.add_argument("--seed", type=int, default=1, help="Yuk icin tohum")
+    parser.add_argument("--verbose", action="store_true", help="Lider/node loglarini goster")
+    args = parser.parse_args()
+
+    scenarios = ["replace", "new"] if args.scenario == "all" else [args.scenario]
+    print("=" * 110)
+    print(f"NODE BOOTSTRAP - {args.count} mesaj x {args.size} bayt, {args.nodes} node, "
+          f"tolerans {args.tolerance}, yazan istemci: {args.load_clients}")
+    print("=" * 110)
+    print(f"  {'senaryo':<8} {'mod':<9} {'sure(sn)':>9} {'mesaj':>7} {'MB/sn':>7} {'catch-up':>9} "
+          f"{'beklenen':>9} {'eksik/eski':>11} | {'SET/sn':>7} {'SET p99':>8}")
+    for scenario in scenarios:
+        for mode in ("sync", "snapshot"):
+            elapsed, expected, bad, stats, writes = run(mode, scenario, args)
+            messages = stats["messages"] if stats else expected
+            transferred = stats["bytes"] if stats else messages * args.size
+            rate = transferred / (1024 * 1024) / elapsed
+            caught_up = stats["caught_up"] if stats else "-"
+            set_rate, _p50, set_p99, _err = writes or (0.0, 0.0, 0.0, 0.0)
+            print(f"  {scenario:<8} {mode:<9} {elapsed:>9.2f} {messages:>7} {rate:>7.1f} {caught_up:>9} "
+                  f"{expected:>9} {bad:>11} | {set_rate:>7.0f} {set_p99:>8.1f}")
+    print("=" * 110)
+    print("sure: node'un kaydolup tam replika olmasina kadar gecen sure (sync modda kesif dahil).")
+    print("SET/sn, SET p99 (ms): aktarim suresince diger istemcilerin yazmalari; sync modu kesif")
+    print("boyunca lider kilidini tuttugu icin yazmalar bekler.")
+    print("new senaryosunda sync modu eksik replikalari tamamlamaz; node bos kalir.")
+
+
+if __name__ == "__main__":
+    main()
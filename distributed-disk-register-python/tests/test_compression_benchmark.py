@@ -0,0 +1,90 @@
+"""
+Sikistirma benchmark'i - codec/seviye basina CPU maliyeti ve kazanilan bayt
+
+Cluster baslatmaz; liderin SET sirasinda yaptigi sikistirmayi (Compressor.encode)
+ve GET sirasinda yaptigi acmayi (decode) ornek mesajlar uzerinde olcer.
+Disk ve ag kazanci tolerans (replika sayisi) + lider kopyasi ile carpilarak verilir.
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+from compression import DEFAULT_LEVELS, Compressor, available_codecs, decode
+
+WORDS = ("mesaj", "kayit", "lider", "node", "tolerans", "replika", "disk", "istemci",
+         "sunucu", "dagitik", "sistem", "hata", "basarili", "gonderildi", "alindi")
+
+
+def make_messages(count, size, seed=42):
+    """Sikistirilabilir metin mesajlari uretir (gercek trafige benzer)"""
+    rng = random.Random(seed)
+    messages = []
+    for i in range(count):
+        words = []
+        length = 0
+        while length < size:
+            word = rng.choice(WORDS)
+            words.append(word)
+            length += len(word) + 1
+        messages.append(f"{i}: {' '.join(words)}"[:size].encode())
+    return messages
+
+
+def levels_for(codec):
+    if codec == "none":
+        return [None]
+    if codec == "lz4":
+        return [0, 9]
+    if codec == "zstd":
+        return [1, 3, 9]
+    return sorted({1, DEFAULT_LEVELS[codec], 9})
+
+
+def run(messages, codec, level, min_size):
+    comp = Compressor(codec, level, min_size)
+    start = time.process_time()
+    stored = [comp.encode(m) for m in messages]
+    encode_s = time.process_time() - start
+
+    start = time.process_time()
+    for original, data in zip(messages, stored):
+        if decode(data) != original:
+            raise AssertionError(f"{codec}/{level}: acilan mesaj orijinalle ayni degil")
+    decode_s = time.process_time() - start
+    return comp.bytes_in, comp.bytes_out, encode_s, decode_s
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sikistirma codec'lerinin CPU/bayt karsilastirmasi")
+    parser.add_argument("--count", type=int, default=2000, help="Mesaj sayisi")
+    parser.add_argument("--size", type=int, default=1024, help="Mesaj boyutu (bayt)")
+    parser.add_argument("--min-size", type=int, default=256, help="Compressor min_size")
+    parser.add_argument("--tolerance", type=int, default=2, help="Replika sayisi (kazanc hesabi icin)")
+    args = parser.parse_args()
+
+    messages = make_messages(args.count, args.size)
+    copies = args.tolerance + 1  # node replikalari + lider kopyasi
+
+    print("=" * 78)
+    print(f"SIKISTIRMA BENCHMARK - {args.count} mesaj x {args.size} bayt, tolerans={args.tolerance}")
+    print("=" * 78)
+    print(f"{'codec':<6} {'seviye':>6} {'oran':>6} {'kazanc (disk+ag)':>18} "
+          f"{'encode us/msg':>14} {'decode us/msg':>14}")
+    print("-" * 78)
+    for codec in available_codecs():
+        for level in levels_for(codec):
+            raw, stored, enc, dec = run(messages, codec, level, args.min_size)
+            saved = (raw - stored) * copies
+            print(f"{codec:<6} {str(level if level is not None else '-'):>6} {stored / raw:>6.2f} "
+                  f"{saved / 1024:>15.1f} KB {enc / args.count * 1e6:>14.1f} "
+                  f"{dec / args.count * 1e6:>14.1f}")
+    print("=" * 78)
+    print("oran: saklanan/ham bayt | kazanc: tum kopyalarda diskte ve lider->node agda kazanilan bayt")
+
+
+if __name__ == "__main__":
+    main()
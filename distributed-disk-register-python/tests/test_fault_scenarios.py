@@ -0,0 +1,278 @@
+"""
+Hata senaryolari - node olurken/yavaslarken liderin SET/GET performansi
+
+README'deki crash testlerini tekrarlanabilir performans testlerine cevirir.
+Lider ve node'lar ayni process'te calisir (fault_injection.py); sabit port
+veya ayri process gerekmez. Her senaryo birkac fazdan olusur (normal ->
+hata -> toparlanma); yuk surekli uygulanir ve faz basina SET/GET throughput,
+p50/p99 gecikme ve hata orani raporlanir. Sonunda liderin GC ve filtre
+senkronizasyonu thread'lerinin hala calistigi kontrol edilir.
+"""
+
+import argparse
+import contextlib
+import os
+import random
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Crash senaryolarinda gRPC'nin GOAWAY bilgi loglari tabloyu bozmasin
+os.environ.setdefault("GRPC_VERBOSITY", "ERROR")
+sys.path.insert(0, str(Path(__file__).parent))
+from fault_injection import InProcessCluster
+from binary_protocol import OP_DEL, OP_GET, OP_SET, ST_NOT_FOUND, ST_OK, ST_VALUE
+
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+class LoadGenerator:
+    """Arka planda SET/GET (ve istenirse DEL) karisik yuk uygular; her islemi zaman damgasiyla kaydeder"""
+
+    def __init__(self, cluster, clients=8, read_ratio=0.7, key_space=1000, size=256, seed=1,
+                 delete_ratio=0.0):
+        self.cluster = cluster
+        self.clients = clients
+        self.read_ratio = read_ratio
+        self.delete_ratio = delete_ratio
+        self.key_space = key_space
+        self.payload = b"x" * size
+        self.seed = seed
+        self.records = []  # (bitis zamani, op, gecikme_ms, basarili)
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.threads = []
+
+    def preload(self):
+        for msg_id in range(self.key_space):
+            status, reply = self.cluster.execute(OP_SET, msg_id, self.payload)
+            if status != ST_OK:
+                raise RuntimeError(f"On yukleme basarisiz: {reply}")
+
+    def _run(self, index):
+        rng = random.Random(self.seed * 100 + index)
+        records = []
+        while not self.stopped.is_set():
+            msg_id = rng.randrange(self.key_space)
+            roll = rng.random()
+            if roll < self.read_ratio:
+                op = OP_GET
+            elif roll < self.read_ratio + self.delete_ratio:
+                op = OP_DEL
+            else:
+                op = OP_SET
+            start = time.perf_counter()
+            try:
+                status, reply = self.cluster.execute(op, msg_id, self.payload if op == OP_SET else b"")
+                if op == OP_GET:
+                    # Silinen id'lerin GET'i de (bulunamadi) basarili sayilir
+                    ok = status == ST_VALUE or (self.delete_ratio > 0 and status == ST_NOT_FOUND)
+                elif op == OP_DEL:
+                    ok = status in (ST_OK, ST_NOT_FOUND)
+                else:
+                    ok = status == ST_OK
+            except Exception:
+                ok = False
+            end = time.perf_counter()
+            records.append((end, op, (end - start) * 1000, ok))
+            if len(records) >= 256:
+                with self.lock:
+                    self.records.extend(records)
+                records = []
+        with self.lock:
+            self.records.extend(records)
+
+    def start(self):
+        self.threads = [threading.Thread(target=self._run, args=(i,), daemon=True)
+                        for i in range(self.clients)]
+        for t in self.threads:
+            t.start()
+
+    def stop(self):
+        self.stopped.set()
+        for t in self.threads:
+            t.join(timeout=60)
+
+    def window(self, start, end):
+        with self.lock:
+            return [r for r in self.records if start <= r[0] < end]
+
+
+# --- senaryolar: (faz adi, faz basinda yapilacak islem) listesi ---
+
+# Lider diskindeki kopyalar GET'i node'lara gitmeden cevaplar; replika okumasini
+# olcmek icin crash fazlarinda bu kopyalar silinir (ilk okumada yeniden olusur).
+
+def scenario_kill(cluster):
+    """README Test 1: tolerans 2, 4 node; bir node coker, GET'ler diger replikadan okunur"""
+    def crash():
+        cluster.nodes[1].crash()
+        cluster.drop_leader_copies()
+    return [("normal", None),
+            ("node 1 coktu", crash),
+            ("saglik kontrolu sonrasi", lambda: cluster.wait_node_removed(1))]
+
+
+def scenario_kill_two(cluster):
+    """README Test 2: tolerans 3, 6 node; iki node coker, mesajlar kalan replikadan okunur"""
+    def crash_two():
+        cluster.nodes[1].crash()
+        cluster.nodes[2].crash()
+        cluster.drop_leader_copies()
+    def removed():
+        cluster.wait_node_removed(1)
+        cluster.wait_node_removed(2)
+    return [("normal", None),
+            ("node 1 ve 2 coktu", crash_two),
+            ("saglik kontrolu sonrasi", removed)]
+
+
+def scenario_restart(cluster):
+    """README Test 3: node coker, ayni klasorle geri doner; sonra yeni node eklenir"""
+    return [("normal", None),
+            ("node 1 coktu", lambda: cluster.nodes[1].crash()),
+            ("saglik kontrolu sonrasi", lambda: cluster.wait_node_removed(1)),
+            ("node 1 yeniden basladi", lambda: cluster.nodes[1].start()),
+            ("node 4 eklendi", lambda: cluster.add_node(4))]
+
+
+def scenario_slow(cluster):
+    """Bir node'un tum RPC'leri 50 ms (+0..50 ms) gecikir"""
+    return [("normal", None),
+            ("node 1 yavas", lambda: cluster.nodes[1].faults.set(delay_ms=50, jitter_ms=50)),
+            ("duzeldi", lambda: cluster.nodes[1].faults.clear())]
+
+
+def scenario_flaky(cluster):
+    """Bir node'un RPC'lerinin %30'u UNAVAILABLE doner"""
+    return [("normal", None),
+            ("node 1 %30 hata", lambda: cluster.nodes[1].faults.set(error_rate=0.3)),
+            ("duzeldi", lambda: cluster.nodes[1].faults.clear())]
+
+
+def scenario_hang(cluster):
+    """Bir node'un yazma/okuma RPC'leri 2 sn takilir (saglik kontrolu calismaya devam eder)"""
+    methods = ("StoreMessage", "GetMessageStream", "StoreMessageStream")
+    return [("normal", None),
+            ("node 1 takiliyor", lambda: cluster.nodes[1].faults.set(methods, hang_s=2.0)),
+            ("duzeldi", lambda: cluster.nodes[1].faults.clear())]
+
+
+def scenario_drop_gc(cluster):
+    """SET/DEL yuku altinda (GC ve sik filtre senkronizasyonu calisirken) bir node listeden duser"""
+    stale = {}
+
+    def crash():
+        # Dusmeden once alinan stub; node listeden cikinca eski kanala kalir
+        with cluster.leader.lock:
+            stale["stub"] = cluster.leader.nodes[1]["stub"]
+        cluster.nodes[1].crash()
+
+    def removed():
+        cluster.wait_node_removed(1)
+        # Kanal birakildiktan hemen sonra eski stub'la filtre senkronizasyonu
+        cluster.leader._sync_node_filter(1, stale["stub"])
+
+    return [("normal", None),
+            ("node 1 coktu", crash),
+            ("saglik kontrolu sonrasi", removed),
+            ("node 1 yeniden basladi", lambda: cluster.nodes[1].start())]
+
+
+SCENARIOS = {
+    # ad: (fonksiyon, node sayisi, tolerans, secenekler)
+    "kill": (scenario_kill, 4, 2, {}),
+    "kill-two": (scenario_kill_two, 6, 3, {}),
+    "restart": (scenario_restart, 3, 2, {}),
+    "slow": (scenario_slow, 3, 2, {}),
+    "flaky": (scenario_flaky, 3, 2, {}),
+    "hang": (scenario_hang, 3, 2, {}),
+    "drop-gc": (scenario_drop_gc, 3, 2, {"delete_ratio": 0.15,
+                                         "leader_options": {"filter_sync_interval": 0.2}}),
+}
+
+
+def summarize(records, seconds):
+    row = []
+    for op in (OP_SET, OP_GET):
+        ops = [r for r in records if r[1] == op]
+        latencies = [r[2] for r in ops]
+        errors = sum(1 for r in ops if not r[3])
+        row.append((len(ops) / seconds, percentile(latencies, 50), percentile(latencies, 99),
+                    errors / len(ops) * 100 if ops else 0.0))
+    return row
+
+
+def run_scenario(name, args):
+    build, node_count, tolerance, options = SCENARIOS[name]
+    log = sys.stdout if args.verbose else open(os.devnull, "w")
+    with contextlib.redirect_stdout(log):
+        cluster = InProcessCluster(node_count, tolerance, seed=args.seed,
+                                   leader_options=options.get("leader_options"))
+    try:
+        load = LoadGenerator(cluster, clients=args.clients, read_ratio=args.read_ratio,
+                             key_space=args.keys, size=args.size, seed=args.seed,
+                             delete_ratio=options.get("delete_ratio", 0.0))
+        with contextlib.redirect_stdout(log):
+            load.preload()
+            load.start()
+            phases = []
+            for phase, action in build(cluster):
+                if action:
+                    action()
+                start = time.perf_counter()
+                time.sleep(args.phase_seconds)
+                phases.append((phase, start, time.perf_counter()))
+            load.stop()
+        # Arka plan thread'leri (node dusunce kapanan kanallar vb. yuzunden) olmemeli
+        background = {"GC": cluster.gc_thread, "filtre": cluster.filter_thread}
+        alive = {label: thread.is_alive() for label, thread in background.items() if thread}
+    finally:
+        with contextlib.redirect_stdout(log):
+            cluster.close()
+
+    print(f"\n[{name}] {build.__doc__}")
+    print(f"  {'faz':<26} {'SET/sn':>8} {'p50':>7} {'p99':>8} {'hata%':>6} | "
+          f"{'GET/sn':>8} {'p50':>7} {'p99':>8} {'hata%':>6}")
+    for phase, start, end in phases:
+        (set_rate, set_p50, set_p99, set_err), (get_rate, get_p50, get_p99, get_err) = \
+            summarize(load.window(start, end), end - start)
+        print(f"  {phase:<26} {set_rate:>8.0f} {set_p50:>7.1f} {set_p99:>8.1f} {set_err:>6.1f} | "
+              f"{get_rate:>8.0f} {get_p50:>7.1f} {get_p99:>8.1f} {get_err:>6.1f}")
+    print("  arka plan: " + ", ".join(f"{label} {'calisiyor' if ok else 'OLDU'}" for label, ok in alive.items()))
+    if not all(alive.values()):
+        raise SystemExit(f"[{name}] lider arka plan thread'i durdu")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Node hatalari altinda lider SET/GET performansi")
+    parser.add_argument("--scenario", default="all", choices=["all", *SCENARIOS],
+                        help="Calistirilacak senaryo")
+    parser.add_argument("--phase-seconds", type=float, default=6.0,
+                        help="Faz basina olcum suresi; saglik kontrolu olu node'u ~10-15 sn'de cikarir")
+    parser.add_argument("--clients", type=int, default=8, help="Es zamanli istemci thread sayisi")
+    parser.add_argument("--read-ratio", type=float, default=0.7, help="GET orani")
+    parser.add_argument("--keys", type=int, default=1000, help="On yuklenen mesaj (id) sayisi")
+    parser.add_argument("--size", type=int, default=256, help="Mesaj boyutu (bayt)")
+    parser.add_argument("--seed", type=int, default=1, help="Yuk ve hata enjeksiyonu icin tohum")
+    parser.add_argument("--verbose", action="store_true", help="Lider/node loglarini goster")
+    args = parser.parse_args()
+
+    names = list(SCENARIOS) if args.scenario == "all" else [args.scenario]
+    print("=" * 92)
+    print(f"HATA SENARYOLARI - faz {args.phase_seconds:.0f} sn, {args.clients} istemci, "
+          f"GET orani {args.read_ratio:.0%} (gecikmeler ms)")
+    print("=" * 92)
+    for name in names:
+        run_scenario(name, args)
+    print("=" * 92)
+
+
+if __name__ == "__main__":
+    main()
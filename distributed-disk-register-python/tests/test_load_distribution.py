@@ -9,10 +9,12 @@ import time
 import subprocess
 import sys
 import os
-import socket
 from pathlib import Path
 import threading
 
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+from client import HaToKuSeClient
+
 def start_nodes(node_count=4):
     """4 node başlatır"""
     processes = []
@@ -63,35 +65,20 @@ def start_leader():
     return proc
 
 def send_messages(message_count=100):
-    """Mesajları socket ile hızlıca gönderir"""
+    """Mesajları istemci kütüphanesiyle (havuz + pipelining) toplu gönderir"""
     print(f"\n📤 {message_count} mesaj gönderiliyor...")
     
     try:
-        # Leader'a bağlan
-        s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        s.connect(('localhost', 6666))
-        # Socket'i non-blocking yaparak performansı artır
-        s.settimeout(0.1)
-        
-        for i in range(message_count):
-            msg_id = 100 + i
-            msg_content = f"Test mesaji {i+1}"
-            
-            # SET komutu gönder
-            command = f"SET {msg_id} {msg_content}\n"
-            s.sendall(command.encode())
-            
-            # Yanıt almayı dene ama bloklanma
-            try:
-                response = s.recv(1024).decode()
-            except socket.timeout:
-                pass  # Timeout olursa devam et
-            
-            if (i + 1) % 25 == 0:
-                print(f"  ✓ {i+1}/{message_count} mesaj gönderildi")
-        
-        s.sendall(b"EXIT\n")
-        s.close()
+        with HaToKuSeClient(pool_size=4, timeout=60.0) as client:
+            batch = 250
+            for start in range(0, message_count, batch):
+                items = {100 + i: f"Test mesaji {i+1}"
+                         for i in range(start, min(start + batch, message_count))}
+                results = client.set_many(items)
+                failed = [msg_id for msg_id, ok in results.items() if ok is not True]
+                if failed:
+                    print(f"  ⚠️  {len(failed)} mesaj kaydedilemedi (ör. ID={failed[0]}: {results[failed[0]]})")
+                print(f"  ✓ {start + len(items)}/{message_count} mesaj gönderildi")
         
         print(f"  ✓ Tüm {message_count} mesaj gönderildi!")
         
@@ -108,7 +95,7 @@ def count_messages_in_nodes(node_count=4, message_count=100):
         # storage_node_1, storage_node_2, etc.
         storage_dir = test_dir / f"storage_node_{i}"
         if storage_dir.exists():
-            files = list(storage_dir.glob("*.txt"))
+            files = list(storage_dir.rglob("*.txt"))  # flat veya sharded yerlesim
             count = len(files)
             total += count
             
@@ -0,0 +1,127 @@
+"""
+Sicak yol log maliyeti benchmark'i - print vs halka tamponlu EventLog
+
+stdout yavas okunan bir pipe'a yonlendirilir (test_load_distribution.py'deki
+gibi cikisi thread'le bosaltan bir ust process'i taklit eder). Birden fazla
+thread mesaj basina bir log satiri yazar; cagri basina gecikme ve toplam
+throughput olculur:
+
+  print:        her satir dogrudan pipe'a yazilir (pipe dolunca thread bekler)
+  eventlog:     satir tampona eklenir, writer thread'i yazar
+  eventlog/N:   --log-sample N ile her N olaydan biri kaydedilir
+  eventlog-off: --log-level warning (mesaj basina olaylar kapali)
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+from eventlog import INFO, EventLog
+
+
+class SlowPipe:
+    """stdout yerine gecen pipe; okuyucu thread her okumadan sonra bekler"""
+
+    def __init__(self, read_delay):
+        read_fd, write_fd = os.pipe()
+        self.writer = os.fdopen(write_fd, "w", buffering=1)
+        self.reader = os.fdopen(read_fd, "rb", buffering=0)
+        self.read_delay = read_delay
+        self.received = 0
+        self.thread = threading.Thread(target=self._drain, daemon=True)
+        self.thread.start()
+
+    def _drain(self):
+        while True:
+            data = self.reader.read(4096)
+            if not data:
+                return
+            self.received += data.count(b"\n")
+            time.sleep(self.read_delay)
+
+    def close(self):
+        self.writer.close()
+        self.thread.join()
+        self.reader.close()
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))] if values else 0.0
+
+
+def run(mode, args):
+    pipe = SlowPipe(args.read_delay_ms / 1000)
+    real_stdout = sys.stdout
+    eventlog = None
+    if mode != "print":
+        sample = int(mode.split("/")[1]) if "/" in mode else 1
+        level = "warning" if mode == "eventlog-off" else "info"
+        eventlog = EventLog(capacity=args.buffer)
+        eventlog.configure(level=level, sample=sample, capacity=args.buffer)
+    latencies = [[] for _ in range(args.threads)]
+
+    def worker(index):
+        out = latencies[index]
+        for i in range(args.count):
+            start = time.perf_counter()
+            if eventlog:
+                eventlog.sampled(INFO, "NODE 1", "store", "Mesaj kaydedildi ({mode}): ID={id}",
+                                 mode="BUFFERED", id=i)
+            else:
+                print(f"[NODE 1] Mesaj kaydedildi (BUFFERED): ID={i}")
+            out.append(time.perf_counter() - start)
+
+    sys.stdout = pipe.writer
+    try:
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(args.threads)]
+        start = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - start
+    finally:
+        sys.stdout = real_stdout
+    stats = None
+    if eventlog:
+        eventlog.close()
+        stats = eventlog.stats()
+    pipe.close()
+    merged = [v * 1e6 for values in latencies for v in values]
+    return elapsed, percentile(merged, 0.5), percentile(merged, 0.99), max(merged), pipe.received, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Yavas stdout altinda mesaj basina log maliyeti")
+    parser.add_argument("--threads", type=int, default=8, help="Log yazan thread sayisi")
+    parser.add_argument("--count", type=int, default=20000, help="Thread basina log olayi")
+    parser.add_argument("--read-delay-ms", type=float, default=1.0,
+                        help="Pipe okuyucusunun her 4 KB okumadan sonraki beklemesi (ms)")
+    parser.add_argument("--buffer", type=int, default=65536, help="EventLog halka tamponu kapasitesi")
+    parser.add_argument("--modes", nargs="+", default=["print", "eventlog", "eventlog/100", "eventlog-off"])
+    args = parser.parse_args()
+
+    total = args.threads * args.count
+    print("=" * 100)
+    print(f"LOG MALIYETI - {args.threads} thread x {args.count} olay, okuyucu gecikmesi {args.read_delay_ms} ms/4KB")
+    print("=" * 100)
+    print(f"  {'mod':<14} {'sure(sn)':>9} {'olay/sn':>10} {'p50(us)':>8} {'p99(us)':>8} {'max(us)':>9} "
+          f"{'yazilan':>8} {'atlanan':>8} {'dusen':>7}")
+    for mode in args.modes:
+        elapsed, p50, p99, worst, received, stats = run(mode, args)
+        sampled_out = stats["sampled_out"] if stats else 0
+        dropped = stats["dropped"] if stats else 0
+        print(f"  {mode:<14} {elapsed:>9.2f} {total / elapsed:>10.0f} {p50:>8.1f} {p99:>8.1f} {worst:>9.0f} "
+              f"{received:>8} {sampled_out:>8} {dropped:>7}")
+    print("=" * 100)
+    print("p50/p99/max: log cagrisinin yazan thread'e maliyeti (mikrosaniye).")
+    print("yazilan: pipe'a ulasan satir; atlanan: ornekleme ile kaydedilmeyen; dusen: tampon doluyken kaybolan.")
+
+
+if __name__ == "__main__":
+    main()
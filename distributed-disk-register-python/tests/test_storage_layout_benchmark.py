@@ -0,0 +1,80 @@
+"""
+Klasor yerlesimi benchmark'i - flat vs sharded
+
+Cluster baslatmaz; gecici bir klasorde MessageStore ile N mesaj dosyasi
+olusturur ve yerlesim basina create, lookup (GET), tam tarama (ListMessages /
+filtre olusturma) ve flat -> sharded gecis surelerini olcer.
+"""
+
+import argparse
+import random
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+from storage import MessageStore
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def bench_layout(layout, count, lookups):
+    root = tempfile.mkdtemp(prefix=f"layout_{layout}_")
+    try:
+        store = MessageStore(root, layout=layout)
+        payload = b"x" * 64
+        create_s, _ = timed(lambda: [store.write(i, payload) for i in range(count)])
+
+        rng = random.Random(1)
+        ids = [rng.randrange(count * 2) for _ in range(lookups)]  # ~yarisi yok
+        lookup_s, found = timed(lambda: sum(store.read(i) is not None for i in ids))
+
+        scan_s, scanned = timed(lambda: sum(1 for _ in MessageStore(root, layout=layout).iter_entries()))
+        assert scanned == count, f"{layout}: tarama {scanned} != {count}"
+        return create_s, lookup_s, scan_s, found
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def bench_migration(count):
+    root = tempfile.mkdtemp(prefix="layout_migrate_")
+    try:
+        store = MessageStore(root, layout="flat")
+        for i in range(count):
+            store.write(i, b"x" * 64)
+        migrate_s, moved = timed(lambda: MessageStore(root, layout="sharded").migrate())
+        after = MessageStore(root, layout="sharded")
+        assert moved == count and after.legacy is None and after.count == count
+        return migrate_s
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="flat ve sharded mesaj klasoru karsilastirmasi")
+    parser.add_argument("--count", type=int, default=100000, help="Mesaj dosyasi sayisi")
+    parser.add_argument("--lookups", type=int, default=20000, help="Rastgele GET sayisi")
+    args = parser.parse_args()
+
+    print("=" * 72)
+    print(f"YERLESIM BENCHMARK - {args.count} dosya, {args.lookups} lookup")
+    print("=" * 72)
+    print(f"{'yerlesim':<9} {'create us/dosya':>16} {'lookup us':>11} {'tam tarama (sn)':>16} {'bulunan':>9}")
+    print("-" * 72)
+    for layout in ("flat", "sharded"):
+        create_s, lookup_s, scan_s, found = bench_layout(layout, args.count, args.lookups)
+        print(f"{layout:<9} {create_s / args.count * 1e6:>16.1f} {lookup_s / args.lookups * 1e6:>11.1f} "
+              f"{scan_s:>16.3f} {found:>9}")
+    print("-" * 72)
+    print(f"flat -> sharded gecis: {bench_migration(args.count):.2f} sn")
+    print("=" * 72)
+
+
+if __name__ == "__main__":
+    main()
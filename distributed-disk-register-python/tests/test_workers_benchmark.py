@@ -0,0 +1,228 @@
+"""
+Cok worker'li lider benchmark'i - --workers 1 ile --workers N karsilastirmasi
+
+Lider (main.py --mode leader --workers N) ve node'lar ayri process'lerde,
+gercek portlarla calisir; SO_REUSEPORT ile port paylasan worker process'leri
+ayni process icinde denenemez. Her worker sayisi icin:
+
+  dogruluk:   her worker'in ic portundan (7000+w) partition'i baska worker'a
+              ait id'lere SET/GET/DEL/SCAN gonderilir (PeerRouter iletimi);
+              cevaplar beklenen degerlerle karsilastirilir
+  throughput: --procs istemci process'i 6666'ya (cekirdek baglantilari
+              worker'lara dagitir) toplu SET/GET yukler; saniyedeki komut
+              sayisi ve parti basina p50/p99 gecikme olculur
+
+5550, 6666, 7000+ ve node portlari bos olmalidir. Olcekleme icin makinede en
+az N cekirdek gerekir (tek cekirdekte worker'lar ayni CPU'yu paylasir).
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SRC = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(SRC))
+from client import BusyError, ClientError, HaToKuSeClient
+from partition import internal_socket_port, partition_of
+
+CLIENT_PORT = 6666
+INTERNAL_BASE = 7000  # _serve_worker varsayilani
+CHECK_BASE = 1_000_000  # Dogruluk kontrolu id'leri yuk id'leriyle karismasin
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))] if values else 0.0
+
+
+class Cluster:
+    """Gecici klasorde lider (N worker) + node process'leri"""
+
+    def __init__(self, workers, args):
+        self.root = tempfile.mkdtemp(prefix="hatokuse_workers_")
+        self.log = None if args.verbose else subprocess.DEVNULL
+        self.procs = []
+        leader = [sys.executable, str(SRC / "main.py"), "--mode", "leader", "--workers", str(workers),
+                  "--log-level", "warning"]
+        self.procs.append(subprocess.Popen(leader, cwd=self.root, stdout=self.log, stderr=self.log))
+        wait_port(CLIENT_PORT)
+        for node_id in range(1, args.nodes + 1):
+            node = [sys.executable, str(SRC / "main.py"), "--mode", "node", "--id", str(node_id),
+                    "--port", str(args.node_base_port + node_id), "--log-level", "warning"]
+            self.procs.append(subprocess.Popen(node, cwd=self.root, stdout=self.log, stderr=self.log))
+        self.entry_ports = ([internal_socket_port(INTERNAL_BASE, w) for w in range(workers)]
+                            if workers > 1 else [CLIENT_PORT])
+        for port in self.entry_ports:
+            wait_ready(port)
+
+    def close(self):
+        for proc in self.procs:
+            proc.send_signal(signal.SIGTERM)
+        for proc in self.procs:
+            try:
+                proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+        shutil.rmtree(self.root, ignore_errors=True)
+
+
+def wait_port(port, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            with HaToKuSeClient(port=port, timeout=2.0) as client:
+                client.get(0)
+            return
+        except (ClientError, OSError):
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"Port {port} acilmadi")
+            time.sleep(0.3)
+
+
+def wait_ready(port, timeout=60.0):
+    """Node'lar o worker'a kaydolup SET kabul edilene kadar bekler"""
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            with HaToKuSeClient(port=port, timeout=5.0) as client:
+                client.set(CHECK_BASE - 1, "hazir")
+            return
+        except (ClientError, OSError):
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"Port {port}: node'lar kaydolmadi")
+            time.sleep(0.5)
+
+
+def check_forwarding(cluster, workers, args):
+    """Her giris worker'indan, baska worker'lara ait id'lerle SET/GET/DEL/SCAN.
+
+    (komut sayisi, iletilen komut sayisi, hatalar) doner.
+    """
+    ports = cluster.entry_ports
+    commands = forwarded = 0
+    errors = []
+    clients = [HaToKuSeClient(port=port, binary=True, timeout=30.0) for port in ports]
+    try:
+        for entry, client in enumerate(clients):
+            start = CHECK_BASE + entry * args.check_keys
+            ids = list(range(start, start + args.check_keys))
+            values = {msg_id: f"w{entry}-{msg_id}".encode() for msg_id in ids}
+            foreign = sum(1 for msg_id in ids if partition_of(msg_id, workers) != entry % workers)
+
+            stored = client.set_many(values)
+            errors += [f"SET {i} (giris {entry}): {r}" for i, r in stored.items() if r is not True]
+            for reader, other in enumerate(clients):
+                got = other.get_many(ids)
+                errors += [f"GET {i} (giris {reader}): {got[i]!r}" for i in ids if got[i] != values[i]]
+            items = list(client.scan_iter(ids[0], ids[-1], page_size=max(1, args.check_keys // 3)))
+            if items != sorted(values.items()):
+                errors.append(f"SCAN {ids[0]}-{ids[-1]} (giris {entry}): {len(items)} mesaj")
+
+            deleter = clients[(entry + 1) % len(clients)]
+            deleted = deleter.delete_many(ids)
+            errors += [f"DEL {i} (giris {(entry + 1) % len(clients)})" for i, ok in deleted.items() if not ok]
+            got = client.get_many(ids)
+            errors += [f"GET silinen {i} (giris {entry}): {got[i]!r}" for i in ids if got[i] is not None]
+            if list(client.scan_iter(ids[0], ids[-1])):
+                errors.append(f"SCAN silinen {ids[0]}-{ids[-1]} (giris {entry}) bos degil")
+
+            commands += len(ids) * (3 + len(clients)) + 2
+            forwarded += foreign * (3 + len(clients))
+    finally:
+        for client in clients:
+            client.close()
+    return commands, forwarded if workers > 1 else 0, errors
+
+
+def load_process(index, seconds, batch, keys, size, read_ratio):
+    """Istemci process'i: sure boyunca toplu SET/GET; (komut, parti gecikmeleri, BUSY) doner"""
+    rng = random.Random(index)
+    payload = bytes(size)
+    done = busy = 0
+    latencies = []
+    with HaToKuSeClient(binary=True, pool_size=2, timeout=30.0) as client:
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            ids = [rng.randrange(keys) for _ in range(batch)]
+            start = time.perf_counter()
+            try:
+                if rng.random() < read_ratio:
+                    client.get_many(ids)
+                else:
+                    client.set_many([(msg_id, payload) for msg_id in ids])
+                done += batch
+            except BusyError as e:
+                done += len(e.results)
+                busy += len(e.failed)
+            latencies.append(time.perf_counter() - start)
+    return done, latencies, busy
+
+
+def measure(args):
+    with HaToKuSeClient(binary=True, pool_size=4, timeout=60.0) as client:
+        for start in range(0, args.keys, 500):
+            client.set_many([(i, bytes(args.size)) for i in range(start, min(start + 500, args.keys))])
+    ctx = multiprocessing.get_context("spawn")
+    with ctx.Pool(args.procs) as pool:
+        results = pool.starmap(load_process, [(i, args.seconds, args.batch, args.keys, args.size,
+                                               args.read_ratio) for i in range(args.procs)])
+    done = sum(r[0] for r in results)
+    latencies = [v * 1000 for r in results for v in r[1]]
+    busy = sum(r[2] for r in results)
+    return done / args.seconds, percentile(latencies, 0.5), percentile(latencies, 0.99), busy
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lider --workers 1 ve --workers N karsilastirmasi")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, max(2, min(4, os.cpu_count() or 1))],
+                        help="Denenecek lider worker sayilari")
+    parser.add_argument("--nodes", type=int, default=3, help="Node sayisi")
+    parser.add_argument("--node-base-port", type=int, default=5700, help="Node portlari bu sayidan sonra")
+    parser.add_argument("--procs", type=int, default=4, help="Yuk ureten istemci process sayisi")
+    parser.add_argument("--seconds", type=float, default=5.0, help="Olcum suresi")
+    parser.add_argument("--batch", type=int, default=16, help="Toplu komut basina id sayisi")
+    parser.add_argument("--keys", type=int, default=2000, help="Yuk id uzayi (on yuklenir)")
+    parser.add_argument("--size", type=int, default=256, help="Mesaj boyutu (bayt)")
+    parser.add_argument("--read-ratio", type=float, default=0.7, help="GET partisi orani")
+    parser.add_argument("--check-keys", type=int, default=60, help="Giris worker'i basina dogruluk id'i")
+    parser.add_argument("--verbose", action="store_true", help="Lider/node loglarini goster")
+    args = parser.parse_args()
+
+    print("=" * 100)
+    print(f"LIDER WORKER'LARI - {args.nodes} node, {args.procs} istemci process, parti {args.batch}, "
+          f"GET orani {args.read_ratio:.0%}, {os.cpu_count()} cekirdek")
+    print("=" * 100)
+    print(f"  {'workers':>7} | {'komut/sn':>9} {'p50(ms)':>8} {'p99(ms)':>8} {'busy':>6} | "
+          f"{'kontrol':>8} {'iletilen':>9} {'hatali':>7}")
+    failures = []
+    base_rate = None
+    for workers in args.workers:
+        cluster = Cluster(workers, args)
+        try:
+            commands, forwarded, errors = check_forwarding(cluster, workers, args)
+            rate, p50, p99, busy = measure(args)
+        finally:
+            cluster.close()
+        base_rate = base_rate or rate
+        failures += [f"workers={workers}: {e}" for e in errors]
+        print(f"  {workers:>7} | {rate:>9.0f} {p50:>8.1f} {p99:>8.1f} {busy:>6} | "
+              f"{commands:>8} {forwarded:>9} {len(errors):>7}   (x{rate / base_rate:.2f})")
+    print("=" * 100)
+    print("komut/sn: istemcilerin tamamlanan SET/GET komutlari; p50/p99: parti (pipelined) gecikmesi.")
+    print("kontrol: dogruluk komutlari; iletilen: partition'i giris worker'inda olmayan (PeerRouter) komutlar.")
+    if failures:
+        for failure in failures[:20]:
+            print("  HATA:", failure)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()